@@ -0,0 +1,382 @@
+"""
+Async versions of API views, routed by quiz_events/urls_asgi.py when the project is
+served through quiz_events/asgi.py.
+
+Under ASGI, Django runs each request to a sync view on a thread of its own, so a login
+storm runs as many PBKDF2 hashes at once as there are logins, starving every other
+request of CPU, and every read request ties up a thread for its whole duration. These
+views do the same work with the same request and response format: the password views
+hash on the bounded pool of user_accounts.hashing and the read views query through the
+async ORM, authenticating and logging without leaving the event loop when the user
+cache and the log writer allow it.
+"""
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.shortcuts import aget_object_or_404
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+
+from api.cache import aget_quiz_payload
+from api.pagination import KeysetPagination, RankedPagination
+from api.serializers import (
+    UserSignupSerializer, UserLoginserializer, UserChangePasswordSerializer, QuizListSerializer,
+    UserSubmissionListSerializer, UserSubmissionResultSerializer, EventSerializer, EventSearchSerializer,
+)
+from api.views import get_token_for_user, StartQuizAPI
+from quiz.cache import aupcoming_events
+from quiz.grading import result_answers
+from quiz.models import Quiz, UserSubmission, Event
+from quiz.search import search_events, search_quizzes, search_terms
+from user_accounts.authentication import CachedJWTAuthentication
+from user_accounts.hashing import aauthenticate, amake_password, run_hasher
+from user_accounts.models import User
+from utils import acustom_response, alog_api_call, UserMessage, QuizMessage, UserSubmissionMessages, EventMessages
+
+
+def async_api_view(methods, authenticated=True):
+    """
+    Decorate an async view like an APIView with CachedJWTAuthentication: request.user is
+    the token's user (or AnonymousUser) and authentication errors, like every APIException
+    the view raises (e.g. NotFound for a bad cursor), get DRF's response.
+    With `authenticated`, requests without a token are refused as by IsAuthenticated.
+    """
+    def decorator(view):
+        @csrf_exempt
+        @require_http_methods(methods)
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            authenticator = CachedJWTAuthentication()
+            try:
+                result = await authenticator.aauthenticate(request)
+                if result is None and authenticated:
+                    raise NotAuthenticated()
+            except APIException as exc:
+                return error_response(exc, authenticator, request)
+            request.user = result[0] if result else AnonymousUser()
+            try:
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return error_response(exc, authenticator, request)
+        return wrapper
+    return decorator
+
+
+def request_data(request):
+    """
+    Request body as a dict, from JSON or form data like DRF's default parsers.
+    Raises ValueError on malformed JSON.
+    """
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST.dict()
+
+
+def error_response(exc, authenticator=None, request=None):
+    """
+    The body and status DRF's exception handler gives an APIException.
+    """
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = HttpResponse(JSONRenderer().render(detail), content_type='application/json', status=exc.status_code)
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED and authenticator is not None:
+        response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+    return response
+
+
+async def parse_error(request):
+    return await acustom_response(
+        request=request,
+        message='JSON parse error.',
+        success=0,
+        status_code=status.HTTP_400_BAD_REQUEST
+    )
+
+
+@async_api_view(['POST'], authenticated=False)
+async def user_signup(request):
+    """
+    Async UserSignupAPIView.post.
+    """
+    try:
+        data = request_data(request)
+    except ValueError:
+        return await parse_error(request)
+    serializer = UserSignupSerializer(data=data)
+    # The uniqueness validators query the database.
+    if not await sync_to_async(serializer.is_valid)():
+        return await acustom_response(
+            request=request,
+            message=serializer.errors,
+            success=0,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    validated_data = dict(serializer.validated_data)
+    validated_data.pop('confirm_password')
+    password = validated_data.pop('password')
+    user = User(**validated_data)
+    user.email = User.objects.normalize_email(user.email)
+    user.password = await amake_password(password)
+    await user.asave()
+    return await acustom_response(
+        request=request,
+        message=UserMessage.USER_SIGNUP_SUCCESSFULLY,
+        success=1,
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+@async_api_view(['POST'], authenticated=False)
+async def user_login(request):
+    """
+    Async UserLoginAPIView.post.
+    """
+    try:
+        data = request_data(request)
+    except ValueError:
+        return await parse_error(request)
+    serializer = UserLoginserializer(data=data)
+    if not serializer.is_valid():
+        return await acustom_response(
+            request=request,
+            message=UserMessage.USER_LOGIN_FAIL,
+            success=0,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    user = await aauthenticate(serializer.validated_data['email'], serializer.validated_data['password'])
+    if user is None:
+        return await acustom_response(
+            request=request,
+            message=UserMessage.USER_LOGIN_FAIL,
+            success=0,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    return await acustom_response(
+        request=request,
+        data=get_token_for_user(user),
+        message=UserMessage.USER_LOGIN_SUCCESSFULLY,
+        success=1,
+        status_code=status.HTTP_200_OK
+    )
+
+
+@async_api_view(['POST'])
+async def user_change_password(request):
+    """
+    Async UserChangePasswordAPIView.post.
+    """
+    user = request.user
+    try:
+        data = request_data(request)
+    except ValueError:
+        return await parse_error(request)
+    serializer = UserChangePasswordSerializer(data=data, context={'user': user})
+    # validate() checks the current password: hashing, no queries.
+    if not await run_hasher(serializer.is_valid):
+        return await acustom_response(
+            request=request,
+            message=serializer.errors,
+            success=0,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    user.password = await amake_password(serializer.validated_data['password'])
+    # Only the password: request.user may be a copy cached by CachedJWTAuthentication.
+    await user.asave(update_fields=['password'])
+    return await acustom_response(
+        request=request,
+        message=UserMessage.USER_CHANGE_PASS_SUCCESSFULLY,
+        success=1,
+        status_code=status.HTTP_200_OK
+    )
+
+
+@async_api_view(['GET'])
+async def quiz_list(request):
+    """
+    Async QuizListAPIView.get.
+    """
+    query = request.GET.get('q')
+    if search_terms(query):
+        paginator = RankedPagination()
+        # search_quizzes may run a raw query, which the async ORM can't iterate.
+        search = sync_to_async(lambda limit, after: list(search_quizzes(query, limit, after)))
+        page = await paginator.apaginate_search(search, request)
+        message, status_code = QuizMessage.QUIZ_SEARCH_SUCCESSFULLY, status.HTTP_200_OK
+    else:
+        paginator = KeysetPagination()
+        page = await paginator.apaginate_queryset(
+            Quiz.objects.filter(question_count__gt=0), request, ('-created_at', '-id'), Quiz
+        )
+        message, status_code = QuizMessage.QUIZ_LIST_SUCCESSFULLY, status.HTTP_201_CREATED
+    return await acustom_response(
+        request=request,
+        data=QuizListSerializer(page, many=True, context={'request': request}).data,
+        message=message,
+        success=1,
+        status_code=status_code,
+        pagination=paginator.get_pagination()
+    )
+
+
+@async_api_view(['GET'])
+async def quiz_detail(request, quiz_id):
+    """
+    Async StartQuizAPI.get.
+    """
+    payload = await aget_quiz_payload(quiz_id)
+    if payload is None:
+        return await acustom_response(
+            request=request,
+            message=QuizMessage.QUIZ_NOT_FOUND,
+            success=0,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    etag, body = payload
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+
+    await alog_api_call(
+        request=request,
+        message=QuizMessage.QUIZ_RETRIEVE_SUCCESSFULLY,
+        send_data={'etag': etag},
+        status_code=response.status_code
+    )
+    return response
+
+
+submit_quiz = StartQuizAPI.as_view()
+
+
+@csrf_exempt
+async def start_quiz(request, quiz_id):
+    """
+    Quiz details are read by quiz_detail, submissions still go through StartQuizAPI.post.
+    """
+    if request.method == 'GET':
+        return await quiz_detail(request, quiz_id)
+    return await sync_to_async(submit_quiz)(request, quiz_id=quiz_id)
+
+
+@async_api_view(['GET'])
+async def user_submission_list(request):
+    """
+    Async UserSubmissionListView.get.
+    """
+    paginator = KeysetPagination()
+    submissions = UserSubmission.objects.filter(user=request.user).select_related('user__submission_stats', 'quiz')
+    page = await paginator.apaginate_queryset(submissions, request, ('-submitted_at', '-id'), UserSubmission)
+    return await acustom_response(
+        request=request,
+        data=UserSubmissionListSerializer(page, many=True, context={'request': request}).data,
+        message=UserSubmissionMessages.USER_SUBMISSION_RETRIEVE_SUCCESSFULLY,
+        success=1,
+        status_code=status.HTTP_200_OK,
+        pagination=paginator.get_pagination()
+    )
+
+
+@async_api_view(['GET'])
+async def quiz_result(request, submission_id):
+    """
+    Async UserResultRetrieveView.get.
+    """
+    try:
+        submission = await aget_object_or_404(
+            UserSubmission.objects.select_related('quiz'),
+            id=submission_id,
+            user=request.user
+        )
+    except Http404 as exc:
+        return error_response(NotFound(*exc.args))
+
+    if submission.status == 'PENDING':
+        return await acustom_response(
+            request=request,
+            data={'id': submission.id, 'status': submission.status},
+            message=UserSubmissionMessages.USER_RESULT_PENDING,
+            success=1,
+            status_code=status.HTTP_202_ACCEPTED
+        )
+
+    await sync_to_async(result_answers)(submission)
+    return await acustom_response(
+        request=request,
+        data=UserSubmissionResultSerializer(submission).data,
+        message=UserSubmissionMessages.USER_RESULT_RETRIEVE_SUCCESSFULLT,
+        success=1,
+        status_code=status.HTTP_200_OK
+    )
+
+
+@async_api_view(['GET'])
+async def event_list(request):
+    """
+    Async EventListAPIView.get.
+    """
+    paginator = KeysetPagination()
+    page = await paginator.apaginate_queryset(await aupcoming_events(), request, ('event_date', 'id'), Event)
+    return await acustom_response(
+        request=request,
+        data=EventSerializer(page, many=True, context={'request': request}).data,
+        message=EventMessages.EVENT_FETCHED_SUCCESSFULLY,
+        success=1,
+        status_code=status.HTTP_200_OK,
+        pagination=paginator.get_pagination()
+    )
+
+
+@async_api_view(['GET'])
+async def event_search(request):
+    """
+    Async EventSearchAPIView.get.
+    """
+    filters = EventSearchSerializer(data=request.GET)
+    if not filters.is_valid():
+        return await acustom_response(
+            request=request,
+            message=filters.errors,
+            success=0,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    paginator = KeysetPagination()
+    page = await paginator.apaginate_queryset(
+        search_events(**filters.validated_data), request, ('event_date', 'id'), Event
+    )
+    return await acustom_response(
+        request=request,
+        data=EventSerializer(page, many=True, context={'request': request}).data,
+        message=EventMessages.EVENT_SEARCH_SUCCESSFULLY,
+        success=1,
+        status_code=status.HTTP_200_OK,
+        pagination=paginator.get_pagination()
+    )
+
+
+@async_api_view(['GET'])
+async def event_retrieve(request, id):
+    """
+    Async EventRetrieveAPIView.get.
+    """
+    try:
+        event = await aget_object_or_404(Event, id=id)
+    except Http404 as exc:
+        return error_response(NotFound(*exc.args))
+    return await acustom_response(
+        request=request,
+        data=EventSerializer(event, context={'request': request}).data,
+        message=EventMessages.EVENT_FETCHED_SUCCESSFULLY,
+        success=1,
+        status_code=status.HTTP_200_OK
+    )
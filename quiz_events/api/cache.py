@@ -0,0 +1,50 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from quiz.cache import quiz_generation, aquiz_generation
+from quiz.models import Quiz
+from quiz_events.routers import primary_reads
+from api.serializers import QuizDetailSerializer
+from utils import response_body, QuizMessage
+
+
+def get_quiz_payload(quiz_id):
+    """
+    Return (etag, body) of the rendered StartQuizAPI.get response for a quiz,
+    or None if the quiz does not exist.
+
+    The body is rendered once per quiz generation, from the primary database, and
+    then served from the cache without touching the database or the serializers.
+    """
+    key = f"quiz-payload:{quiz_id}:{quiz_generation(quiz_id)}"
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    with primary_reads():
+        quiz = Quiz.objects.prefetch_related('questions__answers').filter(pk=quiz_id).first()
+    if quiz is None:
+        return None
+
+    body = JSONRenderer().render(response_body(
+        QuizDetailSerializer(quiz).data,
+        success=1,
+        message=QuizMessage.QUIZ_RETRIEVE_SUCCESSFULLY,
+    ))
+    entry = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+    cache.set(key, entry, settings.QUIZ_PAYLOAD_CACHE_TIMEOUT)
+    return entry
+
+
+async def aget_quiz_payload(quiz_id):
+    """
+    get_quiz_payload for async views: a cached payload is read without leaving the event loop.
+    """
+    entry = await cache.aget(f"quiz-payload:{quiz_id}:{await aquiz_generation(quiz_id)}")
+    if entry is not None:
+        return entry
+    return await sync_to_async(get_quiz_payload)(quiz_id)
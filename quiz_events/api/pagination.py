@@ -0,0 +1,195 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.core.exceptions import ValidationError
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a (field, id) key, set per view with `keyset_ordering`,
+    e.g. ('-created_at', '-id').
+
+    Each page is read with `WHERE field <= last field AND (field < last field OR id < last id)
+    ... LIMIT n`: the leading `field <=` bound lets SQLite start an index range scan at
+    the cursor, so every page costs the same, however deep it is.
+    The cursor is an opaque, url-safe encoding of the last row's key.
+
+    Lists (e.g. cached results) are paginated too; they must already be in keyset order.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+        self.max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+        self.next_cursor = None
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, values):
+        raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def load_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def decode_cursor(self, model, cursor):
+        values = self.load_cursor(cursor)
+        try:
+            return [
+                model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, values):
+        """
+        Rows strictly after `values` in the keyset order, as nested bounds
+        `f1 <= x1 AND (f1 < x1 OR (f2 <= x2 AND (f2 < x2 OR ...)))`. The OR chain
+        `f1 < x1 OR (f1 = x1 AND f2 < x2)` selects the same rows, but SQLite can't
+        use it as an index range bound and scans the index from the start.
+        """
+        condition = None
+        for name, value in reversed(list(zip(self.ordering, values))):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            strict = Q(**{f'{name.lstrip("-")}__{lookup}': value})
+            if condition is None:
+                condition = strict
+            else:
+                condition = Q(**{f'{name.lstrip("-")}__{lookup}e': value}) & (strict | condition)
+        return condition
+
+    def is_after(self, obj, values):
+        for name, value in zip(self.ordering, values):
+            current = getattr(obj, name.lstrip('-'))
+            if current != value:
+                return current < value if name.startswith('-') else current > value
+        return False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.take_page(list(self.page_rows(queryset, request, view.keyset_ordering, view.queryset.model)))
+
+    async def apaginate_queryset(self, queryset, request, ordering, model):
+        """
+        paginate_queryset for async views, which pass the keyset ordering and model themselves.
+        """
+        rows = self.page_rows(queryset, request, ordering, model)
+        if isinstance(rows, QuerySet):
+            return self.take_page([row async for row in rows])
+        return self.take_page(list(rows))
+
+    def page_rows(self, queryset, request, ordering, model):
+        """
+        The rows of the requested page plus one, to tell whether there is a next page.
+        """
+        self.ordering = ordering
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = request.GET.get(self.cursor_query_param)
+
+        if isinstance(queryset, QuerySet):
+            queryset = queryset.order_by(*self.ordering)
+            if cursor:
+                queryset = queryset.filter(self.after(self.decode_cursor(queryset.model, cursor)))
+        elif cursor:
+            values = self.decode_cursor(model, cursor)
+            queryset = [obj for obj in queryset if self.is_after(obj, values)]
+
+        return queryset[:self.page_size + 1]
+
+    def take_page(self, rows):
+        """
+        The first page_size rows, remembering the cursor of the next page if there are more.
+        """
+        page = rows[:self.page_size]
+        if len(rows) > self.page_size:
+            last = page[-1]
+            self.next_cursor = self.encode_cursor(
+                [getattr(last, name.lstrip('-')) for name in self.ordering]
+            )
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_pagination(self):
+        """
+        Pagination details sent next to `data` in the custom_response envelope.
+        """
+        return {'next': self.get_next_link(), 'page_size': self.page_size}
+
+    def get_paginated_response(self, data):
+        return Response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor of the next page, taken from `pagination.next`.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results per page, at most {self.max_page_size}.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class RankedPagination(KeysetPagination):
+    """
+    Cursor pagination of ranked search results on their (search_rank, id) key.
+
+    The rank isn't a model field, so the view passes a `search(limit, after)` function
+    that reads one page after the given key, instead of a queryset.
+    """
+    ordering = ('search_rank', 'id')
+
+    def decode_cursor(self, model, cursor):
+        rank, pk = self.load_cursor(cursor)
+        if not isinstance(rank, (int, float)) or isinstance(pk, bool) or not isinstance(pk, int):
+            raise NotFound(self.invalid_cursor_message)
+        return [float(rank), pk]
+
+    def paginate_search(self, search, request):
+        after = self.search_after(request)
+        return self.take_page(search(self.page_size + 1, after))
+
+    async def apaginate_search(self, search, request):
+        """
+        paginate_search with a coroutine function `search`.
+        """
+        after = self.search_after(request)
+        return self.take_page(await search(self.page_size + 1, after))
+
+    def search_after(self, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = request.GET.get(self.cursor_query_param)
+        return self.decode_cursor(None, cursor) if cursor else None
@@ -1,8 +1,9 @@
+from django.conf import settings
 from rest_framework import serializers
 from django.contrib.auth.hashers import check_password
 
 from user_accounts.models import User
-from quiz.models import Quiz, Question, Answer, UserSubmission, UserAnswer, Event
+from quiz.models import Quiz, Question, Answer, UserSubmission, UserAnswer, LeaderboardEntry, Event
 
 
 class UserSignupSerializer(serializers.ModelSerializer):
@@ -46,6 +47,14 @@ class UserProfileUpdateSerializer(UserSignupSerializer):
     class Meta(UserSignupSerializer.Meta):
         read_only_fields = ['username', 'email']
         fields = ['first_name', 'last_name', 'username','email', 'profile_pic']
+
+    def update(self, instance, validated_data):
+        # The instance may be a copy of request.user cached by CachedJWTAuthentication,
+        # only the changed fields are written so other columns (e.g. is_active) aren't reverted.
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
         
 
 class UserChangePasswordSerializer(serializers.Serializer):
@@ -70,7 +79,8 @@ class UserChangePasswordSerializer(serializers.Serializer):
         password = self.validated_data.get('password', None)
         user = self.context.get('user', None)
         user.set_password(password)
-        user.save()
+        # Only the password: the user may be a cached copy of request.user.
+        user.save(update_fields=['password'])
         return user
 
 
@@ -140,6 +150,30 @@ class SubmitQuizSerializer(serializers.Serializer):
     )
 
 
+class BatchSubmissionItemSerializer(serializers.Serializer):
+    """
+    Serializer class for a single quiz attempt replayed by an offline client.
+    """
+    quiz_id = serializers.IntegerField()
+    answers = serializers.DictField(
+        child=serializers.CharField(allow_blank=True),
+        help_text="Dictionary: question_id → answer"
+    )
+    client_timestamp = serializers.DateTimeField(required=False, allow_null=True)
+
+
+class BatchSubmitQuizSerializer(serializers.Serializer):
+    """
+    Serializer class for submitting many quiz attempts in one request.
+    Items are validated one by one so an invalid item does not reject the whole batch.
+    """
+    submissions = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.QUIZ_BATCH_SUBMISSION_LIMIT,
+    )
+
+
 class UserSubmissionListSerializer(serializers.ModelSerializer):
     """
     Serializer class to represent a user's quiz submission details.
@@ -152,26 +186,21 @@ class UserSubmissionListSerializer(serializers.ModelSerializer):
         fields = ['id','quiz', 'user', 'score', 'total_submission','submitted_at']
 
     def get_total_submission(self, obj):
-        return UserSubmission.objects.filter(user=obj.user).count()    
+        stats = getattr(obj.user, 'submission_stats', None)
+        return stats.total_submissions if stats else 0
 
 
 class UserAnswerResultSerializer(serializers.ModelSerializer):
     """
     Serializer class to represent a user's answer along with the correct answer.
+    Question text and correct answer are the snapshots taken at grading time,
+    load the answers with quiz.grading.result_answers.
     """
-    question_text = serializers.CharField(source="question.text")
-    correct_answer = serializers.SerializerMethodField()
-
     class Meta:
         model = UserAnswer
         fields = ['question_text', 'answer', 'is_correct', 'correct_answer']
 
 
-    def get_correct_answer(self, obj):
-        correct = obj.question.answers.filter(is_correct=True).first()
-        return correct.text if correct else None
-
-
 class UserSubmissionResultSerializer(serializers.ModelSerializer):
     """
     Serializer class to represent a user's quiz submission result in detail.
@@ -185,11 +214,26 @@ class UserSubmissionResultSerializer(serializers.ModelSerializer):
             'id',
             'quiz_title',
             'score',
+            'status',
             'submitted_at',
             'answers',
         ]
 
 
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """
+    Serializer class to represent a user's position on a quiz leaderboard.
+    """
+    rank = serializers.IntegerField(read_only=True)
+    username = serializers.CharField(source="user.username")
+    first_name = serializers.CharField(source="user.first_name")
+    last_name = serializers.CharField(source="user.last_name")
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ['rank', 'username', 'first_name', 'last_name', 'best_score', 'achieved_at']
+
+
 class EventSerializer(serializers.ModelSerializer):
     """
     Serializer class to represent event details.
@@ -197,4 +241,20 @@ class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = ['id','event_title','event_desc','event_date','location']
-        
\ No newline at end of file
+        
+
+
+class EventSearchSerializer(serializers.Serializer):
+    """
+    Serializer class to validate the event search filters.
+    """
+    q = serializers.CharField(source="query", required=False, allow_blank=True, max_length=200, help_text="Words to find in the title or description")
+    location = serializers.CharField(required=False, allow_blank=True, max_length=100, help_text="Exact location, case-insensitive")
+    location_prefix = serializers.CharField(required=False, allow_blank=True, max_length=100, help_text="Location prefix, case-insensitive")
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return attrs
@@ -1,3 +1,725 @@
-from django.test import TestCase
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import URLPattern, get_resolver, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from quiz.cache import upcoming_events
+from quiz import grading
+from quiz.grading import AnswerKey, answer_keys, get_answer_key, submit_quiz
+from quiz.models import Quiz, Question, Answer, Event, UserSubmission
+from api.cache import get_quiz_payload
+from api.pagination import KeysetPagination
+from quiz_events import routers
+from quiz_events.middleware import QueryBudgetExceeded, ReplicaRoutingMiddleware
+from quiz_events.write_lane import WriteLane, WriteLaneBusy, get_config
+from user_accounts.authentication import auth_users, auth_version
+from user_accounts.models import User
+from utils import QuizMessage
+
+PASSWORD = 'Budget@1234'
+
+
+def route_names(urlconf):
+    return [pattern.name for pattern in get_resolver(urlconf).url_patterns if isinstance(pattern, URLPattern)]
+
+
+class SeededDataMixin:
+    """
+    A user with submissions, a staff user, a quiz with ten questions of every type, empty quizzes and events.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', username='budget', password=PASSWORD)
+        cls.staff = User.objects.create_user(email='staff@example.com', username='staff', password=PASSWORD, is_staff=True)
+        cls.quiz = Quiz.objects.create(title='Budget quiz', description='Seeded for the query budget tests')
+        cls.answers = {}
+        for number in range(10):
+            question_type = ('MCQ', 'BOOL', 'TEXT')[number % 3]
+            question = Question.objects.create(quiz=cls.quiz, text=f'Question {number}', question_type=question_type)
+            if question_type == 'MCQ':
+                options = [Answer.objects.create(question=question, text=f'Option {i}', is_correct=i == 0) for i in range(4)]
+                cls.answers[str(question.id)] = str(options[0].id)
+            else:
+                correct = 'True' if question_type == 'BOOL' else 'paris'
+                Answer.objects.create(question=question, text=correct, is_correct=True)
+                cls.answers[str(question.id)] = correct
+        for number in range(5):
+            Quiz.objects.create(title=f'Empty quiz {number}')
+        cls.submissions = [submit_quiz(cls.quiz, cls.user, cls.answers) for _ in range(3)]
+        cls.events = [
+            Event.objects.create(event_title=f'Event {i}', event_desc='Seeded', event_date='2099-01-01', location='Pune')
+            for i in range(5)
+        ]
+
+
+@override_settings(
+    QUERY_BUDGET_MODE='raise',
+    QUERY_BUDGET_HEADERS=True,
+)
+class QueryBudgetTests(SeededDataMixin, TestCase):
+    """
+    Walk every route of api/urls.py and quiz/urls.py against a small dataset
+    and check that none goes over its QUERY_BUDGETS entry.
+    """
+
+    def setUp(self):
+        cache.clear()
+        answer_keys.clear()
+        auth_users.clear()
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.staff_api = APIClient()
+        self.staff_api.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff).access_token}')
+        self.web = self.client_class()
+        self.web.force_login(self.user)
+
+    def route_requests(self):
+        """
+        One (url name, client, method, path, data) request per route.
+        """
+        quiz_id = self.quiz.id
+        submission_id = self.submissions[0].id
+        form_answers = {f'question_{key}': value for key, value in self.answers.items()}
+        return [
+            ('user-signup', APIClient(), 'post', reverse('user-signup'), {
+                'first_name': 'New', 'last_name': 'User', 'username': 'newuser',
+                'email': 'new@example.com', 'password': PASSWORD, 'confirm_password': PASSWORD,
+            }),
+            ('user-login', APIClient(), 'post', reverse('user-login'), {'email': self.user.email, 'password': PASSWORD}),
+            ('user-profile-update', self.api, 'put', reverse('user-profile-update'), {'first_name': 'Changed'}),
+            # Run as staff: changing the password would log the web client out.
+            ('user-change-password', self.staff_api, 'post', reverse('user-change-password'), {
+                'current_password': PASSWORD, 'password': PASSWORD, 'confirm_password': PASSWORD,
+            }),
+            ('user-detail', self.api, 'get', reverse('user-detail'), None),
+            ('quiz-list', self.api, 'get', reverse('quiz-list'), None),
+            ('quiz-list', self.api, 'get', reverse('quiz-list'), {'q': 'budget quest'}),
+            ('start-quiz-api', self.api, 'get', reverse('start-quiz-api', args=[quiz_id]), None),
+            ('start-quiz-api', self.api, 'post', reverse('start-quiz-api', args=[quiz_id]), {'answers': self.answers}),
+            ('submit-quiz-batch', self.api, 'post', reverse('submit-quiz-batch'), {
+                'submissions': [{'quiz_id': quiz_id, 'answers': self.answers} for _ in range(5)],
+            }),
+            ('quiz-leaderboard', self.api, 'get', reverse('quiz-leaderboard', args=[quiz_id]), None),
+            ('quiz-leaderboard-rank', self.api, 'get', reverse('quiz-leaderboard-rank', args=[quiz_id]), None),
+            ('user-submission-list', self.api, 'get', reverse('user-submission-list'), None),
+            ('quiz-result', self.api, 'get', reverse('quiz-result', args=[submission_id]), None),
+            ('event-list', self.api, 'get', reverse('event-list'), None),
+            ('event-search', self.api, 'get', reverse('event-search'), {
+                'q': 'seed', 'location_prefix': 'pu', 'date_from': '2099-01-01', 'date_to': '2099-12-31',
+            }),
+            ('event-retrieve', self.api, 'get', reverse('event-retrieve', args=[self.events[0].id]), None),
+            ('ops-stats', self.staff_api, 'get', reverse('ops-stats'), None),
+            ('home', self.web, 'get', reverse('home'), None),
+            ('quiz_list', self.web, 'get', reverse('quiz_list'), None),
+            ('quiz_list', self.web, 'get', reverse('quiz_list'), {'q': 'question 3'}),
+            ('start_quiz', self.web, 'get', reverse('start_quiz', args=[quiz_id]), None),
+            ('start_quiz', self.web, 'post', reverse('start_quiz', args=[quiz_id]), form_answers),
+            ('quiz_result', self.web, 'get', reverse('quiz_result', args=[submission_id]), None),
+            ('all_events', self.web, 'get', reverse('all_events'), None),
+            ('event_detail', self.web, 'get', reverse('event_detail', args=[self.events[0].id]), None),
+        ]
+
+    def test_every_route_has_a_budget(self):
+        for name in route_names('api.urls') + route_names('quiz.urls'):
+            with self.subTest(route=name):
+                self.assertIn(name, settings.QUERY_BUDGETS)
+
+    def test_every_route_is_walked(self):
+        walked = {name for name, *_ in self.route_requests()}
+        self.assertEqual(walked, set(route_names('api.urls') + route_names('quiz.urls')))
+
+    def test_routes_stay_within_budget(self):
+        for name, client, method, path, data in self.route_requests():
+            with self.subTest(route=name, method=method):
+                if client is self.web:
+                    response = getattr(client, method)(path, data)
+                else:
+                    response = getattr(client, method)(path, data, format='json')
+                self.assertLess(response.status_code, 400, response.content[:300])
+                self.assertLessEqual(int(response['X-DB-Queries']), settings.QUERY_BUDGETS[name])
+
+    @override_settings(QUERY_BUDGETS={'event-list': 0})
+    def test_over_budget_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.api.get(reverse('event-list'))
+
+    @override_settings(QUERY_BUDGETS={'event-list': 0}, QUERY_BUDGET_MODE='log')
+    def test_over_budget_logs(self):
+        with self.assertLogs('quiz_events.middleware', level='WARNING'):
+            response = self.api.get(reverse('event-list'))
+        self.assertEqual(response.status_code, 200)
+
+
+class BatchSubmitQuizTests(SeededDataMixin, TestCase):
+    """
+    Every item of a batch gets its own result: invalid and failing items don't sink the others.
+    """
+
+    def setUp(self):
+        answer_keys.clear()
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.other_quiz = Quiz.objects.create(title='Other batch quiz')
+        question = Question.objects.create(quiz=self.other_quiz, text='Capital?', question_type='TEXT')
+        Answer.objects.create(question=question, text='Paris', is_correct=True)
+        self.other_answers = {str(question.id): 'paris'}
+
+    def post(self, submissions):
+        with mock.patch('quiz.grading.AnswerKey.load', side_effect=AnswerKey.load) as load:
+            response = self.api.post(reverse('submit-quiz-batch'), {'submissions': submissions}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['data']['results'], load
+
+    def test_partial_failure(self):
+        before = UserSubmission.objects.count()
+        results, load = self.post([
+            {'quiz_id': self.quiz.id, 'answers': self.answers},
+            {'quiz_id': 999999, 'answers': self.answers},
+            {'quiz_id': self.quiz.id, 'answers': 'not a mapping'},
+            {'answers': self.answers},
+            {'quiz_id': self.other_quiz.id, 'answers': self.other_answers, 'client_timestamp': '2030-01-01T10:00:00Z'},
+            {'quiz_id': self.quiz.id, 'answers': {}},
+        ])
+
+        self.assertEqual([result['index'] for result in results], list(range(6)))
+        self.assertEqual([result['success'] for result in results], [1, 0, 0, 0, 1, 1])
+        self.assertEqual([results[0]['score'], results[4]['score'], results[5]['score']], [10, 1, 0])
+        self.assertEqual(results[1]['message'], QuizMessage.QUIZ_NOT_FOUND)
+        self.assertIn('answers', results[2]['message'])
+        self.assertIn('quiz_id', results[3]['message'])
+
+        stored = UserSubmission.objects.filter(pk__in=[results[index]['submission_id'] for index in (0, 4, 5)])
+        self.assertEqual(stored.count(), 3)
+        self.assertEqual(UserSubmission.objects.count(), before + 3)
+        self.assertEqual(stored.get(quiz=self.other_quiz).client_submitted_at.year, 2030)
+        # Once per distinct quiz, however many items use it.
+        self.assertCountEqual([call.args[0] for call in load.call_args_list], [self.quiz.id, self.other_quiz.id])
+
+    def test_storing_failure(self):
+        before = UserSubmission.objects.count()
+        after_grading = grading.after_grading
+
+        def failing(submissions):
+            if any(submission.quiz_id == self.other_quiz.id for submission in submissions):
+                raise IntegrityError('Stats update failed')
+            after_grading(submissions)
+
+        with mock.patch('quiz.grading.after_grading', side_effect=failing):
+            results, load = self.post([
+                {'quiz_id': self.quiz.id, 'answers': self.answers},
+                {'quiz_id': self.other_quiz.id, 'answers': self.other_answers},
+                {'quiz_id': self.quiz.id, 'answers': self.answers},
+            ])
+
+        # The batch transaction failed, then each item was stored in its own.
+        self.assertEqual([result['success'] for result in results], [1, 0, 1])
+        self.assertEqual(results[1]['message'], QuizMessage.QUIZ_SUBMISSION_FAILED)
+        self.assertEqual(UserSubmission.objects.count(), before + 2)
+        self.assertFalse(UserSubmission.objects.filter(quiz=self.other_quiz).exists())
+
+
+class QuizPayloadCacheTests(SeededDataMixin, TestCase):
+    """
+    The cached quiz payload is rendered again once an edit of the quiz commits, and not before.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def texts(self):
+        data = json.loads(get_quiz_payload(self.quiz.id)[1])['data']
+        return [question['text'] for question in data['questions']] + [
+            answer['text'] for question in data['questions'] for answer in question['answers']
+        ]
+
+    def assertChangedOnCommit(self, edit, text):
+        self.texts()
+        with self.captureOnCommitCallbacks() as callbacks:
+            edit()
+            # Still the old payload while the edit is uncommitted.
+            self.assertNotIn(text, self.texts())
+        for callback in callbacks:
+            callback()
+        self.assertIn(text, self.texts())
+
+    def test_question_edit(self):
+        question = self.quiz.questions.order_by('id').first()
+
+        def edit():
+            question.text = 'Edited question'
+            question.save()
+
+        self.assertChangedOnCommit(edit, 'Edited question')
+
+    def test_answer_edit(self):
+        answer = Answer.objects.filter(question__quiz=self.quiz).order_by('id').first()
+
+        def edit():
+            answer.text = 'Edited answer'
+            answer.save()
+
+        self.assertChangedOnCommit(edit, 'Edited answer')
+
+
+class KeysetPaginationTests(SeededDataMixin, TestCase):
+    """
+    Keyset pages follow each other without gaps or repeats, and a deep page is an index range scan.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_pages_cover_every_row(self):
+        quizzes = [self.quiz]
+        for number in range(6):
+            quiz = Quiz.objects.create(title=f'Keyset quiz {number}')
+            Question.objects.create(quiz=quiz, text='Question', question_type='BOOL')
+            quizzes.append(quiz)
+        # Ties on created_at are broken by id.
+        Quiz.objects.filter(pk__in=[quiz.pk for quiz in quizzes[2:]]).update(created_at=quizzes[1].created_at)
+
+        seen = []
+        url, params = reverse('quiz-list'), {'page_size': 2}
+        while url:
+            body = self.api.get(url, params).json()
+            seen += [quiz['id'] for quiz in body['data']]
+            url, params = body['pagination']['next'], None
+        expected = Quiz.objects.filter(question_count__gt=0).order_by('-created_at', '-id').values_list('id', flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_deep_page_is_an_index_range_scan(self):
+        cases = [
+            (Quiz.objects.filter(question_count__gt=0), ('-created_at', '-id'), 'quiz_listed_keyset_idx'),
+            (UserSubmission.objects.filter(user=self.user), ('-submitted_at', '-id'), 'submission_user_keyset_idx'),
+            (Event.objects.all(), ('event_date', 'id'), 'event_date_keyset_idx'),
+        ]
+        for queryset, ordering, index in cases:
+            with self.subTest(index=index):
+                paginator = KeysetPagination()
+                paginator.ordering = ordering
+                last = queryset.order_by(*ordering).first()
+                values = [getattr(last, name.lstrip('-')) for name in ordering]
+                plan = queryset.order_by(*ordering).filter(paginator.after(values))[:50].explain()
+                # The range bound on the leading key column, not a scan of the index from its start.
+                self.assertRegex(plan, rf'SEARCH .* USING INDEX {index} \(.*[<>]\?\)')
+
+
+class AuthUserCacheTests(TestCase):
+    """
+    Users cached by CachedJWTAuthentication are dropped on every save, and the views
+    writing through the cached copy don't revert concurrent changes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='cached@example.com', username='cached', password=PASSWORD)
+
+    def setUp(self):
+        cache.clear()
+        auth_users.clear()
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_save_bumps_auth_version(self):
+        self.assertEqual(self.api.get(reverse('user-detail')).json()['data']['first_name'], '')
+        version = auth_version(self.user.pk)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Renamed'
+        user.save()
+        self.assertNotEqual(auth_version(self.user.pk), version)
+        self.assertEqual(self.api.get(reverse('user-detail')).json()['data']['first_name'], 'Renamed')
+
+    def test_deactivation_invalidates(self):
+        self.assertEqual(self.api.get(reverse('user-detail')).status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.api.get(reverse('user-detail')).status_code, 401)
+
+    def deactivate_behind_cache(self):
+        self.assertEqual(self.api.get(reverse('user-detail')).status_code, 200)
+        # Deactivated where this process can't see the version bump, the cached copy is still active.
+        User.objects.filter(pk=self.user.pk).update(is_active=False, last_name='Elsewhere')
+
+    def test_profile_update_keeps_concurrent_changes(self):
+        self.deactivate_behind_cache()
+        response = self.api.put(reverse('user-profile-update'), {'first_name': 'Changed'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual((user.is_active, user.first_name, user.last_name), (False, 'Changed', 'Elsewhere'))
+
+    def test_change_password_keeps_concurrent_changes(self):
+        self.deactivate_behind_cache()
+        response = self.api.post(reverse('user-change-password'), {
+            'current_password': PASSWORD, 'password': 'Changed@1234', 'confirm_password': 'Changed@1234',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual((user.is_active, user.last_name), (False, 'Elsewhere'))
+        self.assertTrue(user.check_password('Changed@1234'))
+
+
+@override_settings(
+    ROOT_URLCONF='quiz_events.urls_asgi',
+    QUERY_BUDGET_MODE='raise',
+    QUERY_BUDGET_HEADERS=True,
+)
+class AsyncPasswordViewTests(TestCase):
+    """
+    The async signup, login and password change views routed by quiz_events/urls_asgi.py.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='async@example.com', username='async', password=PASSWORD)
+
+    def setUp(self):
+        auth_users.clear()
+
+    async def test_signup(self):
+        response = await self.async_client.post(reverse('user-signup'), {
+            'first_name': 'New', 'last_name': 'User', 'username': 'newuser',
+            'email': 'new@EXAMPLE.com', 'password': PASSWORD, 'confirm_password': PASSWORD,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        user = await User.objects.aget(username='newuser')
+        self.assertEqual(user.email, 'new@example.com')
+        self.assertTrue(await user.acheck_password(PASSWORD))
+
+    async def test_signup_invalid(self):
+        response = await self.async_client.post(reverse('user-signup'), {
+            'username': 'other', 'email': self.user.email, 'password': PASSWORD, 'confirm_password': 'x',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['success'], 0)
+
+    async def test_login(self):
+        response = await self.async_client.post(reverse('user-login'), {
+            'email': self.user.email, 'password': PASSWORD,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn('access', response.json()['data'])
+        self.assertLessEqual(int(response['X-DB-Queries']), settings.QUERY_BUDGETS['user-login'])
+
+    async def test_login_wrong_password(self):
+        for email in (self.user.email, 'nobody@example.com'):
+            with self.subTest(email=email):
+                response = await self.async_client.post(reverse('user-login'), {
+                    'email': email, 'password': 'wrong',
+                }, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+    async def test_change_password(self):
+        token = RefreshToken.for_user(self.user).access_token
+        response = await self.async_client.post(reverse('user-change-password'), {
+            'current_password': PASSWORD, 'password': 'Changed@1234', 'confirm_password': 'Changed@1234',
+        }, content_type='application/json', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200, response.content)
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertTrue(await user.acheck_password('Changed@1234'))
+
+    async def test_change_password_keeps_concurrent_changes(self):
+        token = RefreshToken.for_user(self.user).access_token
+        headers = {'Authorization': f'Bearer {token}'}
+        self.assertEqual((await self.async_client.get(reverse('user-detail'), headers=headers)).status_code, 200)
+        # Deactivated where this process can't see the version bump, the cached copy is still active.
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        response = await self.async_client.post(reverse('user-change-password'), {
+            'current_password': PASSWORD, 'password': 'Changed@1234', 'confirm_password': 'Changed@1234',
+        }, content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertFalse(user.is_active)
+        self.assertTrue(await user.acheck_password('Changed@1234'))
+
+    async def test_change_password_unauthenticated(self):
+        response = await self.async_client.post(reverse('user-change-password'), {}, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+
+
+@override_settings(
+    QUERY_BUDGET_MODE='raise',
+    QUERY_BUDGET_HEADERS=True,
+)
+class AsyncReadViewTests(SeededDataMixin, TestCase):
+    """
+    The async read views routed by quiz_events/urls_asgi.py answer exactly like the DRF views.
+    """
+
+    def setUp(self):
+        cache.clear()
+        auth_users.clear()
+        self.token = f'Bearer {RefreshToken.for_user(self.user).access_token}'
+
+    def read_requests(self):
+        quiz_id = self.quiz.id
+        return [
+            ('quiz-list', reverse('quiz-list'), {}),
+            ('quiz-list', reverse('quiz-list'), {'page_size': 2}),
+            ('quiz-list', reverse('quiz-list'), {'q': 'budget quest'}),
+            ('start-quiz-api', reverse('start-quiz-api', args=[quiz_id]), {}),
+            ('start-quiz-api', reverse('start-quiz-api', args=[0]), {}),
+            ('user-submission-list', reverse('user-submission-list'), {'page_size': 2}),
+            ('quiz-result', reverse('quiz-result', args=[self.submissions[0].id]), {}),
+            ('quiz-result', reverse('quiz-result', args=[0]), {}),
+            ('event-list', reverse('event-list'), {'page_size': 3}),
+            ('event-search', reverse('event-search'), {'q': 'seed', 'location_prefix': 'pu'}),
+            ('event-search', reverse('event-search'), {'date_from': '2099-02-01', 'date_to': '2099-01-01'}),
+            ('event-retrieve', reverse('event-retrieve', args=[self.events[0].id]), {}),
+            ('event-retrieve', reverse('event-retrieve', args=[0]), {}),
+            # Bad cursors, from the keyset and the ranked paginations.
+            ('quiz-list', reverse('quiz-list'), {'cursor': 'not-a-cursor'}),
+            ('quiz-list', reverse('quiz-list'), {'q': 'budget', 'cursor': 'WyJ4Il0'}),
+            ('user-submission-list', reverse('user-submission-list'), {'cursor': 'not-a-cursor'}),
+            ('event-list', reverse('event-list'), {'cursor': 'WzEsIDJd'}),
+            ('event-search', reverse('event-search'), {'q': 'seed', 'cursor': 'not-a-cursor'}),
+        ]
+
+    async def test_same_responses(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.token)
+        for name, path, params in self.read_requests():
+            with self.subTest(route=name, params=params):
+                expected = await sync_to_async(client.get)(path, params)
+                with self.settings(ROOT_URLCONF='quiz_events.urls_asgi'):
+                    response = await self.async_client.get(path, params, headers={'Authorization': self.token})
+                self.assertEqual(response.status_code, 404 if 'cursor' in params else expected.status_code)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.json(), expected.json())
+                self.assertLessEqual(int(response['X-DB-Queries']), settings.QUERY_BUDGETS[name])
+
+    @override_settings(ROOT_URLCONF='quiz_events.urls_asgi')
+    async def test_unauthenticated(self):
+        for name, path, params in self.read_requests():
+            with self.subTest(route=name):
+                response = await self.async_client.get(path, params)
+                self.assertEqual(response.status_code, 401)
+                self.assertIn('WWW-Authenticate', response)
+
+    @override_settings(ROOT_URLCONF='quiz_events.urls_asgi')
+    async def test_submit_goes_through_drf(self):
+        response = await self.async_client.post(
+            reverse('start-quiz-api', args=[self.quiz.id]), {'answers': self.answers},
+            content_type='application/json', headers={'Authorization': self.token}
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['score'], 10)
+
+
+class WriteLaneTests(TransactionTestCase):
+    """
+    Submissions sent through the write lane from many threads are group-committed.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='lane@example.com', username='lane', password=PASSWORD)
+        self.quiz = Quiz.objects.create(title='Lane quiz')
+        self.question = Question.objects.create(quiz=self.quiz, text='Question', question_type='BOOL')
+        Answer.objects.create(question=self.question, text='True', is_correct=True)
+        self.answers = {str(self.question.id): 'true'}
+        self.lane = WriteLane({**get_config(), 'ENABLED': True})
+        self.addCleanup(self.lane.close)
+
+    def test_concurrent_submissions(self):
+        def submit(_):
+            try:
+                return submit_quiz(self.quiz, self.user, self.answers)
+            finally:
+                connections.close_all()
+
+        with mock.patch('quiz.grading.get_write_lane', return_value=self.lane):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                submissions = list(executor.map(submit, range(40)))
+
+        self.assertEqual(len({submission.pk for submission in submissions}), 40)
+        self.assertEqual(UserSubmission.objects.filter(user=self.user, score=1).count(), 40)
+        stats = self.lane.stats()
+        self.assertEqual((stats['submitted'], stats['failed']), (40, 0))
+        self.assertLessEqual(stats['commits'], 40)
+
+    def test_bypassed_in_transactions(self):
+        with transaction.atomic(), mock.patch('quiz.grading.get_write_lane', return_value=self.lane):
+            submit_quiz(self.quiz, self.user, self.answers)
+        self.assertEqual(self.lane.stats()['submitted'], 0)
+        self.assertEqual(UserSubmission.objects.filter(user=self.user).count(), 1)
+
+    def blocked_lane(self):
+        """
+        Hold the lane's thread until the returned event is set, before it opens a transaction:
+        an IMMEDIATE transaction would lock the test database for the request's log entry.
+        """
+        started, release = threading.Event(), threading.Event()
+        write_batch = self.lane.write_batch
+
+        def blocked(batch):
+            started.set()
+            release.wait()
+            write_batch(batch)
+
+        self.addCleanup(release.set)
+        patcher = mock.patch.object(self.lane, 'write_batch', side_effect=blocked)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        threading.Thread(target=self.lane.run, args=(lambda items: items, None), daemon=True).start()
+        self.assertTrue(started.wait(5))
+        # Writes sent from now on time out while the first one is held.
+        self.lane.config['TIMEOUT'] = 0.05
+        return release
+
+    def test_timeout_withdraws_queued_write(self):
+        release = self.blocked_lane()
+        with mock.patch('quiz.grading.get_write_lane', return_value=self.lane):
+            with self.assertRaises(WriteLaneBusy):
+                submit_quiz(self.quiz, self.user, self.answers)
+        release.set()
+        self.lane.close()
+        # Withdrawn, so a resubmission doesn't store it twice.
+        self.assertFalse(UserSubmission.objects.filter(user=self.user).exists())
+        self.assertEqual(self.lane.stats()['failed'], 1)
+
+    def test_timeout_response(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        url = reverse('start-quiz-api', args=[self.quiz.id])
+        release = self.blocked_lane()
+        with mock.patch('quiz.grading.get_write_lane', return_value=self.lane):
+            response = client.post(url, {'answers': self.answers}, format='json')
+        self.assertEqual(response.status_code, 503, response.content)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(response.json()['success'], 0)
+        release.set()
+        self.lane.close()
+        self.assertFalse(UserSubmission.objects.filter(user=self.user).exists())
+
+    def test_timeout_web_form(self):
+        self.client.force_login(self.user)
+        release = self.blocked_lane()
+        with mock.patch('quiz.grading.get_write_lane', return_value=self.lane):
+            response = self.client.post(
+                reverse('start_quiz', args=[self.quiz.id]),
+                {f'question_{question_id}': value for question_id, value in self.answers.items()}
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertContains(response, QuizMessage.QUIZ_SUBMISSION_BUSY, status_code=503)
+        self.assertContains(response, f'name="question_{self.question.id}"', status_code=503)
+        release.set()
+        self.lane.close()
+        self.assertFalse(UserSubmission.objects.filter(user=self.user).exists())
+
+    def test_started_write_is_waited_for(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow(items):
+            started.set()
+            release.wait()
+            return items
+
+        self.lane.config['TIMEOUT'] = 0.05
+        threading.Timer(0.2, release.set).start()
+        # Already being written when the timeout passes: its result is waited for.
+        self.assertEqual(self.lane.run(slow, 'item'), 'item')
+        self.assertTrue(started.is_set())
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    """
+    Reads of safe-method requests go to the replicas, except for users who just sent an unsafe request.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.router = routers.PrimaryReplicaRouter()
+
+    def read_alias(self, method, user_id, model=Quiz):
+        aliases = []
+
+        def view(request):
+            routers.set_user(user_id)
+            aliases.append(self.router.db_for_read(model))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(RequestFactory().generic(method, '/'))
+        return aliases[0]
+
+    def test_routing(self):
+        self.assertEqual(self.router.db_for_read(Quiz), 'default')
+        self.assertEqual(self.read_alias('GET', 1), 'replica')
+        self.assertEqual(self.read_alias('GET', 1, Session), 'default')
+        self.assertEqual(self.read_alias('POST', 1), 'default')
+        self.assertEqual(self.router.db_for_write(Quiz), 'default')
+        self.assertFalse(self.router.allow_migrate('replica', 'quiz'))
+        self.assertTrue(self.router.allow_migrate('default', 'quiz'))
+
+    def test_reads_own_writes(self):
+        self.read_alias('POST', 1)
+        self.assertEqual(self.read_alias('GET', 1), 'default')
+        self.assertEqual(self.read_alias('GET', 2), 'replica')
+        cache.clear()
+        self.assertEqual(self.read_alias('GET', 1), 'replica')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.read_alias('GET', 1), 'default')
+
+    def test_primary_reads(self):
+        aliases = []
+
+        def view(request):
+            with routers.primary_reads():
+                aliases.append(self.router.db_for_read(Quiz))
+            aliases.append(self.router.db_for_read(Quiz))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(aliases, ['default', 'replica'])
+
+
+# 'replica' isn't a configured database, so any read routed to it fails.
+@override_settings(DATABASE_REPLICAS=['replica'])
+class CacheRefillTests(TransactionTestCase):
+    """
+    Caches invalidated by a write are refilled from the primary, even by requests reading from replicas.
+    """
+
+    def setUp(self):
+        cache.clear()
+        answer_keys.clear()
+        auth_users.clear()
+        self.user = User.objects.create_user(email='refill@example.com', username='refill', password=PASSWORD)
+        self.quiz = Quiz.objects.create(title='Refill quiz')
+        question = Question.objects.create(quiz=self.quiz, text='Question', question_type='MCQ')
+        Answer.objects.create(question=question, text='Option', is_correct=True)
+        Event.objects.create(event_title='Refill event', event_desc='Seeded', event_date='2099-01-01', location='Pune')
+
+    def test_refills_read_the_primary(self):
+        token = f'Bearer {RefreshToken.for_user(self.user).access_token}'
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=token)
+        # Authenticates (user cache refill) and renders the quiz payload.
+        response = api.get(reverse('start-quiz-api', args=[self.quiz.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['title'], 'Refill quiz')
+
+        def view(request):
+            self.assertEqual([event.event_title for event in upcoming_events()], ['Refill event'])
+            self.assertEqual(len(get_answer_key(Quiz.objects.using('default').get(pk=self.quiz.pk)).questions), 1)
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(RequestFactory().get('/'))
@@ -9,9 +9,14 @@ urlpatterns = [
     path('user/user-detail/', UserDetailAPIView.as_view(), name='user-detail'),
     path('quiz/quiz-list/', QuizListAPIView.as_view(), name='quiz-list'),
     path('quiz/start/<int:quiz_id>/', StartQuizAPI.as_view(), name='start-quiz-api'),
+    path('quiz/submit-batch/', BatchSubmitQuizAPI.as_view(), name='submit-quiz-batch'),
+    path('quiz/leaderboard/<int:quiz_id>/', QuizLeaderboardAPIView.as_view(), name='quiz-leaderboard'),
+    path('quiz/leaderboard/<int:quiz_id>/me/', QuizLeaderboardRankAPIView.as_view(), name='quiz-leaderboard-rank'),
     path('quiz/user-submission-list/', UserSubmissionListView.as_view(), name='user-submission-list'),
     path('quiz/result/<int:submission_id>/', UserResultRetrieveView.as_view(), name='quiz-result'),
     path('quiz/event-list/', EventListAPIView.as_view(), name='event-list'),
-    path('quiz/event-retrieve/<int:id>/', EventRetrieveAPIView.as_view(), name='event-retrieve')    
+    path('quiz/event-search/', EventSearchAPIView.as_view(), name='event-search'),
+    path('quiz/event-retrieve/<int:id>/', EventRetrieveAPIView.as_view(), name='event-retrieve'),
+    path('ops/stats/', OpsStatsAPIView.as_view(), name='ops-stats'),
 
 ]
@@ -1,24 +1,35 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 from django.shortcuts import render
 from django.contrib.auth import authenticate
-from django.db.models import Count
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework import serializers
 from rest_framework.generics import ListAPIView,RetrieveAPIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from drf_spectacular.utils import extend_schema, extend_schema_view,OpenApiExample, inline_serializer, OpenApiResponse, OpenApiParameter
 
 from user_accounts.models import User
-from api.serializers import UserSignupSerializer, UserLoginserializer, UserProfileUpdateSerializer, UserChangePasswordSerializer, UserDetailSerializer,QuizListSerializer, QuizDetailSerializer, QuestionSerializer, SubmitQuizSerializer, UserSubmissionListSerializer, UserSubmissionResultSerializer, EventSerializer
+from user_accounts.authentication import CachedJWTAuthentication, auth_users
+from api.serializers import UserSignupSerializer, UserLoginserializer, UserProfileUpdateSerializer, UserChangePasswordSerializer, UserDetailSerializer,QuizListSerializer, QuizDetailSerializer, QuestionSerializer, SubmitQuizSerializer, BatchSubmitQuizSerializer, BatchSubmissionItemSerializer, UserSubmissionListSerializer, UserSubmissionResultSerializer, LeaderboardEntrySerializer, EventSerializer, EventSearchSerializer
 from quiz.models import Quiz, Question, Answer,UserSubmission, UserAnswer, Event
+from quiz.grading import submit_quiz, submit_batch, answer_keys, result_answers
+from quiz.jobs import enqueue_submission
+from quiz import leaderboard
+from api.cache import get_quiz_payload
+from quiz.cache import upcoming_events
+from quiz.search import search_events, search_quizzes, search_terms
+from api.pagination import KeysetPagination, RankedPagination
+from logentry.writer import get_writer
+from quiz_events.middleware import query_totals
+from quiz_events.write_lane import get_write_lane, WriteLaneBusy
 
-from utils import custom_response, UserMessage, QuizMessage, UserSubmissionMessages, EventMessages
+from utils import custom_response, log_api_call, UserMessage, QuizMessage, UserSubmissionMessages, EventMessages, OpsMessages
 
 # Create your views here.
 
@@ -194,7 +205,7 @@ class UserProfileUpdateAPIView(APIView):
     """
     This class is used to update the current user's profile.
     """        
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     def put(self, request, format=None):
         user = request.user
@@ -255,7 +266,7 @@ class UserChangePasswordAPIView(APIView):
     """
     This class is used to change the current user's password.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     def post(self, request, format=None):
         serializer = UserChangePasswordSerializer(data=request.data, context={'user':request.user})
@@ -314,7 +325,7 @@ class UserDetailAPIView(APIView):
     """
     This class is used to retrieve details of the current logged-in user.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     def get(self, request, format=None):
         try:
@@ -335,29 +346,53 @@ class UserDetailAPIView(APIView):
             )
 
 
+@extend_schema(
+    description=(
+        "Quizzes with at least one question, newest first. With `q`, only the quizzes whose "
+        "title, description or questions contain every word of it, best match first."
+    ),
+    parameters=[OpenApiParameter('q', str, description="Words to search for; the last one may be a prefix.")],
+)
 class QuizListAPIView(ListAPIView):
     """
-    This class is used to list all quizzes.
+    This class is used to list all quizzes, or the ones matching a search.
     """
     queryset = Quiz.objects.all()
     serializer_class = QuizListSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
 
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+
     def get_queryset(self):
-        return Quiz.objects.annotate(
-            question_count=Count("questions")
-        ).filter(question_count__gt=0).order_by('-created_at')
+        return Quiz.objects.filter(question_count__gt=0)
     
     def list(self, request, *args, **kwargs):
+        query = request.query_params.get('q')
+        if search_terms(query):
+            return self.search(request, query)
         response = super().list(request, *args, **kwargs)
         return custom_response(
             request=request,
             data = response.data,
             message=QuizMessage.QUIZ_LIST_SUCCESSFULLY,
             success=1,
-            status_code=status.HTTP_201_CREATED
+            status_code=status.HTTP_201_CREATED,
+            pagination=self.paginator.get_pagination()
+        )
+
+    def search(self, request, query):
+        paginator = RankedPagination()
+        page = paginator.paginate_search(lambda limit, after: search_quizzes(query, limit, after), request)
+        return custom_response(
+            request=request,
+            data=self.get_serializer(page, many=True).data,
+            message=QuizMessage.QUIZ_SEARCH_SUCCESSFULLY,
+            success=1,
+            status_code=status.HTTP_200_OK,
+            pagination=paginator.get_pagination()
         )
 
 
@@ -366,7 +401,8 @@ class QuizListAPIView(ListAPIView):
         summary="Retrieve Quiz Details",
         description="Fetch a quiz with its questions and available answers.",
         parameters=[
-            OpenApiParameter(name="quiz_id", description="Quiz ID", required=True, type=int)
+            OpenApiParameter(name="quiz_id", description="Quiz ID", required=True, type=int),
+            OpenApiParameter(name="If-None-Match", description="ETag of a previously fetched copy", required=False, type=str, location=OpenApiParameter.HEADER)
         ],
         responses={
             200: OpenApiResponse(
@@ -379,6 +415,7 @@ class QuizListAPIView(ListAPIView):
                     }
                 )
             ),
+            304: OpenApiResponse(description="Quiz unchanged since the ETag sent in If-None-Match."),
             400: OpenApiResponse(
                 inline_serializer(
                     name="QuizRetrieveError",
@@ -441,6 +478,24 @@ class QuizListAPIView(ListAPIView):
                 )
             ),
 
+            202: OpenApiResponse(
+                inline_serializer(
+                    name="SubmitQuizQueued",
+                    fields={
+                        "success": serializers.IntegerField(default=1),
+                        "message": serializers.CharField(default="Quiz submission queued for grading."),
+                        "data": inline_serializer(
+                            name="SubmitQuizQueuedData",
+                            fields={
+                                "submission_id": serializers.IntegerField(default=10),
+                                "status": serializers.CharField(default="PENDING"),
+                            }
+                        )
+                    }
+                ),
+                description="Returned instead of 200 when QUIZ_ASYNC_GRADING is enabled."
+            ),
+
             400: OpenApiResponse(
                 inline_serializer(
                     name="SubmitQuizError",
@@ -460,6 +515,17 @@ class QuizListAPIView(ListAPIView):
                     }
                 )
             ),
+
+            503: OpenApiResponse(
+                inline_serializer(
+                    name="SubmitQuizBusy",
+                    fields={
+                        "success": serializers.IntegerField(default=0),
+                        "message": serializers.CharField(default="Quiz submissions are busy, please try again.")
+                    }
+                ),
+                description="The submission wasn't stored and can be sent again after Retry-After seconds."
+            ),
         }
     )
 )
@@ -481,12 +547,11 @@ class StartQuizAPI(APIView):
             }
         }
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     def get(self, request, quiz_id):
-        try:
-            quiz = Quiz.objects.get(id=quiz_id)
-        except Quiz.DoesNotExist:
+        payload = get_quiz_payload(quiz_id)
+        if payload is None:
             return custom_response(
                 request=request,
                 message=QuizMessage.QUIZ_NOT_FOUND,
@@ -494,14 +559,22 @@ class StartQuizAPI(APIView):
                 status_code = status.HTTP_400_BAD_REQUEST
             )
 
-        serializer = QuizDetailSerializer(quiz)
-        return custom_response(
+        # The rendered body is cached per quiz generation, serve it as is.
+        etag, body = payload
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+
+        log_api_call(
             request=request,
-            data=serializer.data,
             message=QuizMessage.QUIZ_RETRIEVE_SUCCESSFULLY,
-            success=1,
-            status_code=status.HTTP_200_OK
+            send_data={'etag': etag},
+            status_code=response.status_code
         )
+        return response
     
 
     def post(self, request, quiz_id):
@@ -526,90 +599,222 @@ class StartQuizAPI(APIView):
             )
 
         answers = serializer.validated_data["answers"]
-        questions = quiz.questions.all()
-
-        submission = UserSubmission.objects.create(
-            quiz=quiz,
-            user=request.user,
-            score=0
-        )
-
-        score = 0
-
-        for q in questions:
-            submitted_answer = answers.get(str(q.id), None)
-
-            # If user did not send this question
-            if not submitted_answer:
-                UserAnswer.objects.create(
-                    submission=submission,
-                    question=q,
-                    answer="",
-                    is_correct=False
-                )
-                continue
+        if settings.QUIZ_ASYNC_GRADING:
+            submission = enqueue_submission(quiz, request.user, answers)
+            return custom_response(
+                request=request,
+                data={'submission_id': submission.id, 'status': submission.status},
+                message=QuizMessage.QUIZ_SUBMISSION_QUEUED,
+                success=1,
+                status_code=status.HTTP_202_ACCEPTED
+            )
 
-            if q.question_type == "MCQ":
-                try:
-                    selected = Answer.objects.get(id=submitted_answer)
-                except Answer.DoesNotExist:
-                    selected = None
+        try:
+            submission = submit_quiz(quiz, request.user, answers)
+        except WriteLaneBusy:
+            # Nothing was stored, so the client can resubmit.
+            response = custom_response(
+                request=request,
+                message=QuizMessage.QUIZ_SUBMISSION_BUSY,
+                success=0,
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+            response['Retry-After'] = '1'
+            return response
 
-                is_correct = selected.is_correct if selected else False
+        return custom_response(
+            request=request,
+            message=QuizMessage.QUIZ_SUBMITTED_SUCCESSFULLY,
+            success=1,
+            score=submission.score,
+            submission_id=submission.id,
+            status_code=status.HTTP_200_OK
+        )
 
-                UserAnswer.objects.create(
-                    submission=submission,
-                    question=q,
-                    answer=selected.text if selected else "",
-                    is_correct=is_correct
-                )
 
-                if is_correct:
-                    score += 1
+@extend_schema(
+    summary="Submit Quiz Attempts in Batch",
+    description=(
+        "Submit many quiz attempts in one request, e.g. when an offline kiosk reconnects.\n"
+        "Every item is graded and stored independently, so a failing item does not "
+        "roll back the others. Results are returned in request order."
+    ),
+    request=inline_serializer(
+        name="BatchSubmitQuizRequest",
+        fields={
+            "submissions": serializers.ListField(child=BatchSubmissionItemSerializer())
+        }
+    ),
+    responses={
+        200: OpenApiResponse(
+            inline_serializer(
+                name="BatchSubmitQuizSuccess",
+                fields={
+                    "success": serializers.IntegerField(default=1),
+                    "message": serializers.CharField(default="Quiz submissions processed successfully."),
+                    "data": inline_serializer(
+                        name="BatchSubmitQuizResults",
+                        fields={
+                            "results": serializers.ListField(child=serializers.DictField())
+                        }
+                    )
+                }
+            )
+        ),
+        400: OpenApiResponse(
+            inline_serializer(
+                name="BatchSubmitQuizError",
+                fields={
+                    "success": serializers.IntegerField(default=0),
+                    "message": serializers.CharField(default="Invalid data provided.")
+                }
+            )
+        ),
+    }
+)
+class BatchSubmitQuizAPI(APIView):
+    """
+    Accepts many quiz attempts of the current user in one request,
+    grades them together and returns a result per attempt.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    def post(self, request, format=None):
+        serializer = BatchSubmitQuizSerializer(data=request.data)
+        if not serializer.is_valid():
+            return custom_response(
+                request=request,
+                message=serializer.errors,
+                success=0,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
 
-            
-            elif q.question_type == "BOOL":
-                correct = q.answers.filter(is_correct=True).first()
-                is_correct = (correct.text.lower() == submitted_answer.lower())
+        results = []
+        items = []
+        positions = []
+        for index, raw_item in enumerate(serializer.validated_data['submissions']):
+            item_serializer = BatchSubmissionItemSerializer(data=raw_item)
+            if item_serializer.is_valid():
+                items.append(item_serializer.validated_data)
+                positions.append(index)
+                results.append(None)
+            else:
+                results.append({'index': index, 'success': 0, 'message': item_serializer.errors})
 
-                UserAnswer.objects.create(
-                    submission=submission,
-                    question=q,
-                    answer=submitted_answer,
-                    is_correct=is_correct
-                )
+        stored = submit_batch(request.user, items) if items else []
+        for index, item, submission in zip(positions, items, stored):
+            result = {'index': index, 'quiz_id': item['quiz_id']}
+            if isinstance(submission, UserSubmission):
+                result.update(success=1, score=submission.score, submission_id=submission.id)
+            elif submission is None:
+                result.update(success=0, message=QuizMessage.QUIZ_NOT_FOUND)
+            elif isinstance(submission, WriteLaneBusy):
+                result.update(success=0, message=QuizMessage.QUIZ_SUBMISSION_BUSY)
+            else:
+                result.update(success=0, message=QuizMessage.QUIZ_SUBMISSION_FAILED)
+            results[index] = result
 
-                if is_correct:
-                    score += 1
+        return custom_response(
+            request=request,
+            data={'results': results},
+            message=QuizMessage.QUIZ_BATCH_PROCESSED_SUCCESSFULLY,
+            success=1,
+            status_code=status.HTTP_200_OK
+        )
 
-            
-            elif q.question_type == "TEXT":
-                correct = q.answers.filter(is_correct=True).first()
 
-                is_correct = (
-                    correct and 
-                    correct.text.strip().lower() == submitted_answer.strip().lower()
-                )
+@extend_schema(
+    summary="Quiz Leaderboard",
+    description="Top users of a quiz by best score; ties go to the earlier submission.",
+    parameters=[
+        OpenApiParameter(name="quiz_id", description="Quiz ID", required=True, type=int),
+        OpenApiParameter(name="limit", description="Number of rows (default 10, max 100)", required=False, type=int),
+    ],
+    responses={
+        200: OpenApiResponse(
+            inline_serializer(
+                name="QuizLeaderboardSuccess",
+                fields={
+                    "success": serializers.IntegerField(default=1),
+                    "message": serializers.CharField(default="Leaderboard fetched successfully."),
+                    "data": LeaderboardEntrySerializer(many=True),
+                }
+            )
+        ),
+    }
+)
+class QuizLeaderboardAPIView(APIView):
+    """
+    This class is used to list the top users of a quiz leaderboard.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    def get(self, request, quiz_id):
+        try:
+            limit = int(request.GET.get('limit', settings.QUIZ_LEADERBOARD_DEFAULT_LIMIT))
+        except ValueError:
+            limit = settings.QUIZ_LEADERBOARD_DEFAULT_LIMIT
+        limit = max(1, min(limit, settings.QUIZ_LEADERBOARD_MAX_LIMIT))
 
-                UserAnswer.objects.create(
-                    submission=submission,
-                    question=q,
-                    answer=submitted_answer,
-                    is_correct=is_correct
-                )
+        serializer = LeaderboardEntrySerializer(leaderboard.top(quiz_id, limit), many=True)
+        return custom_response(
+            request=request,
+            data=serializer.data,
+            message=QuizMessage.LEADERBOARD_FETCHED_SUCCESSFULLY,
+            success=1,
+            status_code=status.HTTP_200_OK
+        )
 
-                if is_correct:
-                    score += 1
 
-        submission.score = score
-        submission.save()
+@extend_schema(
+    summary="My Quiz Rank",
+    description="Rank and best score of the current user on a quiz leaderboard.",
+    parameters=[
+        OpenApiParameter(name="quiz_id", description="Quiz ID", required=True, type=int),
+    ],
+    responses={
+        200: OpenApiResponse(
+            inline_serializer(
+                name="QuizLeaderboardRankSuccess",
+                fields={
+                    "success": serializers.IntegerField(default=1),
+                    "message": serializers.CharField(default="Your rank fetched successfully."),
+                    "data": LeaderboardEntrySerializer(),
+                }
+            )
+        ),
+        404: OpenApiResponse(
+            inline_serializer(
+                name="QuizLeaderboardRankNotFound",
+                fields={
+                    "success": serializers.IntegerField(default=0),
+                    "message": serializers.CharField(default="You have no graded submission for this quiz yet."),
+                }
+            )
+        ),
+    }
+)
+class QuizLeaderboardRankAPIView(APIView):
+    """
+    This class is used to retrieve the current user's rank on a quiz leaderboard.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    def get(self, request, quiz_id):
+        entry = leaderboard.rank_of(quiz_id, request.user.id)
+        if entry is None:
+            return custom_response(
+                request=request,
+                message=QuizMessage.LEADERBOARD_NOT_RANKED,
+                success=0,
+                status_code=status.HTTP_404_NOT_FOUND
+            )
 
         return custom_response(
             request=request,
-            message=QuizMessage.QUIZ_SUBMITTED_SUCCESSFULLY,
+            data=LeaderboardEntrySerializer(entry).data,
+            message=QuizMessage.LEADERBOARD_RANK_FETCHED_SUCCESSFULLY,
             success=1,
-            score=score,
-            submission_id=submission.id,
             status_code=status.HTTP_200_OK
         )
 
@@ -620,12 +825,17 @@ class UserSubmissionListView(ListAPIView):
     """
     queryset = UserSubmission.objects.all()
     serializer_class = UserSubmissionListSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
 
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-submitted_at', '-id')
+
     def get_queryset(self):
-        return UserSubmission.objects.filter(user=self.request.user).select_related('user').order_by('-submitted_at')
+        return UserSubmission.objects.filter(user=self.request.user).select_related(
+            'user__submission_stats', 'quiz'
+        )
     
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -634,7 +844,8 @@ class UserSubmissionListView(ListAPIView):
             data = response.data,
             message=UserSubmissionMessages.USER_SUBMISSION_RETRIEVE_SUCCESSFULLY,
             success=1,
-            status_code=status.HTTP_200_OK
+            status_code=status.HTTP_200_OK,
+            pagination=self.paginator.get_pagination()
         )
     
 
@@ -651,6 +862,23 @@ class UserSubmissionListView(ListAPIView):
             response=UserSubmissionResultSerializer,
             description="Quiz result retrieved successfully"
         ),
+        202: OpenApiResponse(
+            response=inline_serializer(
+                name="PendingResultResponse",
+                fields={
+                    "success": serializers.IntegerField(default=1),
+                    "message": serializers.CharField(default="Your submission is still being graded."),
+                    "data": inline_serializer(
+                        name="PendingResultData",
+                        fields={
+                            "id": serializers.IntegerField(),
+                            "status": serializers.CharField(default="PENDING"),
+                        }
+                    )
+                }
+            ),
+            description="Submission is queued and not graded yet"
+        ),
         404: OpenApiResponse(
             response=inline_serializer(
                 name="NotFoundResponse",
@@ -673,15 +901,25 @@ class UserResultRetrieveView(APIView):
     including all user answers and correctness.
     """
     
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     def get(self, request, submission_id):
         submission = get_object_or_404(
-            UserSubmission, 
+            UserSubmission.objects.select_related('quiz'), 
             id=submission_id, 
             user=request.user   # only fetch current user's submission
         )
 
+        if submission.status == 'PENDING':
+            return custom_response(
+                request=request,
+                data={'id': submission.id, 'status': submission.status},
+                message=UserSubmissionMessages.USER_RESULT_PENDING,
+                success=1,
+                status_code=status.HTTP_202_ACCEPTED
+            )
+
+        result_answers(submission)
         serializer = UserSubmissionResultSerializer(submission)
 
         return custom_response(
@@ -699,13 +937,15 @@ class EventListAPIView(ListAPIView):
     """
     queryset = Event.objects.all()
     serializer_class = EventSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
 
+    pagination_class = KeysetPagination
+    keyset_ordering = ('event_date', 'id')
+
     def get_queryset(self):
-        today = timezone.localdate()
-        return Event.objects.filter(event_date__gte=today)
+        return upcoming_events()
     
     def list(self, request, *args, **kwargs):
         response =  super().list(request, *args, **kwargs)
@@ -714,7 +954,52 @@ class EventListAPIView(ListAPIView):
             data=response.data,
             message=EventMessages.EVENT_FETCHED_SUCCESSFULLY,
             success=1,
-            status_code=status.HTTP_200_OK
+            status_code=status.HTTP_200_OK,
+            pagination=self.paginator.get_pagination()
+        )
+
+
+@extend_schema(
+    summary="Search Events",
+    description=(
+        "Find events by words in their title or description, by exact or prefix location "
+        "and by an inclusive date range. Results are ordered by date and paginated with a cursor."
+    ),
+    parameters=[EventSearchSerializer],
+)
+class EventSearchAPIView(ListAPIView):
+    """
+    This class is used to search events by keyword, location and date range.
+    """
+    queryset = Event.objects.all()
+    serializer_class = EventSerializer
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('event_date', 'id')
+
+    def get_queryset(self):
+        return search_events(**self.filters)
+
+    def list(self, request, *args, **kwargs):
+        filters = EventSearchSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return custom_response(
+                request=request,
+                message=filters.errors,
+                success=0,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        self.filters = filters.validated_data
+
+        response = super().list(request, *args, **kwargs)
+        return custom_response(
+            request=request,
+            data=response.data,
+            message=EventMessages.EVENT_SEARCH_SUCCESSFULLY,
+            success=1,
+            status_code=status.HTTP_200_OK,
+            pagination=self.paginator.get_pagination()
         )
 
 
@@ -725,7 +1010,7 @@ class EventRetrieveAPIView(RetrieveAPIView):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     lookup_url_kwarg = 'id'
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def retrieve(self, request, *args, **kwargs):
@@ -736,4 +1021,28 @@ class EventRetrieveAPIView(RetrieveAPIView):
             message=EventMessages.EVENT_FETCHED_SUCCESSFULLY,
             success=1,
             status_code=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+class OpsStatsAPIView(APIView):
+    """
+    This class is used to report in-process runtime counters (log writer queue, write lane,
+    answer key and authenticated user caches, queries per database alias) of the worker that
+    serves the request. Staff only.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, format=None):
+        return custom_response(
+            request=request,
+            data={
+                'log_writer': get_writer().stats(),
+                'write_lane': get_write_lane().stats(),
+                'answer_key_cache': answer_keys.stats(),
+                'auth_user_cache': auth_users.stats(),
+                'db_queries': query_totals.stats(),
+            },
+            message=OpsMessages.STATS_FETCHED_SUCCESSFULLY,
+            success=1,
+            status_code=status.HTTP_200_OK
+        )
@@ -1,13 +1,17 @@
 from django.contrib import admin
-from logentry.models import LogEntry
+from logentry.models import LogEntry, LogEntryHourlyRollup
+from quiz_events.paginator import EstimatedCountPaginator
 
 # Register your models here.
 
 @admin.register(LogEntry)
 class LogEntryModelAdmin(admin.ModelAdmin):
     list_display = ['id','user','ip_address','api_name', 'api_type','date_time']
-    search_fields = ['user','api_name','api_type','date_time']
+    search_fields = ['user','api_name','api_type']
     readonly_fields = ['id', 'user', 'ip_address', 'api_name', 'api_type', 'date_time']
+    date_hierarchy = 'date_time'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     
     def has_add_permission(self, request):
@@ -16,4 +20,15 @@ class LogEntryModelAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
-    
\ No newline at end of file
+
+@admin.register(LogEntryHourlyRollup)
+class LogEntryHourlyRollupModelAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'api_type', 'api_name', 'status', 'count']
+    search_fields = ['api_name']
+    readonly_fields = ['hour', 'api_name', 'api_type', 'status', 'count']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+from django.conf import settings
+
+POLICIES = ('none', 'digest', 'prefix')
+
+_encoder = json.JSONEncoder(default=str, separators=(',', ':'))
+
+
+class Capture:
+    """
+    Deferred capture of a logged payload.
+
+    Nothing is serialized when the entry is recorded; resolve() runs later on the
+    log writer thread and only serializes when the policy needs it:
+
+    none   - store an empty string.
+    digest - store the size and a short SHA-1 of the JSON payload.
+    prefix - store the first PREFIX_LENGTH characters of the JSON payload.
+    """
+
+    __slots__ = ('policy', 'value')
+
+    def __init__(self, policy, value):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown capture policy: {policy!r}")
+        self.policy = policy
+        self.value = value
+
+    def resolve(self):
+        if self.policy == 'none' or self.value is None:
+            return ''
+        if self.policy == 'digest':
+            text = _encoder.encode(self.value)
+            return f"{len(text)}:{hashlib.sha1(text.encode()).hexdigest()[:16]}"
+
+        # Stop encoding as soon as the prefix is complete.
+        limit = prefix_length()
+        parts = []
+        size = 0
+        for chunk in _encoder.iterencode(self.value):
+            parts.append(chunk)
+            size += len(chunk)
+            if size >= limit:
+                break
+        return ''.join(parts)[:limit]
+
+
+def prefix_length():
+    # LogEntry.send_data/get_data hold at most 100 characters.
+    return min(settings.LOGENTRY_CAPTURE.get('PREFIX_LENGTH', 100), 100)
+
+
+def policy_for(request):
+    """
+    Capture policy of the endpoint serving `request`, looked up by URL name.
+    """
+    config = settings.LOGENTRY_CAPTURE
+    match = getattr(request, 'resolver_match', None)
+    url_name = match.url_name if match else None
+    return config.get('ENDPOINTS', {}).get(url_name, config.get('DEFAULT', 'digest'))
+
+
+def resolve_entry(entry):
+    """
+    Return the entry with every Capture replaced by its stored string.
+    """
+    return {key: value.resolve() if isinstance(value, Capture) else value for key, value in entry.items()}
@@ -0,0 +1,72 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from logentry.capture import Capture, POLICIES
+
+
+class Command(BaseCommand):
+    help = "Compare the per-response cost of the LogEntry payload capture policies."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=50, help="Questions in the sample quiz payload.")
+        parser.add_argument('--submissions', type=int, default=200, help="Rows in the sample submission list payload.")
+        parser.add_argument('--repeat', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        payloads = {
+            'quiz detail': self.quiz_payload(options['questions']),
+            'submission list': self.submission_payload(options['submissions']),
+        }
+        repeat = options['repeat']
+
+        self.stdout.write(f"{'payload':<16} {'policy':<12} {'request us':>11} {'total us':>9} {'stored':>7}")
+        for name, payload in payloads.items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                stored = json.dumps(payload)
+            legacy = (time.perf_counter() - started) / repeat * 1e6
+            self.stdout.write(f"{name:<16} {'json.dumps':<12} {legacy:>11.2f} {legacy:>9.2f} {len(stored):>7}")
+
+            for policy in POLICIES:
+                # Request path: only the Capture is built, serialization happens on the writer thread.
+                started = time.perf_counter()
+                captures = [Capture(policy, payload) for _ in range(repeat)]
+                request_cost = (time.perf_counter() - started) / repeat * 1e6
+                started = time.perf_counter()
+                for capture in captures:
+                    stored = capture.resolve()
+                total = request_cost + (time.perf_counter() - started) / repeat * 1e6
+                self.stdout.write(f"{name:<16} {policy:<12} {request_cost:>11.2f} {total:>9.2f} {len(stored):>7}")
+
+    def quiz_payload(self, questions):
+        return {
+            'id': 1,
+            'title': 'Sample quiz',
+            'description': 'Payload shaped like StartQuizAPI.get',
+            'questions': [
+                {
+                    'id': i,
+                    'text': f"Question number {i} of the sample quiz?",
+                    'question_type': 'MCQ',
+                    'answers': [{'id': i * 4 + j, 'text': f"Option {j}"} for j in range(4)],
+                }
+                for i in range(questions)
+            ],
+        }
+
+    def submission_payload(self, rows):
+        return [
+            {
+                'id': i,
+                'quiz': {'id': i % 20, 'title': 'Sample quiz', 'description': 'Description',
+                         'created_at': '2026-01-01T10:00:00+05:30', 'updated_at': '2026-01-01T10:00:00+05:30'},
+                'user': {'first_name': 'Sample', 'last_name': 'User', 'username': 'sample', 'email': 'sample@example.com',
+                         'profile_pic': 'http://localhost/media/defaultuser/Anonymous-User.png'},
+                'score': 7.0,
+                'total_submission': rows,
+                'submitted_at': '2026-01-01T10:00:00+05:30',
+            }
+            for i in range(rows)
+        ]
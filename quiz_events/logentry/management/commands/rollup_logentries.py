@@ -0,0 +1,57 @@
+import datetime
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from logentry.models import LogEntry, LogEntryHourlyRollup
+
+
+class Command(BaseCommand):
+    help = "Fold LogEntry rows older than the retention window into hourly rollups and delete them in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.LOGENTRY_RETENTION_DAYS,
+                            help="Keep raw entries of the last N days.")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows rolled up and deleted per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many rows would be rolled up.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = LogEntry.objects.filter(date_time__lt=cutoff).order_by()
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} log entries older than {cutoff:%Y-%m-%d %H:%M} would be rolled up.")
+            return
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                ids = list(expired.order_by('id').values_list('id', flat=True)[:options['chunk_size']])
+                if not ids:
+                    break
+                # Rows with an id up to the last one of the chunk are exactly the chunk.
+                chunk = expired.filter(id__lte=ids[-1])
+                self.merge(chunk)
+                chunk.delete()
+            total += len(ids)
+            self.stdout.write(f"Rolled up {total} log entries...")
+
+        self.stdout.write(self.style.SUCCESS(f"Rolled up and deleted {total} log entries older than {options['days']} days."))
+
+    def merge(self, chunk):
+        buckets = (
+            chunk.annotate(hour=TruncHour('date_time', tzinfo=datetime.timezone.utc))
+            .values('hour', 'api_name', 'api_type', 'status')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        for bucket in buckets:
+            n = bucket.pop('n')
+            updated = LogEntryHourlyRollup.objects.filter(**bucket).update(count=F('count') + n)
+            if not updated:
+                LogEntryHourlyRollup.objects.create(count=n, **bucket)
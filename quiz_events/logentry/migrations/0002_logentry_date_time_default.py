@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logentry', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='logentry',
+            name='date_time',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logentry', '0002_logentry_date_time_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogEntryHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('api_name', models.CharField(max_length=100)),
+                ('api_type', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Log Entry Hourly Rollup',
+                'verbose_name_plural': 'Log Entry Hourly Rollups',
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='logentry',
+            index=models.Index(fields=['-date_time'], name='logentry_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logentry',
+            index=models.Index(fields=['api_name', '-date_time'], name='logentry_api_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logentry',
+            index=models.Index(fields=['user', '-date_time'], name='logentry_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logentryhourlyrollup',
+            index=models.Index(fields=['api_name', '-hour'], name='logentry_rollup_api_hour_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='logentryhourlyrollup',
+            constraint=models.UniqueConstraint(fields=('hour', 'api_name', 'api_type', 'status'), name='logentry_rollup_unique_bucket'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -12,12 +13,43 @@ class LogEntry(models.Model):
     send_data = models.CharField(max_length=100)
     get_data = models.CharField(max_length=100)
     status = models.CharField(max_length=100)
-    date_time = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is recorded, not when a buffered batch reaches the database.
+    date_time = models.DateTimeField(default=timezone.now)
 
     class Meta:
         verbose_name = "Log Entry"           
         verbose_name_plural = "Log Entries"  
         ordering = ['-date_time']  
+        indexes = [
+            models.Index(fields=['-date_time'], name='logentry_date_time_idx'),
+            models.Index(fields=['api_name', '-date_time'], name='logentry_api_date_idx'),
+            models.Index(fields=['user', '-date_time'], name='logentry_user_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user} - {self.api_name} - {self.date_time}"
+
+
+class LogEntryHourlyRollup(models.Model):
+    """
+    Hourly request counts kept after old LogEntry rows are pruned (see `manage.py rollup_logentries`).
+    """
+    hour = models.DateTimeField()
+    api_name = models.CharField(max_length=100)
+    api_type = models.CharField(max_length=100)
+    status = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Log Entry Hourly Rollup"
+        verbose_name_plural = "Log Entry Hourly Rollups"
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'api_name', 'api_type', 'status'], name='logentry_rollup_unique_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['api_name', '-hour'], name='logentry_rollup_api_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hour} - {self.api_type} {self.api_name} - {self.status}: {self.count}"
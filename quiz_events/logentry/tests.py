@@ -1,3 +1,142 @@
-from django.test import TestCase
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from logentry import writer
+from logentry.capture import Capture
+from logentry.models import LogEntry
+from logentry.writer import LogWriter, get_config, write_log_entry
+
+
+class RecordingSink:
+    """
+    Keeps the batches it is given; `written` is set once `expected` entries arrived.
+    """
+
+    def __init__(self, expected=1):
+        self.batches = []
+        self.expected = expected
+        self.written = threading.Event()
+        self.closed = False
+
+    def write(self, entries):
+        self.batches.append(entries)
+        if sum(map(len, self.batches)) >= self.expected:
+            self.written.set()
+
+    def close(self):
+        self.closed = True
+
+
+def entry(number):
+    return {'message': f'Entry {number}', 'send_data': Capture('prefix', {'number': number})}
+
+
+class LogWriterTests(SimpleTestCase):
+    """
+    The buffered writer flushes on size and on interval, applies its overflow policy and flushes on exit.
+    """
+
+    def make_writer(self, expected=1, **config):
+        log_writer = LogWriter({**get_config(), 'SINK': 'stdout', **config})
+        log_writer.sink = RecordingSink(expected)
+        self.addCleanup(log_writer.close)
+        return log_writer
+
+    def test_tests_write_synchronously(self):
+        self.assertFalse(settings.LOGENTRY_WRITER['ASYNC'])
+
+    def test_flush_on_size(self):
+        log_writer = self.make_writer(expected=3, BATCH_SIZE=3, FLUSH_INTERVAL=2)
+        for number in range(3):
+            log_writer.submit(entry(number))
+        # Long before the interval.
+        self.assertTrue(log_writer.sink.written.wait(1))
+        self.assertEqual([[item['message'] for item in batch] for batch in log_writer.sink.batches], [
+            ['Entry 0', 'Entry 1', 'Entry 2'],
+        ])
+        self.assertEqual(log_writer.sink.batches[0][0]['send_data'], '{"number":0}')
+        self.assertEqual(log_writer.stats()['written'], 3)
+
+    def test_flush_on_interval(self):
+        log_writer = self.make_writer(BATCH_SIZE=100, FLUSH_INTERVAL=0.05)
+        started = time.monotonic()
+        log_writer.submit(entry(0))
+        self.assertTrue(log_writer.sink.written.wait(5))
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+        self.assertEqual(len(log_writer.sink.batches[0]), 1)
+
+    def test_drop_when_full(self):
+        log_writer = self.make_writer(MAX_QUEUE_SIZE=2, OVERFLOW='drop')
+        with mock.patch.object(log_writer, '_ensure_thread'):
+            results = [log_writer.submit(entry(number)) for number in range(3)]
+        self.assertEqual(results, [True, True, False])
+        stats = log_writer.stats()
+        self.assertEqual((stats['enqueued'], stats['dropped'], stats['queue_depth']), (2, 1, 2))
+
+    def test_block_when_full(self):
+        log_writer = self.make_writer(expected=2, MAX_QUEUE_SIZE=1, OVERFLOW='block', BLOCK_TIMEOUT=0.05)
+        with mock.patch.object(log_writer, '_ensure_thread'):
+            log_writer.submit(entry(0))
+            started = time.monotonic()
+            # Waits BLOCK_TIMEOUT for room, then drops.
+            self.assertFalse(log_writer.submit(entry(1)))
+            self.assertGreaterEqual(time.monotonic() - started, 0.04)
+            self.assertEqual(log_writer.stats()['dropped'], 1)
+
+            # Room made while it waits: queued, not dropped.
+            log_writer.config['BLOCK_TIMEOUT'] = 5
+            threading.Timer(0.05, log_writer.queue.get).start()
+            self.assertTrue(log_writer.submit(entry(2)))
+        self.assertEqual(log_writer.stats()['dropped'], 1)
+
+    def test_flush_at_exit(self):
+        sink = RecordingSink(expected=5)
+        with mock.patch.object(writer, '_writer', None), mock.patch('logentry.writer.atexit.register') as register, \
+                mock.patch('logentry.writer.build_sink', return_value=sink), \
+                mock.patch.dict(settings.LOGENTRY_WRITER, {'FLUSH_INTERVAL': 0.5, 'BATCH_SIZE': 100}):
+            log_writer = writer.get_writer()
+        self.addCleanup(log_writer.close)
+        register.assert_called_once_with(log_writer.close)
+        for number in range(5):
+            log_writer.submit(entry(number))
+        self.assertFalse(sink.written.is_set())
+
+        # What atexit runs: the queued entries are written before the thread stops.
+        register.call_args.args[0]()
+        self.assertTrue(sink.written.is_set())
+        self.assertEqual(sum(map(len, sink.batches)), 5)
+        self.assertFalse(log_writer._thread.is_alive())
+        self.assertTrue(sink.closed)
+
+
+class DatabaseSinkTests(TestCase):
+    """
+    Entries reach the LogEntry table, one bulk insert per batch.
+    """
+
+    def log_entry(self, number):
+        return {
+            'user': 'anonymous user', 'ip_address': '127.0.0.1', 'message': f'Entry {number}',
+            'api_name': '/api/quiz/quiz-list/', 'api_type': 'GET', 'status': '200',
+            'send_data': Capture('digest', {'number': number}), 'get_data': Capture('none', {}),
+            'date_time': timezone.now(),
+        }
+
+    def test_batch(self):
+        log_writer = LogWriter({**get_config(), 'SINK': 'database'})
+        with mock.patch.object(log_writer, '_ensure_thread'):
+            for number in range(3):
+                log_writer.submit(self.log_entry(number))
+        with self.assertNumQueries(1):
+            log_writer.flush()
+        self.assertEqual(LogEntry.objects.count(), 3)
+        self.assertEqual(LogEntry.objects.filter(get_data='').count(), 3)
+
+    def test_synchronous(self):
+        self.assertTrue(write_log_entry(self.log_entry(0)))
+        self.assertEqual(LogEntry.objects.get().message, 'Entry 0')
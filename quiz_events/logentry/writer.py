@@ -0,0 +1,259 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from logentry.capture import resolve_entry
+from logentry.models import LogEntry
+
+DEFAULTS = {
+    'SINK': 'database',
+    'ASYNC': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_QUEUE_SIZE': 10000,
+    'OVERFLOW': 'drop',
+    'BLOCK_TIMEOUT': 0.05,
+    'JSONL_PATH': 'logs/api-log.jsonl',
+    'JSONL_MAX_BYTES': 50 * 1024 * 1024,
+    'JSONL_BACKUP_COUNT': 5,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'LOGENTRY_WRITER', {})}
+
+
+class DatabaseSink:
+    """
+    Writes entries to the LogEntry table with one bulk_create per batch.
+    """
+
+    def write(self, entries):
+        try:
+            LogEntry.objects.bulk_create([LogEntry(**entry) for entry in entries])
+        except Exception:
+            # Start the next batch on a fresh connection.
+            connection.close()
+            raise
+
+    def close(self):
+        connection.close()
+
+
+class JsonlFileSink:
+    """
+    Appends entries as JSON lines to a size-rotated file.
+    """
+
+    def __init__(self, path, max_bytes, backup_count):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        self.handler.setFormatter(logging.Formatter('%(message)s'))
+
+    def write(self, entries):
+        for entry in entries:
+            line = json.dumps(entry, default=str)
+            self.handler.emit(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO}))
+        self.handler.flush()
+
+    def close(self):
+        self.handler.close()
+
+
+class StdoutSink:
+    """
+    Prints entries as JSON lines, useful when a log collector reads the process output.
+    """
+
+    def write(self, entries):
+        sys.stdout.write(''.join(json.dumps(entry, default=str) + '\n' for entry in entries))
+        sys.stdout.flush()
+
+    def close(self):
+        pass
+
+
+def build_sink(config):
+    if config['SINK'] == 'database':
+        return DatabaseSink()
+    if config['SINK'] == 'jsonl':
+        return JsonlFileSink(config['JSONL_PATH'], config['JSONL_MAX_BYTES'], config['JSONL_BACKUP_COUNT'])
+    if config['SINK'] == 'stdout':
+        return StdoutSink()
+    raise ValueError(f"Unknown LOGENTRY_WRITER sink: {config['SINK']!r}")
+
+
+class LogWriter:
+    """
+    Bounded in-process buffer of log entries flushed to a sink by a background thread,
+    when BATCH_SIZE entries are queued or FLUSH_INTERVAL seconds have passed.
+
+    When the queue is full, entries are dropped ('drop') or the caller waits up to
+    BLOCK_TIMEOUT seconds for room before dropping ('block').
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.sink = build_sink(config)
+        self.queue = queue.Queue(maxsize=config['MAX_QUEUE_SIZE'])
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._stats_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Also restarts the thread in a child process after a fork.
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='logentry-writer', daemon=True)
+            self._thread.start()
+
+    def submit(self, entry):
+        self._ensure_thread()
+        try:
+            if self.config['OVERFLOW'] == 'block':
+                self.queue.put(entry, timeout=self.config['BLOCK_TIMEOUT'])
+            else:
+                self.queue.put_nowait(entry)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def _take(self, wait):
+        """
+        Collect up to BATCH_SIZE entries, waiting at most `wait` seconds for the first ones.
+        """
+        batch = []
+        deadline = time.monotonic() + wait
+        while len(batch) < self.config['BATCH_SIZE']:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def write_batch(self, batch):
+        if not batch:
+            return
+        with self._write_lock:
+            try:
+                self.sink.write([resolve_entry(entry) for entry in batch])
+            except Exception:
+                logger.exception("Could not write %d log entries", len(batch))
+                with self._stats_lock:
+                    self.failed += len(batch)
+            else:
+                with self._stats_lock:
+                    self.written += len(batch)
+                    self.flushes += 1
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                self.write_batch(self._take(self.config['FLUSH_INTERVAL']))
+            self.flush()
+        finally:
+            self.sink.close()
+
+    def flush(self):
+        """
+        Synchronously write everything queued so far.
+        """
+        while True:
+            batch = self._take(0)
+            if not batch:
+                break
+            self.write_batch(batch)
+
+    def close(self):
+        """
+        Stop the background thread after it wrote what is still queued.
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.config['FLUSH_INTERVAL'] + 5)
+        else:
+            self.flush()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'sink': self.config['SINK'],
+                'queue_depth': self.queue.qsize(),
+                'max_queue_size': self.config['MAX_QUEUE_SIZE'],
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'flushes': self.flushes,
+            }
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = LogWriter(get_config())
+                atexit.register(_writer.close)
+    return _writer
+
+
+def write_log_entry(entry):
+    """
+    Record a LogEntry (given as a dict of field values, payloads as logentry.capture.Capture)
+    through the configured sink, buffered unless LOGENTRY_WRITER['ASYNC'] is False.
+    """
+    config = get_config()
+    if config['ASYNC']:
+        return get_writer().submit(entry)
+
+    if config['SINK'] == 'database':
+        LogEntry.objects.create(**resolve_entry(entry))
+    else:
+        get_writer().write_batch([entry])
+    return True
+
+
+async def awrite_log_entry(entry):
+    """
+    write_log_entry for async views. With the buffered writer and OVERFLOW 'drop' the entry
+    is queued without leaving the event loop; otherwise the write, or the wait for room, runs in a thread.
+    """
+    config = get_config()
+    if config['ASYNC'] and config['OVERFLOW'] != 'block':
+        return get_writer().submit(entry)
+    return await sync_to_async(write_log_entry)(entry)
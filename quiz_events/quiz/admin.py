@@ -1,39 +1,92 @@
 from django.contrib import admin
-from quiz.models import Quiz, Question, Answer, UserSubmission, UserAnswer, Event
+from django.db.models import Q
+from django.db.models.functions import Lower
+from quiz.models import Quiz, Question, Answer, UserSubmission, UserAnswer, GradingJob, UserSubmissionStats, Event
+from quiz.search import matching_events, matching_quizzes, prefix_range
+from quiz_events.paginator import EstimatedCountPaginator
 
 # Register your models here.
 
 @admin.register(Quiz)
 class QuizModelAdmin(admin.ModelAdmin):
     list_display = ['id','title','created_at','updated_at']
-    search_fields = ['title', 'created_at']
+    search_fields = ['title', 'description', 'questions__text']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text indexes of quizzes and questions, instead of LIKE scans over a join.
+        return queryset.filter(matching_quizzes(search_term)), False
 
 @admin.register(Question)
 class QuestionModelAdmin(admin.ModelAdmin):
     list_display = ['id', 'quiz','question_type','created_at']
     search_fields = ['question_type']
+    list_select_related = ['quiz']
+    raw_id_fields = ['quiz']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Answer)
 class AnswerModelAdmin(admin.ModelAdmin):
     list_display = ['id', 'question']
+    list_select_related = ['question']
+    raw_id_fields = ['question']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(UserSubmission)
 class UserSubmissionModelAdmin(admin.ModelAdmin):
     list_display = ['id','quiz','user', 'submitted_at']
-    search_fields = ['user','submitted_at']
+    # Exact matches use the unique indexes on the user table.
+    search_fields = ['=user__username', '=user__email']
+    list_select_related = ['quiz', 'user']
+    raw_id_fields = ['quiz', 'user']
+    date_hierarchy = 'submitted_at'
+    # Same order as submission_submitted_at_idx, so drill-downs read pages straight from it.
+    ordering = ['-submitted_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(UserAnswer)
 class UserAnswerModelAdmin(admin.ModelAdmin):
     list_display = ['submission','question','is_correct']
-    
+    list_select_related = ['submission', 'question']
+    raw_id_fields = ['submission', 'question']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(GradingJob)
+class GradingJobModelAdmin(admin.ModelAdmin):
+    list_display = ['id', 'submission', 'status', 'attempts', 'created_at', 'claimed_at']
+    list_filter = ['status']
+    list_select_related = ['submission']
+    readonly_fields = ['submission', 'answers', 'attempts', 'claim_token', 'claimed_at', 'created_at']
+
+
+@admin.register(UserSubmissionStats)
+class UserSubmissionStatsModelAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total_submissions', 'best_score', 'last_submitted_at']
+    list_select_related = ['user']
+    readonly_fields = ['user', 'total_submissions', 'score_sum', 'best_score', 'last_submitted_at']
+
 
 @admin.register(Event)
 class EventModelAdmin(admin.ModelAdmin):
     list_display = ['id','event_title', 'event_date', 'location']
     search_fields = ['event_title', 'location']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text index for title/description and the location index, instead of LIKE scans.
+        if not search_term.strip():
+            return queryset, False
+        low, high = prefix_range(search_term.strip().lower())
+        location = Q(pk__in=Event.objects.annotate(location_key=Lower('location')).filter(
+            location_key__gte=low, location_key__lt=high
+        ).values('pk'))
+        return queryset.filter(matching_events(search_term) | location), False
         
 
 
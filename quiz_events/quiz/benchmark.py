@@ -0,0 +1,163 @@
+import asyncio
+import io
+import itertools
+import json
+import math
+import sys
+import time
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run a benchmark inside a transaction that is always rolled back,
+    so fixtures created for the run never reach the database.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(func, repeat=1):
+    """
+    Call func `repeat` times and return (latencies in ms, queries per call).
+    """
+    latencies = []
+    queries = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            func()
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(ctx.captured_queries))
+    return latencies, queries
+
+
+def summarize(latencies, queries=None):
+    """
+    Summary statistics of a measured run, rounded for printing or JSON output.
+    """
+    summary = {
+        'count': len(latencies),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+    }
+    if queries is not None:
+        summary['queries'] = round(sum(queries) / len(queries), 2) if queries else 0
+    return summary
+
+
+SYLLABLES = ['ka', 'ri', 'to', 'mel', 'san', 'dra', 'vi', 'lo', 'pen', 'tur', 'sha', 'no', 'bel', 'qu', 'zen', 'ar']
+
+
+def zipf_vocabulary(rng, size=8000):
+    """
+    Made-up words with cumulative Zipf weights, for rng.choices(words, cum_weights=weights):
+    a few words are everywhere, most are rare.
+    """
+    words = sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size)})
+    rng.shuffle(words)
+    return words, list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+
+
+async def asgi_request(app, method, path, query_string='', body=None, headers=()):
+    """
+    Send one HTTP request straight to an ASGI application, without a server or sockets,
+    and return its status code. `body` is sent as JSON, `headers` are (name, value) strings.
+    """
+    body = json.dumps(body).encode() if body is not None else b''
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [
+            (b'host', b'localhost'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            *((name.lower().encode(), value.encode()) for name, value in headers),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    response = {}
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # Never disconnect: Django stops listening once the response is sent.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+
+    await app(scope, receive, send)
+    return response['status']
+
+
+def wsgi_request(app, method, path, query_string='', headers=()):
+    """
+    Send one bodiless HTTP request straight to a WSGI application and return its status code.
+    """
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        **{f"HTTP_{name.upper().replace('-', '_')}": value for name, value in headers},
+    }
+    response = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        response['status'] = int(status.split()[0])
+
+    result = app(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status']
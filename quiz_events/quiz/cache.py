@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from quiz.models import Event
+from quiz_events.routers import primary_reads
+
+EVENTS_GENERATION_KEY = 'events-generation'
+
+
+def _generation_key(quiz_id):
+    return f"quiz-generation:{quiz_id}"
+
+
+def _generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+async def _ageneration(key):
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def quiz_generation(quiz_id):
+    """
+    Opaque token that changes every time the quiz, its questions or answers change.
+    Cache entries derived from a quiz should include it in their key.
+    """
+    return _generation(_generation_key(quiz_id))
+
+
+async def aquiz_generation(quiz_id):
+    return await _ageneration(_generation_key(quiz_id))
+
+
+def invalidate_quiz(quiz_id):
+    """
+    Start a new generation for the quiz so entries cached under the old one are never read again.
+
+    Runs once the current transaction commits: a request rendering the quiz before then
+    would read the old rows and cache them under the new generation.
+    """
+    transaction.on_commit(lambda: cache.set(_generation_key(quiz_id), uuid.uuid4().hex, None))
+
+
+def _until_midnight(today):
+    midnight = timezone.make_aware(datetime.combine(today + timedelta(days=1), time.min))
+    return max(1, int((midnight - timezone.now()).total_seconds()) + 1)
+
+
+def upcoming_events():
+    """
+    Events from today on in (event_date, id) order, shared by the API and web event lists.
+
+    The key includes the local date, so the list rolls over at local midnight, when the
+    entry also expires. Saving or deleting an event starts a new generation. The list
+    is read from the primary database.
+    """
+    today = timezone.localdate()
+    key = f"upcoming-events:{today.isoformat()}:{_generation(EVENTS_GENERATION_KEY)}"
+    events = cache.get(key)
+    if events is None:
+        with primary_reads():
+            events = list(Event.objects.filter(event_date__gte=today).order_by('event_date', 'id'))
+        cache.set(key, events, _until_midnight(today))
+    return events
+
+
+async def aupcoming_events():
+    today = timezone.localdate()
+    key = f"upcoming-events:{today.isoformat()}:{await _ageneration(EVENTS_GENERATION_KEY)}"
+    events = await cache.aget(key)
+    if events is None:
+        with primary_reads():
+            events = [event async for event in Event.objects.filter(event_date__gte=today).order_by('event_date', 'id')]
+        await cache.aset(key, events, _until_midnight(today))
+    return events
+
+
+def invalidate_events():
+    """
+    Start a new generation of the upcoming events list, once the current transaction commits.
+    """
+    transaction.on_commit(lambda: cache.set(EVENTS_GENERATION_KEY, uuid.uuid4().hex, None))
@@ -0,0 +1,263 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Prefetch, prefetch_related_objects
+
+from quiz import leaderboard, user_stats
+from quiz.models import Quiz, Question, UserSubmission, UserAnswer
+from quiz_events.routers import primary_reads
+from quiz_events.write_lane import get_write_lane
+
+
+def normalize(value):
+    """
+    Normalize a BOOL/TEXT answer so it can be compared with the answer key.
+    """
+    return str(value).strip().lower()
+
+
+class AnswerKey:
+    """
+    Compact, in-memory answer key of a single quiz.
+
+    questions: list of (question_id, question_type) in question order.
+    options:   {question_id: {answer_id: (text, is_correct)}} for MCQ questions.
+    correct:   {question_id: normalized correct text} for BOOL/TEXT questions.
+    texts:     {question_id: (question text, correct answer text or None)}, snapshotted on UserAnswer.
+    """
+
+    def __init__(self, quiz_id):
+        self.quiz_id = quiz_id
+        self.questions = []
+        self.options = {}
+        self.correct = {}
+        self.texts = {}
+
+    @classmethod
+    def load(cls, quiz_id):
+        """
+        Build the answer key of a quiz with a single query.
+        """
+        key = cls(quiz_id)
+        rows = Question.objects.filter(quiz_id=quiz_id).order_by('id', 'answers__id').values_list(
+            'id', 'question_type', 'text', 'answers__id', 'answers__text', 'answers__is_correct'
+        )
+        for question_id, question_type, question_text, answer_id, answer_text, is_correct in rows:
+            if not key.questions or key.questions[-1][0] != question_id:
+                key.questions.append((question_id, question_type))
+                key.texts[question_id] = (question_text, None)
+                if question_type == 'MCQ':
+                    key.options[question_id] = {}
+            if answer_id is None:
+                continue
+            if is_correct and key.texts[question_id][1] is None:
+                key.texts[question_id] = (question_text, answer_text)
+            if question_type == 'MCQ':
+                key.options[question_id][answer_id] = (answer_text, is_correct)
+            elif is_correct and question_id not in key.correct:
+                key.correct[question_id] = normalize(answer_text)
+        return key
+
+    def grade(self, answers):
+        """
+        Grade a mapping of question_id -> submitted value in memory.
+        Returns the score and a list of
+        (question_id, stored_answer, is_correct, question_text, correct_answer).
+        """
+        score = 0
+        graded = []
+        for question_id, question_type in self.questions:
+            submitted = answers.get(str(question_id))
+            if not submitted:
+                graded.append((question_id, "", False, *self.texts[question_id]))
+                continue
+
+            if question_type == 'MCQ':
+                try:
+                    selected = self.options[question_id].get(int(submitted))
+                except (TypeError, ValueError):
+                    selected = None
+                stored = selected[0] if selected else ""
+                is_correct = bool(selected and selected[1])
+            else:
+                stored = str(submitted)
+                correct = self.correct.get(question_id)
+                is_correct = correct is not None and correct == normalize(submitted)
+
+            if is_correct:
+                score += 1
+            graded.append((question_id, stored, is_correct, *self.texts[question_id]))
+        return score, graded
+
+
+class AnswerKeyCache:
+    """
+    Per-process LRU cache of answer keys keyed by quiz id and quiz version.
+
+    Quiz.version is bumped whenever the quiz, a question or an answer changes,
+    so an entry is only reused while the version read with the quiz row matches.
+    Keys are loaded from the primary database.
+    """
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, quiz_id, version):
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(quiz_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with primary_reads():
+            key = AnswerKey.load(quiz_id)
+        with self._lock:
+            self._entries[quiz_id] = (version, key)
+            self._entries.move_to_end(quiz_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return key
+
+    def evict(self, quiz_id):
+        with self._lock:
+            self._entries.pop(quiz_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+answer_keys = AnswerKeyCache(getattr(settings, 'ANSWER_KEY_CACHE_SIZE', 512))
+
+
+def get_answer_key(quiz):
+    """
+    Answer key of a quiz instance, served from the cache while quiz.version is current.
+    """
+    return answer_keys.get(quiz.id, quiz.version)
+
+
+def store_answers(graded_submissions):
+    """
+    Insert the UserAnswer rows of already saved (submission, graded answers) pairs
+    with a single bulk_create.
+    """
+    UserAnswer.objects.bulk_create([
+        UserAnswer(
+            submission=submission, question_id=question_id, answer=answer, is_correct=is_correct,
+            question_text=question_text, correct_answer=correct_answer,
+        )
+        for submission, graded in graded_submissions
+        for question_id, answer, is_correct, question_text, correct_answer in graded
+    ])
+
+
+def result_answers(submission):
+    """
+    Answers of a submission with their question text and correct answer, in a fixed
+    number of queries. Prefetched on the submission, so submission.answers.all() reuses them.
+    Rows stored before snapshots existed are filled in memory from their questions.
+    """
+    prefetch_related_objects([submission], Prefetch('answers', queryset=UserAnswer.objects.order_by('id')))
+    answers = submission.answers.all()
+    legacy = [answer for answer in answers if answer.question_text is None]
+    if legacy:
+        prefetch_related_objects(legacy, 'question__answers')
+        for answer in legacy:
+            correct = [option for option in answer.question.answers.all() if option.is_correct]
+            answer.question_text = answer.question.text
+            answer.correct_answer = min(correct, key=lambda option: option.pk).text if correct else None
+    return answers
+
+
+def after_grading(submissions):
+    """
+    Update everything derived from graded submissions.
+    Runs inside the transaction that stores them.
+    """
+    leaderboard.record_submissions(submissions)
+    user_stats.record_submissions(submissions)
+
+
+def _store(graded_submissions):
+    """
+    Insert (submission, graded answers) pairs with one bulk_create per table.
+    Must run inside a transaction.
+    """
+    submissions = [submission for submission, graded in graded_submissions]
+    if connection.features.can_return_rows_from_bulk_insert:
+        UserSubmission.objects.bulk_create(submissions)
+    else:
+        for submission in submissions:
+            submission.save()
+    store_answers(graded_submissions)
+    after_grading(submissions)
+
+
+def store_submissions(graded_submissions):
+    """
+    Write lane handler storing (submission, graded answers) pairs, see _store.
+    Returns the stored submissions.
+    """
+    for submission, graded in graded_submissions:
+        # A retried pair may still carry the primary key of a rolled back insert.
+        submission.pk = None
+        submission._state.adding = True
+    _store(graded_submissions)
+    return [submission for submission, graded in graded_submissions]
+
+
+def submit_quiz(quiz, user, answers, client_submitted_at=None):
+    """
+    Grade the submitted answers of a quiz and store the submission.
+    All UserAnswer rows are written with a single bulk_create inside one transaction,
+    shared with the submissions of other requests when the write lane is enabled.
+    """
+    score, graded = get_answer_key(quiz).grade(answers)
+    submission = UserSubmission(quiz=quiz, user=user, score=score, client_submitted_at=client_submitted_at)
+    return get_write_lane().run(store_submissions, (submission, graded))
+
+
+def submit_batch(user, items):
+    """
+    Grade many submissions of one user together.
+
+    items is a list of dicts with quiz_id, answers and an optional client_timestamp.
+    Quizzes are fetched with one query and each distinct answer key is loaded once.
+    Returns a list aligned with items holding the stored UserSubmission, None when
+    the quiz does not exist, or the exception raised while storing that item.
+    """
+    quizzes = Quiz.objects.in_bulk({item['quiz_id'] for item in items})
+    results = [None] * len(items)
+    graded_submissions = []
+    positions = []
+
+    for index, item in enumerate(items):
+        quiz = quizzes.get(item['quiz_id'])
+        if quiz is None:
+            continue
+        score, graded = get_answer_key(quiz).grade(item['answers'])
+        submission = UserSubmission(
+            quiz=quiz, user=user, score=score, client_submitted_at=item.get('client_timestamp')
+        )
+        graded_submissions.append((submission, graded))
+        positions.append(index)
+
+    # Stored in one transaction; if it fails, one transaction per item so a bad item does not sink the batch.
+    stored = get_write_lane().run_many(store_submissions, graded_submissions)
+    for index, result in zip(positions, stored):
+        results[index] = result
+    return results
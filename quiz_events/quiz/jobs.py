@@ -0,0 +1,98 @@
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from quiz.models import UserSubmission, GradingJob
+from quiz.grading import get_answer_key, store_answers, after_grading
+
+
+def enqueue_submission(quiz, user, answers):
+    """
+    Store a pending submission with its raw answers for the grading worker.
+    """
+    with transaction.atomic():
+        submission = UserSubmission.objects.create(quiz=quiz, user=user, score=0, status='PENDING')
+        GradingJob.objects.create(submission=submission, answers=dict(answers))
+    return submission
+
+
+def claim_jobs(limit):
+    """
+    Atomically move up to `limit` queued jobs to RUNNING and return them.
+    The status check in the UPDATE makes concurrent workers skip each other's jobs.
+    """
+    ids = list(
+        GradingJob.objects.filter(status='QUEUED').order_by('id').values_list('id', flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    GradingJob.objects.filter(id__in=ids, status='QUEUED').update(
+        status='RUNNING', claim_token=token, claimed_at=timezone.now(), attempts=F('attempts') + 1
+    )
+    return list(GradingJob.objects.filter(claim_token=token).select_related('submission__quiz'))
+
+
+def requeue_stale_jobs(seconds):
+    """
+    Put back jobs left RUNNING by a worker that died, returns the number requeued.
+    """
+    cutoff = timezone.now() - timedelta(seconds=seconds)
+    return GradingJob.objects.filter(status='RUNNING', claimed_at__lt=cutoff).update(status='QUEUED', claim_token='')
+
+
+def _finish(graded_jobs):
+    submissions = [submission for job, submission, graded in graded_jobs]
+    store_answers([(submission, graded) for job, submission, graded in graded_jobs])
+    UserSubmission.objects.bulk_update(submissions, ['score', 'status'])
+    after_grading(submissions)
+    GradingJob.objects.filter(pk__in=[job.pk for job, submission, graded in graded_jobs]).update(
+        status='DONE', error=''
+    )
+
+
+def _fail(job, error, max_attempts):
+    job.status = 'FAILED' if job.attempts >= max_attempts else 'QUEUED'
+    job.error = str(error)
+    job.claim_token = ''
+    job.save(update_fields=['status', 'error', 'claim_token'])
+
+
+def grade_jobs(jobs, max_attempts=3):
+    """
+    Grade claimed jobs and store all their answers in one transaction.
+    Falls back to one transaction per job when the batch cannot be stored.
+    A job that can't be graded (e.g. malformed answers) fails right away, as retrying
+    it gives the same error; one that can't be stored is requeued until max_attempts.
+    Returns (graded, failed) counts.
+    """
+    graded_jobs = []
+    failed = 0
+    for job in jobs:
+        submission = job.submission
+        try:
+            submission.score, graded = get_answer_key(submission.quiz).grade(job.answers)
+        except Exception as error:
+            _fail(job, error, max_attempts=0)
+            failed += 1
+            continue
+        submission.status = 'GRADED'
+        graded_jobs.append((job, submission, graded))
+
+    if not graded_jobs:
+        return 0, failed
+    try:
+        with transaction.atomic():
+            _finish(graded_jobs)
+    except Exception:
+        for item in graded_jobs:
+            try:
+                with transaction.atomic():
+                    _finish([item])
+            except Exception as error:
+                _fail(item[0], error, max_attempts)
+                failed += 1
+    return len(jobs) - failed, failed
@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from quiz.models import LeaderboardEntry, LeaderboardBucket, UserSubmission
+
+# Equal scores reached at the same time are ordered by user, so top() and rank_of() agree.
+RANK_ORDER = ('-best_score', 'achieved_at', 'user_id')
+
+
+def _best_per_user(submissions):
+    """
+    Best (score, submitted_at) submission of every (quiz, user) pair in `submissions`.
+    """
+    best = {}
+    for submission in submissions:
+        key = (submission.quiz_id, submission.user_id)
+        current = best.get(key)
+        if current is None or (-submission.score, submission.submitted_at) < (-current.score, current.submitted_at):
+            best[key] = submission
+    return best
+
+
+def move_entry(quiz_id, old_score, new_score):
+    """
+    Move an entry of a quiz leaderboard from the bucket of old_score to the bucket of
+    new_score; None for an entry added or removed.
+    """
+    if old_score == new_score:
+        return
+    if old_score is not None:
+        LeaderboardBucket.objects.filter(quiz_id=quiz_id, score=old_score).update(entries=F('entries') - 1)
+    if new_score is not None:
+        buckets = LeaderboardBucket.objects.filter(quiz_id=quiz_id, score=new_score)
+        if not buckets.update(entries=F('entries') + 1):
+            # The first entry with this score; get_or_create covers a concurrent first one.
+            if not LeaderboardBucket.objects.get_or_create(quiz_id=quiz_id, score=new_score, defaults={'entries': 1})[1]:
+                buckets.update(entries=F('entries') + 1)
+
+
+def record_submissions(submissions):
+    """
+    Fold newly graded submissions into the leaderboard.
+    Only improves an entry: a higher score, or the same score reached earlier.
+    Runs inside the transaction that stores the submissions.
+    """
+    for (quiz_id, user_id), submission in _best_per_user(submissions).items():
+        # Locked, so the score it moves out of is the one replaced.
+        entry, created = LeaderboardEntry.objects.select_for_update().get_or_create(
+            quiz_id=quiz_id,
+            user_id=user_id,
+            defaults={
+                'submission': submission,
+                'best_score': submission.score,
+                'achieved_at': submission.submitted_at,
+            },
+        )
+        if created:
+            move_entry(quiz_id, None, submission.score)
+            continue
+        # Conditional update so concurrent graders can never lower a best score.
+        improved = LeaderboardEntry.objects.filter(pk=entry.pk).filter(
+            Q(best_score__lt=submission.score)
+            | Q(best_score=submission.score, achieved_at__gt=submission.submitted_at)
+        ).update(best_score=submission.score, achieved_at=submission.submitted_at, submission=submission)
+        if improved:
+            move_entry(quiz_id, entry.best_score, submission.score)
+
+
+def top(quiz_id, limit):
+    """
+    First `limit` entries of a quiz leaderboard, read in index order, with a rank attribute set.
+    """
+    entries = list(
+        LeaderboardEntry.objects.filter(quiz_id=quiz_id)
+        .select_related('user')
+        .order_by(*RANK_ORDER)[:limit]
+    )
+    for position, entry in enumerate(entries, start=1):
+        entry.rank = position
+    return entries
+
+
+def rank_of(quiz_id, user_id):
+    """
+    Leaderboard entry of a user with its rank set, or None if the user has no graded submission.
+
+    The rank is one plus the entries ahead of it: the entries of the score buckets above
+    its score, and the entries tied on its score that reached it earlier, counted on the
+    (quiz, -best_score, achieved_at, user) index. Its cost follows the number of distinct
+    scores and the size of its own score bucket, not its rank. One query.
+    """
+    higher = LeaderboardBucket.objects.filter(
+        quiz_id=OuterRef('quiz_id'), score__gt=OuterRef('best_score')
+    ).order_by().values('quiz').annotate(total=Sum('entries')).values('total')
+    tied_ahead = LeaderboardEntry.objects.filter(
+        quiz_id=OuterRef('quiz_id'), best_score=OuterRef('best_score')
+    ).filter(
+        Q(achieved_at__lt=OuterRef('achieved_at'))
+        | Q(achieved_at=OuterRef('achieved_at'), user_id__lt=OuterRef('user_id'))
+    ).order_by().values('quiz').annotate(total=Count('id')).values('total')
+    entry = (
+        LeaderboardEntry.objects.filter(quiz_id=quiz_id, user_id=user_id)
+        .select_related('user')
+        .annotate(higher=Coalesce(Subquery(higher), 0), tied_ahead=Coalesce(Subquery(tied_ahead), 0))
+        .first()
+    )
+    if entry is None:
+        return None
+    entry.rank = entry.higher + entry.tied_ahead + 1
+    return entry
+
+
+def rebuild(quiz_id, chunk_size=5000):
+    """
+    Recompute the leaderboard of a quiz from its graded submissions.
+    """
+    rows = (
+        UserSubmission.objects.filter(quiz_id=quiz_id, status='GRADED')
+        .order_by('user_id', '-score', 'submitted_at', 'id')
+        .values_list('id', 'user_id', 'score', 'submitted_at')
+    )
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(quiz_id=quiz_id).delete()
+        LeaderboardBucket.objects.filter(quiz_id=quiz_id).delete()
+        entries = []
+        previous_user = None
+        created = 0
+        for submission_id, user_id, score, submitted_at in rows.iterator(chunk_size=chunk_size):
+            if user_id == previous_user:
+                continue
+            previous_user = user_id
+            entries.append(LeaderboardEntry(
+                quiz_id=quiz_id, user_id=user_id, submission_id=submission_id,
+                best_score=score, achieved_at=submitted_at,
+            ))
+            if len(entries) >= chunk_size:
+                LeaderboardEntry.objects.bulk_create(entries)
+                created += len(entries)
+                entries = []
+        LeaderboardEntry.objects.bulk_create(entries)
+        counts = (
+            LeaderboardEntry.objects.filter(quiz_id=quiz_id)
+            .order_by().values('best_score').annotate(total=Count('id'))
+        )
+        LeaderboardBucket.objects.bulk_create(
+            LeaderboardBucket(quiz_id=quiz_id, score=row['best_score'], entries=row['total']) for row in counts
+        )
+    return created + len(entries)
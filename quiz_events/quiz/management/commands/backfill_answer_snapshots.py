@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+
+from quiz.models import Question, Answer, UserAnswer
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the question text and correct answer onto UserAnswer rows graded before snapshots existed. "
+        "Uses the current answer key of each question."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000, help="UserAnswer ids updated per statement.")
+
+    def handle(self, *args, **options):
+        pending = UserAnswer.objects.filter(question_text__isnull=True)
+        bounds = pending.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write(self.style.SUCCESS("No answers to backfill."))
+            return
+
+        question_text = Question.objects.filter(pk=OuterRef('question_id')).values('text')[:1]
+        correct_answer = Answer.objects.filter(
+            question_id=OuterRef('question_id'), is_correct=True
+        ).order_by('id').values('text')[:1]
+
+        updated = 0
+        chunk_size = options['chunk_size']
+        for start in range(bounds['first'], bounds['last'] + 1, chunk_size):
+            # One UPDATE per id range keeps each write transaction short.
+            with transaction.atomic():
+                updated += pending.filter(id__gte=start, id__lt=start + chunk_size).update(
+                    question_text=Subquery(question_text),
+                    correct_answer=Subquery(correct_answer),
+                )
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Up to id {start + chunk_size - 1}: {updated} answers")
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} answers."))
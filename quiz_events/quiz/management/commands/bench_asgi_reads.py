@@ -0,0 +1,122 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from quiz.benchmark import asgi_request, wsgi_request, summarize
+from quiz.grading import submit_quiz
+from quiz.models import Quiz, Event
+from quiz_events.asgi import application as asgi_application
+from quiz_events.wsgi import application as wsgi_application
+from user_accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the read API endpoints (quiz list, quiz detail, submission list, result, events) "
+        "with many concurrent connections: sync views under WSGI with a thread per connection, "
+        "the same views under ASGI, and the async views of api.async_views under ASGI."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=500, help="Requests in flight at once.")
+        parser.add_argument('--requests', type=int, default=5000, help="Requests per run.")
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        quizzes = list(Quiz.objects.filter(question_count__gt=0).order_by('id')[:50])
+        if not quizzes:
+            raise CommandError("No quiz with questions to read, run seed_data first.")
+        rng = random.Random(options['seed'])
+        suffix = int(time.time())
+
+        # The handlers query on their own threads, so the fixtures are committed and deleted afterwards.
+        users = User.objects.bulk_create([
+            User(email=f'bench-reads-{suffix}-{number}@example.com', username=f'bench-reads-{suffix}-{number}',
+                 password='!', profile_pic='defaultuser/Anonymous-User.png')
+            for number in range(options['users'])
+        ])
+        today = timezone.localdate()
+        events = Event.objects.bulk_create([
+            Event(event_title=f'Bench reads {suffix} {number}', event_desc='Benchmark event',
+                  event_date=today + timedelta(days=number), location=rng.choice(['Pune', 'Mumbai', 'Delhi']))
+            for number in range(20)
+        ])
+        try:
+            submissions = [submit_quiz(rng.choice(quizzes), user, {}) for user in users for _ in range(3)]
+            requests = self.build_requests(options['requests'], rng, quizzes, submissions, events)
+
+            self.stdout.write(f"{options['requests']} requests, {options['connections']} connections")
+            self.stdout.write(
+                f"{'server':<14} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+            )
+            runs = [
+                ('wsgi, sync', lambda: self.run_wsgi(requests, options['connections'])),
+                # A plain ASGIHandler routes through quiz_events.urls, i.e. the sync DRF views.
+                ('asgi, sync', lambda: asyncio.run(self.run_asgi(ASGIHandler(), requests, options['connections']))),
+                ('asgi, async', lambda: asyncio.run(self.run_asgi(asgi_application, requests, options['connections']))),
+            ]
+            for name, run in runs:
+                started = time.perf_counter()
+                results = run()
+                elapsed = time.perf_counter() - started
+                summary = summarize([latency for _, latency in results])
+                errors = sum(1 for status, _ in results if status >= 400)
+                self.stdout.write(
+                    f"{name:<14} {len(results) / elapsed:>8.1f} {summary['p50_ms']:>9} "
+                    f"{summary['p95_ms']:>9} {summary['p99_ms']:>9} {errors:>7}"
+                )
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            Event.objects.filter(pk__in=[event.pk for event in events]).delete()
+
+    def build_requests(self, count, rng, quizzes, submissions, events):
+        """
+        (path, query string, headers) of `count` requests spread over the read endpoints,
+        each sent by the owner of the submission it reads.
+        """
+        requests = []
+        for _ in range(count):
+            submission = rng.choice(submissions)
+            headers = [('Authorization', f'Bearer {AccessToken.for_user(submission.user)}')]
+            path, query = rng.choice([
+                (reverse('quiz-list'), ''),
+                (reverse('start-quiz-api', args=[rng.choice(quizzes).id]), ''),
+                (reverse('user-submission-list'), ''),
+                (reverse('quiz-result', args=[submission.id]), ''),
+                (reverse('event-list'), ''),
+                (reverse('event-search'), 'q=benchmark&location_prefix=pu'),
+                (reverse('event-retrieve', args=[rng.choice(events).id]), ''),
+            ])
+            requests.append((path, query, headers))
+        return requests
+
+    def run_wsgi(self, requests, connections):
+        def send(request):
+            started = time.perf_counter()
+            status = wsgi_request(wsgi_application, 'GET', *request)
+            return status, (time.perf_counter() - started) * 1000
+
+        # Like a threaded server: one thread per open connection.
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return list(executor.map(send, requests))
+
+    async def run_asgi(self, app, requests, connections):
+        slots = asyncio.Semaphore(connections)
+
+        async def send(request):
+            path, query_string, headers = request
+            async with slots:
+                started = time.perf_counter()
+                status = await asgi_request(app, 'GET', path, query_string, headers=headers)
+                return status, (time.perf_counter() - started) * 1000
+
+        return await asyncio.gather(*(send(request) for request in requests))
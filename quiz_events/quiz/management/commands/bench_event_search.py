@@ -0,0 +1,82 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from quiz.benchmark import rolled_back, measure, summarize, zipf_vocabulary
+from quiz.models import Event
+from quiz.search import search_events
+
+CITIES = ['Pune', 'Mumbai', 'Delhi', 'Bengaluru', 'Chennai', 'Kolkata', 'Hyderabad', 'Ahmedabad', 'Jaipur', 'Surat']
+
+
+class Command(BaseCommand):
+    help = "Benchmark event search (full-text, location and date filters) against LIKE scans on a large table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--chunk-size', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--analyze', action='store_true', help="Run ANALYZE after inserting, as PRAGMA optimize would.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words, weights = zipf_vocabulary(rng)
+        common, rare = words[5], words[3000]
+
+        # Events are inserted inside a transaction that is rolled back at the end.
+        with rolled_back():
+            started = time.perf_counter()
+            self.insert_events(options['events'], options['chunk_size'], rng, words, weights)
+            self.stdout.write(f"Inserted {options['events']} events in {time.perf_counter() - started:.1f}s")
+            if options['analyze']:
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+
+            start = date(2026, 1, 1)
+            cases = [
+                ('keyword', lambda: search_events(query=rare)),
+                ('two keywords', lambda: search_events(query=f'{common} {rare}')),
+                ('keyword prefix', lambda: search_events(query=rare[:-1])),
+                ('location', lambda: search_events(location='pune')),
+                ('location prefix', lambda: search_events(location_prefix='ben')),
+                ('date range', lambda: search_events(date_from=start, date_to=start + timedelta(days=30))),
+                ('combined', lambda: search_events(
+                    query=common, location_prefix='mum', date_from=start, date_to=start + timedelta(days=180)
+                )),
+                ('LIKE keyword', lambda: Event.objects.filter(
+                    Q(event_title__icontains=rare) | Q(event_desc__icontains=rare)
+                ).order_by('event_date', 'id')),
+                ('LIKE location', lambda: Event.objects.filter(location__istartswith='ben').order_by('event_date', 'id')),
+            ]
+            self.stdout.write(f"Common word {common!r}, rare word {rare!r}")
+            self.stdout.write(f"{'case':<16} {'rows':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+            for name, build in cases:
+                rows = build().count()
+                # One page, the way the search API reads it.
+                latencies, queries = measure(lambda: list(build()[:50]), options['repeat'])
+                result = summarize(latencies, queries)
+                self.stdout.write(
+                    f"{name:<16} {rows:>8} {result['mean_ms']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9}"
+                )
+
+    def insert_events(self, count, chunk_size, rng, words, weights):
+        table = connection.ops.quote_name(Event._meta.db_table)
+        adapt = connection.ops.adapt_datefield_value
+        first_day = date(2024, 1, 1)
+        with connection.cursor() as cursor:
+            for start in range(0, count, chunk_size):
+                rows = []
+                for _ in range(min(chunk_size, count - start)):
+                    title = ' '.join(rng.choices(words, cum_weights=weights, k=3)).title()
+                    description = ' '.join(rng.choices(words, cum_weights=weights, k=12))
+                    location = rng.choice(CITIES)
+                    rows.append((title, description, adapt(first_day + timedelta(days=rng.randrange(1500))), location))
+                cursor.executemany(
+                    f"INSERT INTO {table} (event_title, event_desc, event_date, location) VALUES (%s, %s, %s, %s)",
+                    rows,
+                )
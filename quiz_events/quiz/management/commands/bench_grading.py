@@ -0,0 +1,79 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from quiz.benchmark import rolled_back, measure, summarize
+from quiz.grading import submit_quiz, answer_keys
+from quiz.models import Quiz, Question, Answer
+from user_accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Benchmark quiz submission grading (query count and latency per submission)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000', help="Comma separated question counts.")
+        parser.add_argument('--repeat', type=int, default=20, help="Submissions per quiz size.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--cold', action='store_true', help="Evict the cached answer key before every submission.")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        rng = random.Random(options['seed'])
+
+        # Fixtures are created inside a transaction that is rolled back at the end.
+        with rolled_back():
+            user = User.objects.create_user(email='bench-grading@example.com', username='bench-grading', password=None)
+            self.stdout.write(
+                f"{'questions':>10} {'queries':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'hits':>6} {'misses':>6}"
+            )
+            for size in sizes:
+                quiz, answers = self.build_quiz(size, rng)
+                answer_keys.clear()
+
+                def submit():
+                    if options['cold']:
+                        answer_keys.evict(quiz.id)
+                    submit_quiz(quiz, user, answers)
+
+                latencies, queries = measure(submit, options['repeat'])
+                result = summarize(latencies, queries)
+                stats = answer_keys.stats()
+                self.stdout.write(
+                    f"{size:>10} {result['queries']:>8} {result['mean_ms']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9}"
+                    f" {stats['hits']:>6} {stats['misses']:>6}"
+                )
+
+    def build_quiz(self, size, rng):
+        """
+        Create a quiz with `size` questions of mixed type and a plausible submission for it.
+        """
+        quiz = Quiz.objects.create(title=f"Grading benchmark ({size} questions)")
+        questions = Question.objects.bulk_create([
+            Question(quiz=quiz, text=f"Question {i}", question_type=rng.choice(['MCQ', 'BOOL', 'TEXT']))
+            for i in range(size)
+        ])
+        options = []
+        for question in questions:
+            if question.question_type == 'MCQ':
+                correct = rng.randrange(4)
+                options.extend(Answer(question=question, text=f"Option {i}", is_correct=i == correct) for i in range(4))
+            elif question.question_type == 'BOOL':
+                options.append(Answer(question=question, text=rng.choice(['true', 'false']), is_correct=True))
+            else:
+                options.append(Answer(question=question, text=f"answer {question.id}", is_correct=True))
+        options = Answer.objects.bulk_create(options)
+        quiz.refresh_from_db()
+
+        answers = {}
+        by_question = {}
+        for answer in options:
+            by_question.setdefault(answer.question_id, []).append(answer)
+        for question in questions:
+            if question.question_type == 'MCQ':
+                answers[str(question.id)] = str(rng.choice(by_question[question.id]).id)
+            elif question.question_type == 'BOOL':
+                answers[str(question.id)] = rng.choice(['true', 'false'])
+            else:
+                answers[str(question.id)] = rng.choice([f"answer {question.id}", "wrong"])
+        return quiz, answers
@@ -0,0 +1,120 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from quiz.benchmark import rolled_back, measure, summarize, zipf_vocabulary
+from quiz.models import Quiz, Question
+from quiz.search import search_quizzes, reindex_quizzes
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ranked quiz and question search on a large catalogue, "
+        "with the cost of keeping the index up to date on writes, against LIKE scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quizzes', type=int, default=100000)
+        parser.add_argument('--questions', type=int, default=50, help="Questions per quiz.")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--chunk-size', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words, weights = zipf_vocabulary(rng)
+        common, medium, rare = words[5], words[200], words[3000]
+        limit = options['page_size']
+
+        # Quizzes and questions are inserted inside a transaction that is rolled back at the end.
+        with rolled_back():
+            started = time.perf_counter()
+            self.insert_catalogue(options['quizzes'], options['questions'], options['chunk_size'], rng, words, weights)
+            self.stdout.write(
+                f"Inserted {options['quizzes']} quizzes and {options['quizzes'] * options['questions']} "
+                f"questions in {time.perf_counter() - started:.1f}s"
+            )
+
+            def deep_page(text, pages=5):
+                after = None
+                for _ in range(pages):
+                    page = search_quizzes(text, limit, after)
+                    if not page:
+                        break
+                    after = (page[-1].search_rank, page[-1].id)
+                return page
+
+            cases = [
+                ('rare word', lambda: search_quizzes(rare, limit), options['repeat']),
+                ('medium word', lambda: search_quizzes(medium, limit), options['repeat']),
+                ('common word', lambda: search_quizzes(common, limit), options['repeat']),
+                ('two words', lambda: search_quizzes(f'{common} {medium}', limit), options['repeat']),
+                ('prefix', lambda: search_quizzes(medium[:-1], limit), options['repeat']),
+                ('5th page', lambda: deep_page(medium), options['repeat']),
+                # LIKE scans of 5M questions take seconds, a few runs are enough.
+                ('LIKE medium', lambda: list(Quiz.objects.filter(
+                    Q(title__icontains=medium) | Q(description__icontains=medium)
+                    | Q(id__in=Question.objects.filter(text__icontains=medium).values('quiz_id')),
+                    question_count__gt=0,
+                ).order_by('id')[:limit]), min(3, options['repeat'])),
+            ]
+            self.stdout.write(f"Words: common {common!r}, medium {medium!r}, rare {rare!r}")
+            self.stdout.write(f"{'case':<14} {'rows':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+            for name, search, repeat in cases:
+                rows = len(search())
+                result = summarize(*measure(search, repeat))
+                self.stdout.write(f"{name:<14} {rows:>6} {result['mean_ms']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9}")
+
+            quiz = Quiz.objects.filter(question_count__gt=0).order_by('id').first()
+            writes = [
+                ('add question', lambda: Question.objects.create(
+                    quiz=quiz, text=' '.join(rng.choices(words, cum_weights=weights, k=8)), question_type='TEXT'
+                )),
+                ('edit title', lambda: Quiz.objects.filter(pk=quiz.pk).update(
+                    title=' '.join(rng.choices(words, cum_weights=weights, k=4))
+                )),
+            ]
+            for name, write in writes:
+                result = summarize(*measure(write, options['repeat']))
+                self.stdout.write(f"{name:<14} {'':>6} {result['mean_ms']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9}")
+
+    def insert_catalogue(self, quizzes, questions, chunk_size, rng, words, weights):
+        """
+        Plain executemany INSERTs, then one search document per quiz, as QuestionQuerySet.bulk_create does.
+        """
+        quiz_table = connection.ops.quote_name(Quiz._meta.db_table)
+        question_table = connection.ops.quote_name(Question._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {quiz_table}")
+            first_id = cursor.fetchone()[0] + 1
+            per_chunk = max(1, chunk_size // max(1, questions))
+            for start in range(first_id, first_id + quizzes, per_chunk):
+                ids = range(start, min(start + per_chunk, first_id + quizzes))
+                cursor.executemany(
+                    f"INSERT INTO {quiz_table} (id, title, description, created_at, updated_at, version, question_count) "
+                    f"VALUES (%s, %s, %s, %s, %s, 0, %s)",
+                    [
+                        (
+                            quiz_id,
+                            ' '.join(rng.choices(words, cum_weights=weights, k=4)).title(),
+                            ' '.join(rng.choices(words, cum_weights=weights, k=15)),
+                            now, now, questions,
+                        )
+                        for quiz_id in ids
+                    ],
+                )
+                cursor.executemany(
+                    f"INSERT INTO {question_table} (quiz_id, text, question_type, created_at) VALUES (%s, %s, 'TEXT', %s)",
+                    [
+                        (quiz_id, ' '.join(rng.choices(words, cum_weights=weights, k=8)) + '?', now)
+                        for quiz_id in ids
+                        for _ in range(questions)
+                    ],
+                )
+                reindex_quizzes(ids)
@@ -0,0 +1,156 @@
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+from django.utils import timezone
+
+from logentry.writer import get_writer, write_log_entry
+from quiz.benchmark import summarize
+from quiz.grading import get_answer_key, submit_quiz
+from quiz.models import Quiz, UserSubmission
+from quiz_events.write_lane import get_write_lane
+from user_accounts.models import User
+
+# Django's SQLite defaults: rollback journal, deferred transactions, 5 s busy timeout.
+DEFAULT_OPTIONS = {}
+
+
+class Command(BaseCommand):
+    help = (
+        "Contention benchmark of SQLite writes: N writer threads submitting quizzes (and logging "
+        "each request) while readers list submissions, with Django's default SQLite options and "
+        "with the profile of settings.DATABASES, each without and with the write lane."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=32)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per case.")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("This benchmark is for SQLite databases.")
+        quizzes = list(Quiz.objects.filter(question_count__gt=0).order_by('id')[:20])
+        if not quizzes:
+            raise CommandError("No quiz with questions to submit, run seed_data first.")
+        keys = {quiz.id: get_answer_key(quiz) for quiz in quizzes}
+        suffix = int(time.time())
+        # The writers commit for real, so the users and their submissions are deleted afterwards.
+        users = User.objects.bulk_create([
+            User(email=f'bench-writes-{suffix}-{number}@example.com', username=f'bench-writes-{suffix}-{number}',
+                 password='!', profile_pic='defaultuser/Anonymous-User.png')
+            for number in range(options['writers'])
+        ])
+
+        settings_dict = connection.settings_dict
+        tuned_options = settings_dict.get('OPTIONS', {})
+        lane = get_write_lane()
+        lane_config = lane.config
+        cases = [
+            ('default', DEFAULT_OPTIONS, False),
+            ('default + lane', DEFAULT_OPTIONS, True),
+            ('tuned', tuned_options, False),
+            ('tuned + lane', tuned_options, True),
+        ]
+        self.stdout.write(
+            f"{options['writers']} writers, {options['readers']} readers, {options['duration']}s per case"
+        )
+        self.stdout.write(
+            f"{'case':<16} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>9} {'errors':>7} "
+            f"{'reads/s':>8} {'read p95':>9} {'read err':>9} {'writes/commit':>14}"
+        )
+        try:
+            for name, db_options, use_lane in cases:
+                self.use_options(settings_dict, db_options)
+                lane.config = {**lane_config, 'ENABLED': use_lane}
+                before = lane.stats()
+                writes, reads = self.run_case(users, quizzes, keys, options)
+                after = lane.stats()
+                commits = after['commits'] - before['commits']
+                per_commit = (after['submitted'] - before['submitted']) / commits if commits else 1.0
+                write, read = summarize(writes['latencies']), summarize(reads['latencies'])
+                self.stdout.write(
+                    f"{name:<16} {len(writes['latencies']) / options['duration']:>9.1f} {write['p50_ms']:>8} "
+                    f"{write['p95_ms']:>8} {write['p99_ms']:>9} {writes['errors']:>7} "
+                    f"{len(reads['latencies']) / options['duration']:>8.1f} {read['p95_ms']:>9} {reads['errors']:>9} "
+                    f"{per_commit:>14.1f}"
+                )
+        finally:
+            self.use_options(settings_dict, tuned_options)
+            lane.config = lane_config
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def use_options(self, settings_dict, db_options):
+        """
+        Connect with other database OPTIONS from now on. Every thread's connection is
+        closed first, the background writers' too, since the journal mode can only be
+        left while no other connection is open.
+        """
+        get_writer().close()
+        get_write_lane().close()
+        connection.close()
+        settings_dict['OPTIONS'] = db_options
+        if db_options is DEFAULT_OPTIONS:
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode=DELETE")
+        else:
+            connection.ensure_connection()
+
+    def run_case(self, users, quizzes, keys, options):
+        stop = threading.Event()
+        writes = {'latencies': [], 'errors': 0}
+        reads = {'latencies': [], 'errors': 0}
+        lock = threading.Lock()
+
+        def writer(number):
+            rng = random.Random(options['seed'] + number)
+            user = users[number]
+            try:
+                while not stop.is_set():
+                    quiz = rng.choice(quizzes)
+                    answers = {str(question_id): 'true' for question_id, _ in keys[quiz.id].questions}
+                    started = time.perf_counter()
+                    try:
+                        submit_quiz(quiz, user, answers)
+                        # Every request also logs, through the LogEntry writer thread as configured.
+                        write_log_entry(dict(
+                            user=str(user), ip_address='127.0.0.1', message='bench', api_name='/bench/',
+                            api_type='POST', send_data='', get_data='', status='200', date_time=timezone.now(),
+                        ))
+                    except DatabaseError:
+                        with lock:
+                            writes['errors'] += 1
+                    else:
+                        with lock:
+                            writes['latencies'].append((time.perf_counter() - started) * 1000)
+            finally:
+                connections.close_all()
+
+        def reader(number):
+            user = users[number % len(users)]
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        list(UserSubmission.objects.filter(user=user).order_by('-submitted_at', '-id')[:50])
+                    except DatabaseError:
+                        with lock:
+                            reads['errors'] += 1
+                    else:
+                        with lock:
+                            reads['latencies'].append((time.perf_counter() - started) * 1000)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer, args=(number,)) for number in range(options['writers'])]
+        threads += [threading.Thread(target=reader, args=(number,)) for number in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return writes, reads
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from quiz.models import Quiz
+from quiz.signals import question_count_subquery, recount_questions
+
+
+class Command(BaseCommand):
+    help = "Compare the stored question count of every quiz with its questions, and optionally fix them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help="Recount the quizzes that don't match.")
+
+    def handle(self, *args, **options):
+        wrong = list(
+            Quiz.objects.annotate(actual=question_count_subquery())
+            .exclude(question_count=F('actual'))
+            .values_list('id', 'question_count', 'actual')
+        )
+        if not wrong:
+            self.stdout.write(self.style.SUCCESS("Question counts are consistent."))
+            return
+        if options['verbosity'] > 1:
+            for quiz_id, stored, actual in wrong:
+                self.stdout.write(f"Quiz {quiz_id}: stored {stored}, actual {actual}")
+        self.stdout.write(self.style.WARNING(f"{len(wrong)} quizzes with a wrong question count."))
+        if options['repair']:
+            recount_questions(quiz_id for quiz_id, stored, actual in wrong)
+            self.stdout.write(self.style.SUCCESS("Question counts repaired."))
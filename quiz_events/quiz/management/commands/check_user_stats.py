@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from quiz import user_stats
+
+
+class Command(BaseCommand):
+    help = "Compare the per-user submission stats with the graded submissions, and optionally fix them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help="Rewrite the stats that don't match.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            expected, wrong, orphans = user_stats.find_mismatches()
+            if options['verbosity'] > 1:
+                for user_id in wrong:
+                    self.stdout.write(f"User {user_id}: expected {expected[user_id]}")
+            if not wrong and not orphans:
+                self.stdout.write(self.style.SUCCESS(f"Stats of {len(expected)} users are consistent."))
+                return
+            self.stdout.write(self.style.WARNING(
+                f"{len(wrong)} users with wrong or missing stats, {len(orphans)} stats rows without submissions."
+            ))
+            if options['repair']:
+                user_stats.repair(expected, wrong, orphans, options['batch_size'])
+                self.stdout.write(self.style.SUCCESS("Stats repaired."))
@@ -0,0 +1,174 @@
+import json
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from quiz.benchmark import summarize
+from quiz.models import Quiz
+from user_accounts.models import User
+
+ENDPOINTS = ['login', 'quiz list', 'quiz fetch', 'submit', 'result fetch']
+PASSWORD = 'Loadtest@1234'
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the API routes in process with concurrent virtual users "
+        "(login, quiz list, quiz fetch, submit, result fetch) and report throughput, "
+        "latency percentiles and queries per request of each endpoint as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=4, help="Concurrent virtual users, one thread each.")
+        parser.add_argument('--iterations', type=int, default=20, help="Scenario runs per virtual user.")
+        parser.add_argument('--warmup', type=int, default=1, help="Unrecorded scenario runs per virtual user.")
+        parser.add_argument('--quiz', type=int, action='append', dest='quizzes',
+                            help="Quiz id to use, can be repeated. Defaults to every quiz with questions.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument('--keep-users', action='store_true',
+                            help="Keep the loadtest users and their submissions after the run.")
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quizzes'] or list(Quiz.objects.filter(question_count__gt=0).values_list('id', flat=True))
+        if not quiz_ids:
+            raise CommandError("No quiz with questions to run the scenario against.")
+
+        users = self.create_users(options['users'])
+        self.samples = {endpoint: ([], [], []) for endpoint in ENDPOINTS}
+        self.lock = threading.Lock()
+        try:
+            # Let test clients through ALLOWED_HOSTS and read query counts from the budget middleware headers.
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], QUERY_BUDGET_HEADERS=True):
+                threads = [
+                    threading.Thread(
+                        target=self.virtual_user,
+                        args=(user, quiz_ids, random.Random(options['seed'] + number), options),
+                    )
+                    for number, user in enumerate(users)
+                ]
+                started = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                duration = time.perf_counter() - started
+        finally:
+            if not options['keep_users']:
+                User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        report = {
+            'scenario': {
+                'users': options['users'],
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'quizzes': len(quiz_ids),
+                'seed': options['seed'],
+                'database': connection.vendor,
+            },
+            'duration_s': round(duration, 3),
+            'endpoints': {},
+        }
+        for endpoint, (latencies, queries, errors) in self.samples.items():
+            summary = summarize(latencies, queries)
+            summary['errors'] = len(errors)
+            summary['rps'] = round(len(latencies) / duration, 2) if duration else 0.0
+            report['endpoints'][endpoint] = summary
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def create_users(self, count):
+        """
+        Create the virtual users' accounts, hashing the shared password only once.
+        """
+        password = make_password(PASSWORD)
+        suffix = int(time.time())
+        return User.objects.bulk_create([
+            User(
+                email=f'loadtest-{suffix}-{number}@example.com',
+                username=f'loadtest-{suffix}-{number}',
+                password=password,
+                profile_pic='defaultuser/Anonymous-User.png',
+            )
+            for number in range(count)
+        ])
+
+    def record(self, endpoint, response, started, recorded):
+        elapsed = (time.perf_counter() - started) * 1000
+        if not recorded:
+            return
+        latencies, queries, errors = self.samples[endpoint]
+        with self.lock:
+            latencies.append(elapsed)
+            queries.append(int(response.get('X-DB-Queries', 0)))
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+    def request(self, endpoint, recorded, send):
+        started = time.perf_counter()
+        response = send()
+        self.record(endpoint, response, started, recorded)
+        return response
+
+    def virtual_user(self, user, quiz_ids, rng, options):
+        client = Client()
+        try:
+            for iteration in range(options['warmup'] + options['iterations']):
+                recorded = iteration >= options['warmup']
+                self.scenario(client, user, rng.choice(quiz_ids), rng, recorded)
+        finally:
+            connection.close()
+
+    def scenario(self, client, user, quiz_id, rng, recorded):
+        response = self.request('login', recorded, lambda: client.post(
+            reverse('user-login'), {'email': user.email, 'password': PASSWORD}, content_type='application/json'
+        ))
+        if response.status_code != 200:
+            return
+        auth = {'HTTP_AUTHORIZATION': f"Bearer {response.json()['data']['access']}"}
+
+        self.request('quiz list', recorded, lambda: client.get(reverse('quiz-list'), **auth))
+
+        response = self.request('quiz fetch', recorded, lambda: client.get(reverse('start-quiz-api', args=[quiz_id]), **auth))
+        if response.status_code != 200:
+            return
+        answers = self.pick_answers(response.json()['data']['questions'], rng)
+
+        response = self.request('submit', recorded, lambda: client.post(
+            reverse('start-quiz-api', args=[quiz_id]), {'answers': answers}, content_type='application/json', **auth
+        ))
+        if response.status_code not in (200, 201, 202):
+            return
+        body = response.json()
+        submission_id = body.get('submission_id') or body['data']['submission_id']
+
+        self.request('result fetch', recorded, lambda: client.get(reverse('quiz-result', args=[submission_id]), **auth))
+
+    def pick_answers(self, questions, rng):
+        """
+        A random, mostly complete set of answers for the fetched quiz payload.
+        """
+        answers = {}
+        for question in questions:
+            if rng.random() < 0.1:
+                continue
+            if question['question_type'] == 'MCQ' and question['answers']:
+                answers[str(question['id'])] = str(rng.choice(question['answers'])['id'])
+            elif question['question_type'] == 'BOOL':
+                answers[str(question['id'])] = rng.choice(['true', 'false'])
+            else:
+                answers[str(question['id'])] = rng.choice(['paris', 'answer'])
+        return answers
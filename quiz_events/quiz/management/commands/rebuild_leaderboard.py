@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from quiz import leaderboard
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Rebuild quiz leaderboards from the graded submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quiz', type=int, action='append', dest='quizzes',
+                            help="Quiz id to rebuild, can be repeated. Defaults to every quiz.")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quizzes'] or Quiz.objects.order_by('id').values_list('id', flat=True)
+        total = 0
+        for quiz_id in quiz_ids:
+            created = leaderboard.rebuild(quiz_id, options['chunk_size'])
+            total += created
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Quiz {quiz_id}: {created} entries")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt leaderboards with {total} entries."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from quiz.models import Quiz
+from quiz.search import reindex_quizzes
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite the search documents of all quizzes, or of the given ones, from their questions. "
+        "Needed after questions were written without going through the ORM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='*', type=int)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quiz_ids'] or list(Quiz.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(quiz_ids), options['batch_size']):
+            with transaction.atomic():
+                reindex_quizzes(quiz_ids[start:start + options['batch_size']])
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {len(quiz_ids)} quizzes."))
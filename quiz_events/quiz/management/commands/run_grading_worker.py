@@ -0,0 +1,64 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from quiz.jobs import claim_jobs, grade_jobs, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Grade queued submissions (QUIZ_ASYNC_GRADING) from the GradingJob table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Jobs claimed and stored per transaction.")
+        parser.add_argument('--concurrency', type=int, default=1, help="Number of worker threads.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--max-attempts', type=int, default=3, help="Attempts before a job is marked FAILED.")
+        parser.add_argument('--stale-after', type=int, default=300, help="Requeue RUNNING jobs claimed longer ago than this.")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.graded = self.failed = 0
+
+        requeued = requeue_stale_jobs(options['stale_after'])
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s).")
+
+        threads = [
+            threading.Thread(target=self.work, name=f"grading-worker-{i}", daemon=True)
+            for i in range(max(1, options['concurrency']))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after the current batch...")
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS(f"Graded {self.graded} submission(s), {self.failed} failed."))
+
+    def work(self):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                jobs = claim_jobs(self.options['batch_size'])
+                if not jobs:
+                    if self.options['once']:
+                        return
+                    time.sleep(self.options['poll_interval'])
+                    continue
+                graded, failed = grade_jobs(jobs, self.options['max_attempts'])
+                with self.lock:
+                    self.graded += graded
+                    self.failed += failed
+        finally:
+            connection.close()
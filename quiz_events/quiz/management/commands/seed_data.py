@@ -0,0 +1,202 @@
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, time as day_time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from quiz import leaderboard, user_stats
+from quiz.models import Quiz, Question, Answer, UserSubmission, UserAnswer
+from user_accounts.models import User
+
+# Share of submissions made in each hour of the day, peaking in the evening.
+HOURLY_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 6, 7, 8, 8, 9, 8, 8, 8, 9, 10, 12, 14, 14, 11, 6, 3]
+
+
+def zipf_cumulative(count, exponent, rng):
+    """
+    Cumulative Zipf weights over `count` items in random order, for rng.choices(cum_weights=...).
+    """
+    weights = [1 / (rank + 1) ** exponent for rank in range(count)]
+    rng.shuffle(weights)
+    return list(itertools.accumulate(weights))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large, deterministic dataset of users, quizzes, questions, submissions and answers. "
+        "Rows are bulk inserted in chunks; users share one precomputed password hash."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--quizzes', type=int, default=2000)
+        parser.add_argument('--questions', type=int, default=50, help="Questions per quiz.")
+        parser.add_argument('--submissions', type=int, default=100000,
+                            help="Graded submissions, each with one answer per question.")
+        parser.add_argument('--days', type=int, default=365, help="Spread submissions over this many past days.")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows per bulk insert.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default='seed', help="Prefix of the generated usernames and emails.")
+        parser.add_argument('--password', default='Seed@1234', help="Password of every generated user.")
+        parser.add_argument('--skip-derived', action='store_true',
+                            help="Don't rebuild leaderboards and user stats at the end.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        # Anchor timestamps to midnight so the same seed gives the same data all day.
+        self.until = timezone.make_aware(datetime.combine(timezone.localdate(), day_time.min))
+        started = time.perf_counter()
+
+        user_ids = self.step("users", lambda: self.create_users(options))
+        quizzes = self.step("quizzes and questions", lambda: self.create_quizzes(options))
+        self.step("submissions and answers", lambda: self.create_submissions(user_ids, quizzes, options))
+        if not options['skip_derived']:
+            self.step("leaderboards", lambda: [leaderboard.rebuild(quiz_id) for quiz_id, questions in quizzes])
+            self.step("user stats", lambda: user_stats.repair(*user_stats.find_mismatches()))
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.perf_counter() - started:.1f}s."))
+
+    def step(self, name, func):
+        started = time.perf_counter()
+        result = func()
+        self.stdout.write(f"{name}: {time.perf_counter() - started:.1f}s")
+        return result
+
+    def create_users(self, options):
+        password = make_password(options['password'])
+        prefix = options['prefix']
+        ids = []
+        for start in range(0, options['users'], self.chunk_size):
+            users = User.objects.bulk_create([
+                User(
+                    first_name='Seed', last_name=f'User {number}', username=f'{prefix}-{number}',
+                    email=f'{prefix}-{number}@example.com', password=password,
+                    profile_pic='defaultuser/Anonymous-User.png',
+                )
+                for number in range(start, min(start + self.chunk_size, options['users']))
+            ])
+            ids.extend(user.pk for user in users)
+        return ids
+
+    def create_quizzes(self, options):
+        """
+        Create the quizzes with their questions and answers.
+        Returns [(quiz_id, [(question_id, question_type, question text, [(answer text, is_correct)])])].
+        """
+        rng = self.rng
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(title=f"{options['prefix'].title()} quiz {number}", description="Generated by seed_data")
+            for number in range(options['quizzes'])
+        ], batch_size=self.chunk_size)
+        for quiz in quizzes:
+            quiz.created_at = self.until - timedelta(days=options['days'] * rng.random(), seconds=rng.randrange(86400))
+            quiz.updated_at = quiz.created_at
+        Quiz.objects.bulk_update(quizzes, ['created_at', 'updated_at'], batch_size=self.chunk_size)
+
+        keys = []
+        per_chunk = max(1, self.chunk_size // max(1, options['questions']))
+        for start in range(0, len(quizzes), per_chunk):
+            with transaction.atomic():
+                questions = Question.objects.bulk_create([
+                    Question(quiz=quiz, text=f"Question {number} of quiz {quiz.pk}?",
+                             question_type=rng.choice(['MCQ', 'MCQ', 'BOOL', 'TEXT']))
+                    for quiz in quizzes[start:start + per_chunk]
+                    for number in range(options['questions'])
+                ])
+                answers = []
+                for question in questions:
+                    if question.question_type == 'MCQ':
+                        correct = rng.randrange(4)
+                        answers.extend(
+                            Answer(question=question, text=f"Option {i}", is_correct=i == correct) for i in range(4)
+                        )
+                    elif question.question_type == 'BOOL':
+                        answers.append(Answer(question=question, text=rng.choice(['True', 'False']), is_correct=True))
+                    else:
+                        answers.append(Answer(question=question, text=f"answer {question.pk}", is_correct=True))
+                Answer.objects.bulk_create(answers, batch_size=self.chunk_size)
+
+            options_by_question = {}
+            for answer in answers:
+                options_by_question.setdefault(answer.question_id, []).append((answer.text, answer.is_correct))
+            by_quiz = {}
+            for question in questions:
+                by_quiz.setdefault(question.quiz_id, []).append(
+                    (question.pk, question.question_type, question.text, options_by_question[question.pk])
+                )
+            keys.extend(by_quiz.items())
+        return keys
+
+    def insert_rows(self, model, fields, rows):
+        """
+        Plain executemany INSERT, bypassing model instances and auto_now_add
+        so generated timestamps are kept.
+        """
+        columns = ', '.join(connection.ops.quote_name(model._meta.get_field(name).column) for name in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})",
+                rows,
+            )
+
+    def submission_time(self, days):
+        # Squaring biases submissions towards recent days.
+        day = self.until - timedelta(days=int(days * self.rng.random() ** 2) + 1)
+        hour = bisect.bisect(self.hour_weights, self.rng.random() * self.hour_weights[-1])
+        return day + timedelta(hours=hour, seconds=self.rng.randrange(3600))
+
+    def create_submissions(self, user_ids, quizzes, options):
+        rng = self.rng
+        self.hour_weights = list(itertools.accumulate(HOURLY_WEIGHTS))
+        # A few quizzes and users account for most submissions.
+        quiz_weights = zipf_cumulative(len(quizzes), 1.1, rng)
+        user_weights = zipf_cumulative(len(user_ids), 0.8, rng)
+        skill = {}
+        adapt = connection.ops.adapt_datetimefield_value
+        next_id = (UserSubmission.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+        per_chunk = max(1, self.chunk_size // max(1, options['questions']))
+        for start in range(0, options['submissions'], per_chunk):
+            count = min(per_chunk, options['submissions'] - start)
+            submission_rows = []
+            answer_rows = []
+            for quiz_index, user_id in zip(
+                rng.choices(range(len(quizzes)), cum_weights=quiz_weights, k=count),
+                rng.choices(user_ids, cum_weights=user_weights, k=count),
+            ):
+                quiz_id, questions = quizzes[quiz_index]
+                if user_id not in skill:
+                    skill[user_id] = rng.betavariate(2, 2)
+                score = 0
+                for question_id, question_type, question_text, choices in questions:
+                    correct_answer = next(text for text, correct in choices if correct)
+                    if rng.random() < 0.05:
+                        answer_rows.append((next_id, question_id, '', False, question_text, correct_answer))
+                        continue
+                    is_correct = rng.random() < skill[user_id]
+                    if question_type == 'MCQ':
+                        wrong = [text for text, correct in choices if not correct]
+                        text = correct_answer if is_correct else rng.choice(wrong)
+                    elif question_type == 'BOOL':
+                        text = choices[0][0] if is_correct else ('False' if choices[0][0] == 'True' else 'True')
+                    else:
+                        text = choices[0][0] if is_correct else 'wrong answer'
+                    score += is_correct
+                    answer_rows.append((next_id, question_id, text, is_correct, question_text, correct_answer))
+                submission_rows.append((next_id, quiz_id, user_id, float(score), adapt(self.submission_time(options['days'])), 'GRADED'))
+                next_id += 1
+
+            with transaction.atomic():
+                self.insert_rows(UserSubmission, ['id', 'quiz', 'user', 'score', 'submitted_at', 'status'], submission_rows)
+                self.insert_rows(
+                    UserAnswer, ['submission', 'question', 'answer', 'is_correct', 'question_text', 'correct_answer'],
+                    answer_rows,
+                )
@@ -0,0 +1,47 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary database onto its replicas (settings.DATABASE_REPLICAS), once or "
+        "every --interval seconds. Stands in for replication when testing the read replicas locally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help="Seconds between copies, 0 copies once.")
+
+    def handle(self, *args, **options):
+        aliases = settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError("No replica configured, set QUIZ_EVENTS_SQLITE_REPLICAS.")
+        if any(connections[alias].vendor != 'sqlite' for alias in [DEFAULT_DB_ALIAS, *aliases]):
+            raise CommandError("Only SQLite databases can be copied.")
+        while True:
+            started = time.perf_counter()
+            for alias in aliases:
+                self.copy(connections[DEFAULT_DB_ALIAS].settings_dict, connections[alias].settings_dict)
+            self.stdout.write(
+                f"Copied the primary to {', '.join(aliases)} in {(time.perf_counter() - started) * 1000:.0f} ms."
+            )
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
+
+    def copy(self, source_settings, target_settings):
+        """
+        Online backup of the primary into the replica file: readers of the replica
+        wait on its lock for the copy and then see a consistent snapshot.
+        """
+        timeout = source_settings.get('OPTIONS', {}).get('timeout', 5)
+        source = sqlite3.connect(source_settings['NAME'], timeout=timeout)
+        target = sqlite3.connect(target_settings['NAME'], timeout=timeout)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
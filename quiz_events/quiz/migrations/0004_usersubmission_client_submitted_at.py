@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_quiz_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubmission',
+            name='client_submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_usersubmission_client_submitted_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubmission',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('GRADED', 'Graded')], default='GRADED', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='GradingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answers', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grading_job', to='quiz.usersubmission')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='quiz_gradin_status_e56310_idx'), models.Index(fields=['claim_token'], name='quiz_gradin_claim_t_a90bd0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0007_user_submission_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_date', 'id'], name='event_date_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['created_at', 'id'], name='quiz_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['user', 'submitted_at', 'id'], name='submission_user_keyset_idx'),
+        ),
+    ]
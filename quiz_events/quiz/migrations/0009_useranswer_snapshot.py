@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useranswer',
+            name='correct_answer',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='useranswer',
+            name='question_text',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_questions(apps, schema_editor):
+    Quiz = apps.get_model('quiz', 'Quiz')
+    Question = apps.get_model('quiz', 'Question')
+    counts = Question.objects.filter(quiz=OuterRef('pk')).order_by().values('quiz').annotate(total=Count('id')).values('total')
+    Quiz.objects.update(question_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_useranswer_snapshot'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='quiz',
+            name='quiz_created_keyset_idx',
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_questions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(condition=models.Q(('question_count__gt', 0)), fields=['-created_at', '-id'], name='quiz_listed_keyset_idx'),
+        ),
+    ]
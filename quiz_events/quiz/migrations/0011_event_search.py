@@ -0,0 +1,65 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:28
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# External content FTS5 table over the event title and description. The triggers keep it
+# in sync with quiz_event; they are dropped if a later migration rebuilds quiz_event,
+# in which case that migration must recreate them.
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE quiz_event_fts USING fts5(
+        event_title, event_desc, content='quiz_event', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER quiz_event_fts_insert AFTER INSERT ON quiz_event BEGIN
+        INSERT INTO quiz_event_fts(rowid, event_title, event_desc) VALUES (new.id, new.event_title, new.event_desc);
+    END
+    """,
+    """
+    CREATE TRIGGER quiz_event_fts_delete AFTER DELETE ON quiz_event BEGIN
+        INSERT INTO quiz_event_fts(quiz_event_fts, rowid, event_title, event_desc)
+        VALUES ('delete', old.id, old.event_title, old.event_desc);
+    END
+    """,
+    """
+    CREATE TRIGGER quiz_event_fts_update AFTER UPDATE OF event_title, event_desc ON quiz_event BEGIN
+        INSERT INTO quiz_event_fts(quiz_event_fts, rowid, event_title, event_desc)
+        VALUES ('delete', old.id, old.event_title, old.event_desc);
+        INSERT INTO quiz_event_fts(rowid, event_title, event_desc) VALUES (new.id, new.event_title, new.event_desc);
+    END
+    """,
+    "INSERT INTO quiz_event_fts(quiz_event_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS quiz_event_fts_insert",
+    "DROP TRIGGER IF EXISTS quiz_event_fts_delete",
+    "DROP TRIGGER IF EXISTS quiz_event_fts_update",
+    "DROP TABLE IF EXISTS quiz_event_fts",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        # Other databases use the icontains fallback of quiz.search.
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0010_quiz_question_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(django.db.models.functions.text.Lower('location'), models.F('event_date'), models.F('id'), name='event_location_idx'),
+        ),
+        migrations.RunPython(run_on_sqlite(FTS_SQL), run_on_sqlite(DROP_FTS_SQL)),
+    ]
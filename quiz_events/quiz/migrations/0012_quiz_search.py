@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:02
+
+from django.db import migrations
+
+# One FTS5 document per quiz: its title, description and the text of all its questions,
+# so a search ranks whole quizzes. The table keeps its own copy of the text.
+# Quiz changes are synced by the triggers below (see 0011_event_search for the caveat on
+# table rebuilds); question changes by quiz.search.reindex_quizzes, called from quiz.signals
+# and QuestionQuerySet, as a trigger would rewrite the document once per inserted question.
+QUIZ_DOCUMENT = (
+    "SELECT quiz.id, quiz.title, quiz.description, "
+    "(SELECT group_concat(question.text, char(10)) FROM quiz_question AS question WHERE question.quiz_id = quiz.id) "
+    "FROM quiz_quiz AS quiz"
+)
+
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE quiz_search_fts USING fts5(
+        title, description, questions, tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER quiz_search_fts_insert AFTER INSERT ON quiz_quiz BEGIN
+        INSERT INTO quiz_search_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER quiz_search_fts_delete AFTER DELETE ON quiz_quiz BEGIN
+        DELETE FROM quiz_search_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER quiz_search_fts_update AFTER UPDATE OF title, description ON quiz_quiz
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+        UPDATE quiz_search_fts SET title = new.title, description = new.description WHERE rowid = new.id;
+    END
+    """,
+    f"INSERT INTO quiz_search_fts(rowid, title, description, questions) {QUIZ_DOCUMENT}",
+]
+
+DROP_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS quiz_search_fts_insert",
+    "DROP TRIGGER IF EXISTS quiz_search_fts_delete",
+    "DROP TRIGGER IF EXISTS quiz_search_fts_update",
+    "DROP TABLE IF EXISTS quiz_search_fts",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        # Other databases use the icontains fallback of quiz.search.
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0011_event_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(FTS_SQL), run_on_sqlite(DROP_FTS_SQL)),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0012_quiz_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['submitted_at'], name='submission_submitted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_buckets(apps, schema_editor):
+    LeaderboardEntry = apps.get_model('quiz', 'LeaderboardEntry')
+    LeaderboardBucket = apps.get_model('quiz', 'LeaderboardBucket')
+    counts = LeaderboardEntry.objects.order_by().values('quiz_id', 'best_score').annotate(total=Count('id'))
+    LeaderboardBucket.objects.bulk_create(
+        LeaderboardBucket(quiz_id=row['quiz_id'], score=row['best_score'], entries=row['total']) for row in counts
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0013_submission_submitted_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('entries', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='quiz_leaderboard_rank_idx',
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['quiz', '-best_score', 'achieved_at', 'user'], name='quiz_leaderboard_rank_idx'),
+        ),
+        migrations.AddField(
+            model_name='leaderboardbucket',
+            name='quiz',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_buckets', to='quiz.quiz'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardbucket',
+            constraint=models.UniqueConstraint(fields=('quiz', 'score'), name='quiz_leaderboard_bucket_unique_score'),
+        ),
+        migrations.RunPython(fill_buckets, migrations.RunPython.noop),
+    ]
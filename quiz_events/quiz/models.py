@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from user_accounts.models import User
 
 # Create your models here.
@@ -9,15 +10,89 @@ class Quiz(models.Model):
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped whenever the quiz, its questions or its answers change (see quiz.signals).
+    version = models.PositiveIntegerField(default=0, editable=False)
+    # Kept up to date by quiz.signals and QuestionQuerySet, check with manage.py check_question_counts.
+    question_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Quizzes"           
         verbose_name_plural = "Quizzes"  
+        indexes = [
+            # Listed quizzes only, in the keyset order of the quiz list.
+            models.Index(
+                fields=['-created_at', '-id'], condition=models.Q(question_count__gt=0), name='quiz_listed_keyset_idx'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None and not self._state.adding:
+            self.version = models.F('version') + 1
+            # Never write back a count read before questions were added or removed.
+            self.question_count = models.F('question_count')
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+            super().save(*args, **kwargs)
+            # Replace the F() expressions with the stored values.
+            self.refresh_from_db(fields=['version', 'question_count'])
+            return
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
 
+class QuestionQuerySet(models.QuerySet):
+    """
+    Keeps Quiz.question_count right on bulk_create and update, which send no signals,
+    and on delete, which would otherwise update the quiz once per question.
+    Bumps the version of the quizzes whose questions change through update, and
+    rewrites their search documents when the question text changes.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from quiz.signals import recount_questions
+
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            recount_questions(obj.quiz_id for obj in objs)
+        return objs
+
+    def update(self, **kwargs):
+        from quiz.search import reindex_quizzes
+        from quiz.signals import bump_quiz_versions, recount_questions
+
+        with transaction.atomic(using=self.db):
+            if 'quiz' in kwargs or 'quiz_id' in kwargs:
+                # Moved questions change the counts of the quizzes they leave and join.
+                moved = dict(self.values_list('pk', 'quiz_id'))
+                result = super().update(**kwargs)
+                joined = Question.objects.filter(pk__in=list(moved)).values_list('quiz_id', flat=True)
+                recount_questions({*moved.values(), *joined})
+            else:
+                quiz_ids = set(self.values_list('quiz_id', flat=True))
+                result = super().update(**kwargs)
+                bump_quiz_versions(quiz_ids)
+                if 'text' in kwargs:
+                    reindex_quizzes(quiz_ids)
+        return result
+
+    update.alters_data = True
+
+    def delete(self):
+        from quiz.signals import recount_questions, recounting
+
+        with transaction.atomic(using=self.db):
+            quiz_ids = set(self.values_list('quiz_id', flat=True))
+            with recounting():
+                result = super().delete()
+            recount_questions(quiz_ids)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Question(models.Model):
     QUESTION_TYPE = (
         ('MCQ','Multiple Choice'),
@@ -29,8 +104,50 @@ class Question(models.Model):
     question_type = models.CharField(max_length=10, choices=QUESTION_TYPE, default='TEXT')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = QuestionQuerySet.as_manager()
+
     def __str__(self):
-        return f"{self.quiz.title} - {self.text[:20]}"
+        return f"Quiz {self.quiz_id} - {self.text[:20]}"
+
+
+class AnswerQuerySet(models.QuerySet):
+    """
+    Bumps the version of the quizzes whose answers change through bulk_create and update,
+    which send no signals, and delete, which would otherwise bump them once per answer.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from quiz.signals import bump_quiz_versions
+
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            question_ids = {obj.question_id for obj in objs}
+            bump_quiz_versions(Question.objects.filter(pk__in=question_ids).values_list('quiz_id', flat=True))
+        return objs
+
+    def update(self, **kwargs):
+        from quiz.signals import bump_quiz_versions
+
+        with transaction.atomic(using=self.db):
+            quiz_ids = set(self.values_list('question__quiz_id', flat=True))
+            result = super().update(**kwargs)
+            bump_quiz_versions(quiz_ids)
+        return result
+
+    update.alters_data = True
+
+    def delete(self):
+        from quiz.signals import bump_quiz_versions, recounting
+
+        with transaction.atomic(using=self.db):
+            quiz_ids = set(self.values_list('question__quiz_id', flat=True))
+            with recounting():
+                result = super().delete()
+            bump_quiz_versions(quiz_ids)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Answer(models.Model):
@@ -38,18 +155,34 @@ class Answer(models.Model):
     text = models.TextField()
     is_correct = models.BooleanField(default=False)
 
+    objects = AnswerQuerySet.as_manager()
+
     def __str__(self):
-        return f"{self.question.text[:30]} - {self.text[:30]}"
+        return f"Question {self.question_id} - {self.text[:30]}"
 
 
 class UserSubmission(models.Model):
+    STATUS = (
+        ('PENDING', 'Pending'),
+        ('GRADED', 'Graded'),
+    )
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='submissions_qns')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='submissions_ans')
     score = models.FloatField(default=0)
     submitted_at = models.DateTimeField(auto_now_add=True)
+    # Time reported by offline clients that replay their attempts later.
+    client_submitted_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS, default='GRADED')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'submitted_at', 'id'], name='submission_user_keyset_idx'),
+            # Admin date hierarchy.
+            models.Index(fields=['submitted_at'], name='submission_submitted_at_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.user.username} - {self.quiz.title}"
+        return f"Submission {self.id} - user {self.user_id} - quiz {self.quiz_id}"
     
 
 class UserAnswer(models.Model):
@@ -57,9 +190,107 @@ class UserAnswer(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     answer = models.TextField()
     is_correct = models.BooleanField(default=False)
+    # Copied from the answer key at grading time so results render without joins.
+    # question_text is null on rows graded before snapshots (see backfill_answer_snapshots).
+    question_text = models.TextField(null=True, blank=True)
+    correct_answer = models.TextField(null=True, blank=True)
 
     def __str__(self):
-        return f"{self.submission.user.username} - {self.question.text[:30]}"
+        return f"Submission {self.submission_id} - {(self.question_text or f'question {self.question_id}')[:30]}"
+
+
+class UserSubmissionStats(models.Model):
+    """
+    Per-user totals over graded submissions, kept up to date by quiz.grading
+    so submission lists don't have to count rows.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='submission_stats')
+    total_submissions = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    best_score = models.FloatField(default=0)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "User Submission Stats"
+        verbose_name_plural = "User Submission Stats"
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.total_submissions if self.total_submissions else 0
+
+    def __str__(self):
+        return f"User {self.user_id} - {self.total_submissions} submissions"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Best graded score of a user on a quiz, maintained by quiz.leaderboard.
+    Ties on the score are broken by the earlier submission.
+    """
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='leaderboard')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    submission = models.ForeignKey(UserSubmission, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    best_score = models.FloatField()
+    achieved_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'user'], name='quiz_leaderboard_unique_user'),
+        ]
+        indexes = [
+            models.Index(fields=['quiz', '-best_score', 'achieved_at', 'user'], name='quiz_leaderboard_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"Quiz {self.quiz_id} - user {self.user_id}: {self.best_score}"
+
+
+class LeaderboardBucket(models.Model):
+    """
+    Number of leaderboard entries of a quiz with a given best score, maintained by
+    quiz.leaderboard so a rank sums a few buckets instead of counting every entry ahead.
+    Scores count correct answers, so a quiz has at most one bucket per question plus one.
+    """
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='leaderboard_buckets')
+    score = models.FloatField()
+    entries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'score'], name='quiz_leaderboard_bucket_unique_score'),
+        ]
+
+    def __str__(self):
+        return f"Quiz {self.quiz_id} - score {self.score}: {self.entries}"
+
+
+class GradingJob(models.Model):
+    """
+    Database-backed queue entry for a submission graded by the grading worker.
+    """
+    STATUS = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+    submission = models.OneToOneField(UserSubmission, on_delete=models.CASCADE, related_name='grading_job')
+    answers = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id']),
+            models.Index(fields=['claim_token']),
+        ]
+
+    def __str__(self):
+        return f"Grading job {self.id} - {self.status}"
 
 
 class Event(models.Model):
@@ -68,5 +299,12 @@ class Event(models.Model):
     event_date = models.DateField()
     location = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['event_date', 'id'], name='event_date_keyset_idx'),
+            # Case-insensitive exact and prefix location filters (see quiz.search).
+            models.Index(Lower('location'), 'event_date', 'id', name='event_location_idx'),
+        ]
+
     def __str__(self):
         return f"{self.event_title} - {self.event_date} - {self.location}"
\ No newline at end of file
@@ -0,0 +1,158 @@
+import re
+
+from django.db import connection
+from django.db.models import Q, FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+
+from quiz.models import Event, Quiz
+
+# Kept in sync with quiz_event by the triggers of migration 0011_event_search.
+EVENT_FTS_TABLE = 'quiz_event_fts'
+# One document per quiz, see migration 0012_quiz_search and reindex_quizzes.
+QUIZ_FTS_TABLE = 'quiz_search_fts'
+
+# bm25 column weights of the quiz title, description and question text.
+QUIZ_FTS_WEIGHTS = (10.0, 3.0, 1.0)
+
+# bm25 score (lower is better) of each listed quiz matching the search, one page in (search_rank, id) order.
+RANKED_QUIZZES_SQL = f'''
+    SELECT quiz.*, ranked.search_rank FROM (
+        SELECT rowid AS quiz_id, bm25({QUIZ_FTS_TABLE}, {', '.join(map(str, QUIZ_FTS_WEIGHTS))}) AS search_rank
+        FROM {QUIZ_FTS_TABLE} WHERE {QUIZ_FTS_TABLE} MATCH %s
+    ) AS ranked JOIN quiz_quiz AS quiz ON quiz.id = ranked.quiz_id
+    WHERE quiz.question_count > 0 {{after}}
+    ORDER BY ranked.search_rank, quiz.id
+    LIMIT %s
+'''
+
+
+def search_terms(text):
+    return re.findall(r'\w+', text or '')
+
+
+def fts_query(text):
+    """
+    FTS5 MATCH expression requiring every word of `text`, the last one as a prefix.
+    Words are quoted so user input can't inject FTS5 operators.
+    """
+    terms = [f'"{term}"' for term in search_terms(text)]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def has_fts():
+    return connection.vendor == 'sqlite'
+
+
+def prefix_range(prefix):
+    """
+    (low, high) bounds of the strings starting with `prefix`, for an index range scan.
+    """
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def matching_events(text):
+    """
+    Q matching events whose title or description contains every word of `text`.
+    Uses the FTS5 index on SQLite and falls back to icontains elsewhere.
+    """
+    if not search_terms(text):
+        return Q()
+    if has_fts():
+        return Q(id__in=RawSQL(
+            f'SELECT rowid FROM {EVENT_FTS_TABLE} WHERE {EVENT_FTS_TABLE} MATCH %s', [fts_query(text)]
+        ))
+    condition = Q()
+    for term in search_terms(text):
+        condition &= Q(event_title__icontains=term) | Q(event_desc__icontains=term)
+    return condition
+
+
+def search_events(query=None, location=None, location_prefix=None, date_from=None, date_to=None):
+    """
+    Events matching all the given filters, in (event_date, id) order.
+
+    query:           words matched against the title and description.
+    location:        case-insensitive exact location.
+    location_prefix: case-insensitive location prefix.
+    date_from/to:    inclusive event_date range.
+    """
+    events = Event.objects.annotate(location_key=Lower('location'))
+    if query and search_terms(query):
+        events = events.filter(matching_events(query))
+    if location:
+        events = events.filter(location_key=location.lower())
+    if location_prefix:
+        low, high = prefix_range(location_prefix.lower())
+        events = events.filter(location_key__gte=low, location_key__lt=high)
+    if date_from:
+        events = events.filter(event_date__gte=date_from)
+    if date_to:
+        events = events.filter(event_date__lte=date_to)
+    return events.order_by('event_date', 'id')
+
+
+def reindex_quizzes(quiz_ids):
+    """
+    Rewrite the search documents of quizzes from their current title, description
+    and questions. Called whenever questions change, see quiz.signals.
+    """
+    quiz_ids = list(set(quiz_ids))
+    if not quiz_ids or not has_fts():
+        return
+    with connection.cursor() as cursor:
+        for start in range(0, len(quiz_ids), 500):
+            batch = quiz_ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM {QUIZ_FTS_TABLE} WHERE rowid IN ({placeholders})", batch)
+            cursor.execute(
+                f"INSERT INTO {QUIZ_FTS_TABLE}(rowid, title, description, questions) "
+                f"SELECT quiz.id, quiz.title, quiz.description, "
+                f"(SELECT group_concat(question.text, char(10)) FROM quiz_question AS question "
+                f"WHERE question.quiz_id = quiz.id) "
+                f"FROM quiz_quiz AS quiz WHERE quiz.id IN ({placeholders})",
+                batch,
+            )
+
+
+def matching_quizzes(text):
+    """
+    Q matching quizzes with every word of `text` in their title, description or questions.
+    Uses the FTS5 index on SQLite and falls back to icontains elsewhere.
+    """
+    if not search_terms(text):
+        return Q()
+    if has_fts():
+        return Q(id__in=RawSQL(
+            f'SELECT rowid FROM {QUIZ_FTS_TABLE} WHERE {QUIZ_FTS_TABLE} MATCH %s', [fts_query(text)]
+        ))
+    condition = Q()
+    for term in search_terms(text):
+        condition &= Q(id__in=Quiz.objects.filter(
+            Q(title__icontains=term) | Q(description__icontains=term) | Q(questions__text__icontains=term)
+        ).values('id'))
+    return condition
+
+
+def search_quizzes(text, limit, after=None):
+    """
+    Up to `limit` listed quizzes matching `text`, best first, each with a `search_rank`
+    (lower is better). `after` is the (search_rank, id) of the last quiz of the previous page.
+
+    Matches in the title weigh most, then the description, then the questions.
+    Without FTS5, matches are unranked, in id order.
+    """
+    if not has_fts():
+        quizzes = Quiz.objects.filter(matching_quizzes(text), question_count__gt=0)
+        if after:
+            quizzes = quizzes.filter(id__gt=after[1])
+        return list(quizzes.annotate(search_rank=Value(0.0, output_field=FloatField())).order_by('id')[:limit])
+
+    condition = ''
+    params = [fts_query(text)]
+    if after:
+        condition = 'AND (ranked.search_rank > %s OR (ranked.search_rank = %s AND quiz.id > %s))'
+        params += [after[0], after[0], after[1]]
+    return list(Quiz.objects.raw(RANKED_QUIZZES_SQL.format(after=condition), [*params, limit]))
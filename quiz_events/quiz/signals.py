@@ -0,0 +1,122 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from quiz.leaderboard import move_entry
+from quiz.models import Quiz, Question, Answer, Event, LeaderboardEntry
+from quiz.cache import invalidate_quiz, invalidate_events
+from quiz.grading import answer_keys
+from quiz.search import reindex_quizzes
+from user_accounts.models import User
+
+_recounting = ContextVar('recounting_questions', default=False)
+
+
+def bump_quiz_version(quiz_id, questions=0):
+    """
+    Increment the version of a quiz so cached answer keys are rebuilt,
+    and drop the cached payloads rendered from it.
+    `questions` is added to the stored question count.
+    """
+    changes = {'version': F('version') + 1}
+    if questions:
+        changes['question_count'] = F('question_count') + questions
+    Quiz.objects.filter(pk=quiz_id).update(**changes)
+    invalidate_quiz(quiz_id)
+
+
+def bump_quiz_versions(quiz_ids):
+    """
+    bump_quiz_version for many quizzes with one UPDATE.
+    """
+    quiz_ids = set(quiz_ids)
+    if not quiz_ids:
+        return
+    Quiz.objects.filter(pk__in=quiz_ids).update(version=F('version') + 1)
+    for quiz_id in quiz_ids:
+        invalidate_quiz(quiz_id)
+
+
+def question_count_subquery():
+    return Coalesce(Subquery(
+        Question.objects.filter(quiz=OuterRef('pk')).order_by().values('quiz').annotate(total=Count('id')).values('total')
+    ), 0)
+
+
+def recount_questions(quiz_ids):
+    """
+    Set the question count of quizzes from their questions with one UPDATE,
+    bumping their version and rewriting their search document like any other question change.
+    """
+    quiz_ids = set(quiz_ids)
+    if not quiz_ids:
+        return
+    Quiz.objects.filter(pk__in=quiz_ids).update(question_count=question_count_subquery(), version=F('version') + 1)
+    for quiz_id in quiz_ids:
+        invalidate_quiz(quiz_id)
+    reindex_quizzes(quiz_ids)
+
+
+@contextmanager
+def recounting():
+    """
+    Silence the per-question and per-answer delete signals while a bulk operation
+    recounts or bumps the quiz versions afterwards.
+    """
+    token = _recounting.set(True)
+    try:
+        yield
+    finally:
+        _recounting.reset(token)
+
+
+@receiver(post_save, sender=Quiz)
+def quiz_saved(sender, instance, **kwargs):
+    # Quiz.save() already bumped the version column.
+    invalidate_quiz(instance.pk)
+
+
+@receiver(post_delete, sender=Quiz)
+def quiz_deleted(sender, instance, **kwargs):
+    answer_keys.evict(instance.pk)
+    invalidate_quiz(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created, **kwargs):
+    bump_quiz_version(instance.quiz_id, questions=1 if created else 0)
+    reindex_quizzes([instance.quiz_id])
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, instance, **kwargs):
+    if not _recounting.get():
+        bump_quiz_version(instance.quiz_id, questions=-1)
+        reindex_quizzes([instance.quiz_id])
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def answer_changed(sender, instance, **kwargs):
+    if _recounting.get():
+        return
+    quiz_id = Question.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        bump_quiz_version(quiz_id)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed(sender, instance, **kwargs):
+    invalidate_events()
+
+
+@receiver(pre_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # Their leaderboard entries are deleted with them.
+    for quiz_id, best_score in LeaderboardEntry.objects.filter(user=instance).values_list('quiz_id', 'best_score'):
+        move_entry(quiz_id, best_score, None)
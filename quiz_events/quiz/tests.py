@@ -1,3 +1,573 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from quiz import leaderboard
+from quiz.cache import _until_midnight, upcoming_events
+from quiz.grading import AnswerKey, after_grading, answer_keys, get_answer_key, result_answers, submit_quiz
+from quiz.jobs import claim_jobs, enqueue_submission, grade_jobs
+from quiz.models import (
+    Quiz, Question, Answer, Event, GradingJob, LeaderboardEntry, LeaderboardBucket, UserAnswer, UserSubmission,
+    UserSubmissionStats,
+)
+from quiz.search import search_events, search_quizzes
+from user_accounts.models import User
+
+
+class UpcomingEventsCacheTests(TestCase):
+    """
+    The cached upcoming events list follows committed event changes and rolls over at local midnight.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+
+    def create_event(self, title, event_date):
+        return Event.objects.create(event_title=title, event_desc='Event', event_date=event_date, location='Pune')
+
+    def titles(self):
+        return [event.event_title for event in upcoming_events()]
+
+    def test_invalidated_on_commit(self):
+        event = self.create_event('First', self.today)
+        self.assertEqual(self.titles(), ['First'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_event('Second', self.today + timedelta(days=1))
+            # Not before the commit: the uncommitted list would be cached under the new generation.
+            self.assertEqual(self.titles(), ['First'])
+        self.assertEqual(self.titles(), ['First', 'Second'])
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertEqual(self.titles(), ['Second'])
+
+    def test_midnight_rollover(self):
+        self.create_event('Today', self.today)
+        self.create_event('Tomorrow', self.today + timedelta(days=1))
+        self.assertEqual(self.titles(), ['Today', 'Tomorrow'])
+        with mock.patch('quiz.cache.timezone.localdate', return_value=self.today + timedelta(days=1)):
+            self.assertEqual(self.titles(), ['Tomorrow'])
+
+    def test_expires_at_midnight(self):
+        now = timezone.make_aware(datetime(2030, 5, 1, 23, 59, 30))
+        with mock.patch('quiz.cache.timezone.now', return_value=now):
+            self.assertEqual(_until_midnight(date(2030, 5, 1)), 31)
+
+
+class QuizVersionTests(TestCase):
+    """
+    Every way of changing answers bumps the quiz version, so cached answer keys are rebuilt.
+    """
+
+    def setUp(self):
+        answer_keys.clear()
+        self.quiz = Quiz.objects.create(title='Versioned quiz')
+        self.question = Question.objects.create(quiz=self.quiz, text='Capital?', question_type='TEXT')
+        self.answer = Answer.objects.create(question=self.question, text='Paris', is_correct=True)
+
+    def key(self):
+        self.quiz.refresh_from_db()
+        return get_answer_key(self.quiz)
+
+    def assertBumps(self, change):
+        self.key()
+        version = self.quiz.version
+        change()
+        self.assertEqual(Quiz.objects.get(pk=self.quiz.pk).version, version + 1)
+        return self.key()
+
+    def test_bulk_create(self):
+        question = Question.objects.create(quiz=self.quiz, text='Pick one', question_type='MCQ')
+        key = self.assertBumps(lambda: Answer.objects.bulk_create([
+            Answer(question=question, text='A', is_correct=True), Answer(question=question, text='B'),
+        ]))
+        self.assertEqual(len(key.options[question.id]), 2)
+
+    def test_update(self):
+        key = self.assertBumps(lambda: Answer.objects.filter(pk=self.answer.pk).update(text='Lyon'))
+        self.assertEqual(key.correct[self.question.id], 'lyon')
+
+    def test_delete(self):
+        key = self.assertBumps(lambda: Answer.objects.filter(pk=self.answer.pk).delete())
+        self.assertNotIn(self.question.id, key.correct)
+
+    def test_question_update(self):
+        key = self.assertBumps(lambda: Question.objects.filter(pk=self.question.pk).update(question_type='BOOL'))
+        self.assertEqual(dict(key.questions)[self.question.id], 'BOOL')
+
+    def test_save_refreshes_counters(self):
+        self.quiz.refresh_from_db()
+        version = self.quiz.version
+        self.quiz.title = 'Renamed'
+        self.quiz.save()
+        self.assertEqual((self.quiz.version, self.quiz.question_count), (version + 1, 1))
+        # Saving the same instance again doesn't write back stale expressions.
+        self.quiz.save()
+        self.assertEqual(Quiz.objects.get(pk=self.quiz.pk).version, version + 2)
+
+
+class AnswerKeyGradeTests(TestCase):
+    """
+    AnswerKey.grade scores MCQ options by id and BOOL/TEXT answers by normalized text.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quiz = Quiz.objects.create(title='Graded quiz')
+        cls.mcq = Question.objects.create(quiz=cls.quiz, text='Pick', question_type='MCQ')
+        cls.right = Answer.objects.create(question=cls.mcq, text='Right', is_correct=True)
+        cls.wrong = Answer.objects.create(question=cls.mcq, text='Wrong')
+        cls.other_mcq = Question.objects.create(quiz=cls.quiz, text='Pick again', question_type='MCQ')
+        cls.other_right = Answer.objects.create(question=cls.other_mcq, text='Other right', is_correct=True)
+        cls.bool = Question.objects.create(quiz=cls.quiz, text='True?', question_type='BOOL')
+        Answer.objects.create(question=cls.bool, text='True', is_correct=True)
+        cls.text = Question.objects.create(quiz=cls.quiz, text='Capital?', question_type='TEXT')
+        Answer.objects.create(question=cls.text, text='Paris', is_correct=True)
+
+    def grade(self, answers):
+        score, graded = AnswerKey.load(self.quiz.id).grade({str(key.id): value for key, value in answers.items()})
+        return score, {question_id: (stored, is_correct) for question_id, stored, is_correct, *_ in graded}
+
+    def test_all_correct(self):
+        score, graded = self.grade({
+            self.mcq: str(self.right.id), self.other_mcq: self.other_right.id, self.bool: 'True', self.text: 'Paris',
+        })
+        self.assertEqual(score, 4)
+        self.assertEqual(graded[self.mcq.id], ('Right', True))
+
+    def test_mcq_option_of_another_question(self):
+        score, graded = self.grade({self.mcq: str(self.other_right.id)})
+        self.assertEqual(score, 0)
+        self.assertEqual(graded[self.mcq.id], ('', False))
+
+    def test_mcq_wrong_and_non_int(self):
+        for value in (str(self.wrong.id), 'abc', '1.5', ['1'], {'id': 1}):
+            with self.subTest(value=value):
+                score, graded = self.grade({self.mcq: value})
+                self.assertEqual(score, 0)
+                self.assertFalse(graded[self.mcq.id][1])
+
+    def test_bool_and_text_normalization(self):
+        score, graded = self.grade({self.bool: ' TRUE ', self.text: 'pArIs  '})
+        self.assertEqual(score, 2)
+        # The submitted text is stored as sent.
+        self.assertEqual(graded[self.text.id], ('pArIs  ', True))
+        self.assertEqual(self.grade({self.bool: 'false', self.text: 'Lyon'})[0], 0)
+
+    def test_missing_and_blank_answers(self):
+        score, graded = self.grade({self.bool: '', self.text: None})
+        self.assertEqual(score, 0)
+        self.assertEqual(len(graded), 4)
+        self.assertTrue(all(entry == ('', False) for entry in graded.values()))
+
+
+class GradingJobTests(TestCase):
+    """
+    A job that raises while graded or stored fails on its own, without holding up the batch.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='jobs@example.com', username='jobs', password='Jobs@1234')
+        cls.quiz = Quiz.objects.create(title='Queued quiz')
+        question = Question.objects.create(quiz=cls.quiz, text='Capital?', question_type='TEXT')
+        Answer.objects.create(question=question, text='Paris', is_correct=True)
+        cls.answers = {str(question.id): 'Paris'}
+
+    def setUp(self):
+        answer_keys.clear()
+
+    def job(self, answers):
+        return enqueue_submission(self.quiz, self.user, answers).grading_job
+
+    def reload(self, job):
+        return GradingJob.objects.select_related('submission').get(pk=job.pk)
+
+    def test_grading_error(self):
+        good, bad = self.job(self.answers), self.job(self.answers)
+        # JSONField accepts any JSON: a list instead of a mapping can't be graded.
+        GradingJob.objects.filter(pk=bad.pk).update(answers=['Paris'])
+        self.assertEqual(grade_jobs(claim_jobs(10)), (1, 1))
+        good, bad = self.reload(good), self.reload(bad)
+        self.assertEqual((good.status, good.submission.status, good.submission.score), ('DONE', 'GRADED', 1))
+        # Fails right away: grading it again gives the same error.
+        self.assertEqual((bad.status, bad.submission.status), ('FAILED', 'PENDING'))
+        self.assertIn('list', bad.error)
+
+    def test_storing_error(self):
+        good, bad = self.job(self.answers), self.job(self.answers)
+
+        def failing(submissions):
+            if any(submission.pk == bad.submission_id for submission in submissions):
+                raise ValueError('Stats update failed')
+            after_grading(submissions)
+
+        with mock.patch('quiz.jobs.after_grading', side_effect=failing):
+            self.assertEqual(grade_jobs(claim_jobs(10), max_attempts=1), (1, 1))
+        good, bad = self.reload(good), self.reload(bad)
+        self.assertEqual(good.status, 'DONE')
+        self.assertEqual((bad.status, bad.error, bad.submission.status), ('FAILED', 'Stats update failed', 'PENDING'))
+        self.assertFalse(bad.submission.answers.exists())
+
+    def test_storing_error_is_retried(self):
+        job = self.job(self.answers)
+        with mock.patch('quiz.jobs.after_grading', side_effect=ValueError('Stats update failed')):
+            self.assertEqual(grade_jobs(claim_jobs(10), max_attempts=3), (0, 1))
+        job = self.reload(job)
+        self.assertEqual((job.status, job.error), ('QUEUED', 'Stats update failed'))
+
+
+class LeaderboardTests(TestCase):
+    """
+    Entries keep each user's best score; equal scores rank by the earlier submission.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quiz = Quiz.objects.create(title='Ranked quiz')
+        cls.users = [
+            User.objects.create_user(email=f'rank{number}@example.com', username=f'rank{number}', password='Rank@1234')
+            for number in range(3)
+        ]
+        cls.start = timezone.make_aware(datetime(2030, 1, 1, 12))
+
+    def submit(self, user, score, minutes):
+        """
+        Record a graded submission made `minutes` after the start.
+        """
+        submission = UserSubmission.objects.create(quiz=self.quiz, user=user, score=score)
+        submission.submitted_at = self.start + timedelta(minutes=minutes)
+        UserSubmission.objects.filter(pk=submission.pk).update(submitted_at=submission.submitted_at)
+        leaderboard.record_submissions([submission])
+        return submission
+
+    def ranks(self):
+        return [getattr(leaderboard.rank_of(self.quiz.id, user.id), 'rank', None) for user in self.users]
+
+    def test_tie_break(self):
+        self.submit(self.users[0], 5, minutes=10)
+        self.submit(self.users[1], 5, minutes=5)
+        self.submit(self.users[2], 7, minutes=20)
+        self.assertEqual(self.ranks(), [3, 2, 1])
+        self.assertEqual([entry.user for entry in leaderboard.top(self.quiz.id, 10)], self.users[::-1])
+
+    def test_better_score_replaces_entry(self):
+        self.submit(self.users[0], 3, minutes=1)
+        self.submit(self.users[1], 5, minutes=2)
+        better = self.submit(self.users[0], 6, minutes=3)
+        entry = LeaderboardEntry.objects.get(quiz=self.quiz, user=self.users[0])
+        self.assertEqual((entry.best_score, entry.achieved_at, entry.submission), (6, better.submitted_at, better))
+        self.assertEqual(leaderboard.rank_of(self.quiz.id, self.users[0].id).rank, 1)
+
+    def test_same_score_earlier_replaces_entry(self):
+        self.submit(self.users[0], 5, minutes=10)
+        # Replayed offline attempt, reached earlier.
+        earlier = self.submit(self.users[0], 5, minutes=1)
+        self.assertEqual(LeaderboardEntry.objects.get(quiz=self.quiz, user=self.users[0]).submission, earlier)
+
+    def test_worse_or_later_score_ignored(self):
+        best = self.submit(self.users[0], 5, minutes=1)
+        self.submit(self.users[0], 2, minutes=2)
+        self.submit(self.users[0], 5, minutes=3)
+        entry = LeaderboardEntry.objects.get(quiz=self.quiz, user=self.users[0])
+        self.assertEqual((entry.best_score, entry.achieved_at, entry.submission), (5, best.submitted_at, best))
+
+    def test_best_of_one_batch(self):
+        submissions = [
+            UserSubmission.objects.create(quiz=self.quiz, user=self.users[0], score=score) for score in (4, 8, 6)
+        ]
+        leaderboard.record_submissions(submissions)
+        self.assertEqual(LeaderboardEntry.objects.get(quiz=self.quiz, user=self.users[0]).submission, submissions[1])
+
+    def test_not_ranked(self):
+        self.assertIsNone(leaderboard.rank_of(self.quiz.id, self.users[0].id))
+
+    def buckets(self):
+        return dict(LeaderboardBucket.objects.filter(quiz=self.quiz, entries__gt=0).values_list('score', 'entries'))
+
+    def test_same_score_and_time(self):
+        for user in self.users[::-1]:
+            self.submit(user, 5, minutes=1)
+        self.assertEqual(self.ranks(), [1, 2, 3])
+        self.assertEqual([entry.user for entry in leaderboard.top(self.quiz.id, 10)], self.users)
+
+    def test_buckets(self):
+        self.submit(self.users[0], 3, minutes=1)
+        self.submit(self.users[1], 3, minutes=2)
+        self.submit(self.users[2], 8, minutes=3)
+        self.assertEqual(self.buckets(), {3: 2, 8: 1})
+        self.submit(self.users[0], 9, minutes=4)
+        self.submit(self.users[1], 1, minutes=5)
+        self.assertEqual(self.buckets(), {3: 1, 8: 1, 9: 1})
+        with self.assertNumQueries(1):
+            self.assertEqual(leaderboard.rank_of(self.quiz.id, self.users[1].id).rank, 3)
+        self.users[0].delete()
+        self.assertEqual(self.buckets(), {3: 1, 8: 1})
+        self.assertEqual(leaderboard.rank_of(self.quiz.id, self.users[1].id).rank, 2)
+
+    def test_rebuild(self):
+        self.submit(self.users[0], 4, minutes=1)
+        self.submit(self.users[1], 6, minutes=2)
+        self.submit(self.users[1], 2, minutes=3)
+        ranks, buckets = self.ranks()[:2], self.buckets()
+        LeaderboardBucket.objects.update(entries=0)
+        self.assertEqual(leaderboard.rebuild(self.quiz.id), 2)
+        self.assertEqual((self.ranks()[:2], self.buckets()), (ranks, buckets))
+
+
+class QuestionCountTests(TestCase):
+    """
+    Quiz.question_count follows every way of adding, removing and moving questions.
+    """
+
+    def setUp(self):
+        self.quiz = Quiz.objects.create(title='Counted quiz')
+        self.other = Quiz.objects.create(title='Other quiz')
+
+    def counts(self):
+        return list(Quiz.objects.filter(pk__in=[self.quiz.pk, self.other.pk]).order_by('pk').values_list('question_count', flat=True))
+
+    def add(self, quiz, number):
+        return Question.objects.bulk_create(
+            [Question(quiz=quiz, text=f'Question {index}') for index in range(number)]
+        )
+
+    def test_create_and_delete(self):
+        question = Question.objects.create(quiz=self.quiz, text='Question')
+        Question.objects.create(quiz=self.other, text='Question')
+        self.assertEqual(self.counts(), [1, 1])
+        question.delete()
+        self.assertEqual(self.counts(), [0, 1])
+
+    def test_bulk_create_and_delete(self):
+        self.add(self.quiz, 3)
+        self.add(self.other, 2)
+        self.assertEqual(self.counts(), [3, 2])
+        Question.objects.filter(quiz__in=[self.quiz, self.other], text='Question 0').delete()
+        self.assertEqual(self.counts(), [2, 1])
+
+    def test_move(self):
+        questions = self.add(self.quiz, 3)
+        version = Quiz.objects.get(pk=self.other.pk).version
+        Question.objects.filter(pk__in=[question.pk for question in questions[:2]]).update(quiz=self.other)
+        self.assertEqual(self.counts(), [1, 2])
+        self.assertEqual(Quiz.objects.get(pk=self.other.pk).version, version + 1)
+        Question.objects.filter(quiz=self.other).update(quiz_id=self.quiz.pk)
+        self.assertEqual(self.counts(), [3, 0])
+
+    def check_counts(self, *args):
+        out = StringIO()
+        call_command('check_question_counts', *args, stdout=out)
+        return out.getvalue()
+
+    def test_check_and_repair(self):
+        self.add(self.quiz, 2)
+        self.assertIn('consistent', self.check_counts())
+        Quiz.objects.filter(pk=self.quiz.pk).update(question_count=5)
+        Quiz.objects.filter(pk=self.other.pk).update(question_count=1)
+        self.assertIn('2 quizzes with a wrong question count', self.check_counts())
+        self.assertEqual(self.counts(), [5, 1])
+        self.assertIn('repaired', self.check_counts('--repair'))
+        self.assertEqual(self.counts(), [2, 0])
+        self.assertIn('consistent', self.check_counts())
+
+
+class SearchTests(TestCase):
+    """
+    Quiz search ranks title matches first and follows edits of quizzes, questions and events.
+    """
+
+    def setUp(self):
+        self.by_title = self.quiz('Volcano basics', 'Rocks')
+        self.by_description = self.quiz('Earth science', 'All about the volcano')
+        self.by_question = self.quiz('Geography', 'Places', questions=['Which volcano erupted in 79 AD?'])
+
+    def quiz(self, title, description, questions=('Question',)):
+        quiz = Quiz.objects.create(title=title, description=description)
+        for text in questions:
+            Question.objects.create(quiz=quiz, text=text)
+        return quiz
+
+    def titles(self, text):
+        return [quiz.title for quiz in search_quizzes(text, limit=10)]
+
+    def test_ranking(self):
+        self.assertEqual(self.titles('volcano'), ['Volcano basics', 'Earth science', 'Geography'])
+        # Every word must match, the last one as a prefix.
+        self.assertEqual(self.titles('volcano erup'), ['Geography'])
+        self.assertEqual(self.titles('volcano"  OR rocks'), [])
+
+    def test_pages(self):
+        first = search_quizzes('volcano', limit=2)
+        last = first[-1]
+        rest = search_quizzes('volcano', limit=2, after=(last.search_rank, last.id))
+        self.assertEqual([quiz.title for quiz in rest], ['Geography'])
+
+    def test_unlisted_quizzes(self):
+        Question.objects.filter(quiz=self.by_title).delete()
+        self.assertEqual(self.titles('volcano'), ['Earth science', 'Geography'])
+
+    def test_icontains_fallback(self):
+        Event.objects.create(event_title='Concert', event_desc='Live music', event_date=date(2099, 1, 1), location='Pune')
+        with mock.patch('quiz.search.has_fts', return_value=False):
+            self.assertEqual(self.titles('VOLCANO'), ['Volcano basics', 'Earth science', 'Geography'])
+            self.assertEqual(self.titles('volcano erupted'), ['Geography'])
+            self.assertEqual([event.event_title for event in search_events('CONCERT')], ['Concert'])
+
+    def test_quiz_edits(self):
+        self.by_title.title = 'Glaciers'
+        self.by_title.save()
+        Quiz.objects.filter(pk=self.by_description.pk).update(description='Plates')
+        self.assertEqual(self.titles('volcano'), ['Geography'])
+        self.assertEqual(self.titles('glaciers'), ['Glaciers'])
+
+    def test_question_edits(self):
+        question = self.by_question.questions.get()
+        question.text = 'Which glacier is the longest?'
+        question.save()
+        self.assertEqual(self.titles('glacier'), ['Geography'])
+        Question.objects.filter(pk=question.pk).update(text='Name a geyser')
+        self.assertEqual(self.titles('glacier'), [])
+        self.assertEqual(self.titles('geyser'), ['Geography'])
+        Question.objects.create(quiz=self.by_title, text='Name a geyser too')
+        self.assertCountEqual(self.titles('geyser'), ['Geography', 'Volcano basics'])
+        Question.objects.filter(quiz=self.by_question).delete()
+        self.assertEqual(self.titles('geyser'), ['Volcano basics'])
+
+    def test_event_edits(self):
+        event = Event.objects.create(event_title='Concert', event_desc='Live music', event_date=date(2099, 1, 1), location='Pune')
+        self.assertEqual(list(search_events('music')), [event])
+        event.event_desc = 'Open air'
+        event.save()
+        self.assertEqual(list(search_events('music')), [])
+        self.assertEqual(list(search_events('open air')), [event])
+        event.delete()
+        self.assertEqual(list(search_events('concert')), [])
+
+
+class UserStatsCheckTests(TestCase):
+    """
+    check_user_stats finds stats that drifted from the graded submissions and --repair rewrites them.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # Quiz ids are reused once a test rolls back: drop keys cached under the same id and version.
+        answer_keys.clear()
+        cls.quiz = Quiz.objects.create(title='Stats quiz')
+        question = Question.objects.create(quiz=cls.quiz, text='Capital?', question_type='TEXT')
+        Answer.objects.create(question=question, text='Paris', is_correct=True)
+        cls.users = [
+            User.objects.create_user(email=f'stats{number}@example.com', username=f'stats{number}', password='Stats@1234')
+            for number in range(3)
+        ]
+        for user, answers in zip(cls.users, (['Paris', 'Lyon'], ['Paris'], [])):
+            for answer in answers:
+                submit_quiz(cls.quiz, user, {str(question.id): answer})
+
+    def stats(self):
+        return {
+            user_id: values
+            for user_id, *values in UserSubmissionStats.objects.order_by('user_id').values_list(
+                'user_id', 'total_submissions', 'score_sum', 'best_score', 'last_submitted_at'
+            )
+        }
+
+    def check_stats(self, *args):
+        out = StringIO()
+        call_command('check_user_stats', *args, stdout=out)
+        return out.getvalue()
+
+    def test_check_and_repair(self):
+        correct = self.stats()
+        self.assertEqual([values[:3] for values in correct.values()], [[2, 1, 1], [1, 1, 1]])
+        self.assertIn('Stats of 2 users are consistent', self.check_stats())
+
+        UserSubmissionStats.objects.filter(user=self.users[0]).update(total_submissions=7, best_score=0)
+        UserSubmissionStats.objects.filter(user=self.users[1]).delete()
+        UserSubmissionStats.objects.create(user=self.users[2], total_submissions=1, score_sum=1, best_score=1)
+        self.assertIn('2 users with wrong or missing stats, 1 stats rows without submissions', self.check_stats())
+        self.assertNotEqual(self.stats(), correct)
+
+        self.assertIn('Stats repaired', self.check_stats('--repair'))
+        self.assertEqual(self.stats(), correct)
+        self.assertIn('consistent', self.check_stats())
+
+
+class AnswerSnapshotTests(TestCase):
+    """
+    Answers graded before snapshots existed render from their questions and are backfilled.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        answer_keys.clear()
+        cls.user = User.objects.create_user(email='snapshot@example.com', username='snapshot', password='Snap@1234')
+        cls.quiz = Quiz.objects.create(title='Snapshot quiz')
+        cls.mcq = Question.objects.create(quiz=cls.quiz, text='Pick', question_type='MCQ')
+        cls.first = Answer.objects.create(question=cls.mcq, text='First right', is_correct=True)
+        Answer.objects.create(question=cls.mcq, text='Second right', is_correct=True)
+        cls.text = Question.objects.create(quiz=cls.quiz, text='Capital?', question_type='TEXT')
+        Answer.objects.create(question=cls.text, text='Paris', is_correct=True)
+        cls.open = Question.objects.create(quiz=cls.quiz, text='Anything?', question_type='TEXT')
+        answers = {str(cls.mcq.id): str(cls.first.id), str(cls.text.id): 'Lyon', str(cls.open.id): 'Maybe'}
+        cls.legacy = submit_quiz(cls.quiz, cls.user, answers)
+        cls.current = submit_quiz(cls.quiz, cls.user, answers)
+        UserAnswer.objects.filter(submission=cls.legacy).update(question_text=None, correct_answer=None)
+
+    expected = [
+        ('Pick', 'First right', 'First right', True),
+        ('Capital?', 'Lyon', 'Paris', False),
+        ('Anything?', 'Maybe', None, False),
+    ]
+
+    def rows(self, answers):
+        return [(answer.question_text, answer.answer, answer.correct_answer, answer.is_correct) for answer in answers]
+
+    def stored(self, submission):
+        return self.rows(UserAnswer.objects.filter(submission=submission).order_by('id'))
+
+    def test_legacy_rendering(self):
+        submission = UserSubmission.objects.get(pk=self.legacy.pk)
+        # The answers, then the questions and answer keys of the legacy rows.
+        with self.assertNumQueries(3):
+            self.assertEqual(self.rows(result_answers(submission)), self.expected)
+        self.assertEqual(self.rows(submission.answers.all()), self.expected)
+        # Filled in memory only.
+        self.assertTrue(all(row[0] is None for row in self.stored(self.legacy)))
+
+    def test_legacy_result_api(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        response = client.get(reverse('quiz-result', args=[self.legacy.id]))
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            [tuple(answer.values()) for answer in response.json()['data']['answers']],
+            [(question, answer, is_correct, correct) for question, answer, correct, is_correct in self.expected],
+        )
+
+    def test_backfill(self):
+        # Snapshots keep the text the answers were graded against.
+        Question.objects.filter(pk=self.text.pk).update(text='Capital of France?')
+        expected = [('Capital of France?', *self.expected[1][1:]) if row[0] == 'Capital?' else row for row in self.expected]
+        out = StringIO()
+        call_command('backfill_answer_snapshots', '--chunk-size', '2', stdout=out)
+        self.assertIn('Backfilled 3 answers', out.getvalue())
+        self.assertEqual(self.stored(self.legacy), expected)
+        self.assertEqual(self.stored(self.current), self.expected)
+        # Nothing left to read from the questions.
+        submission = UserSubmission.objects.get(pk=self.legacy.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.rows(result_answers(submission)), expected)
 
-# Create your tests here.
+        out = StringIO()
+        call_command('backfill_answer_snapshots', stdout=out)
+        self.assertIn('No answers to backfill', out.getvalue())
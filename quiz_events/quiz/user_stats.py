@@ -0,0 +1,102 @@
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Greatest
+
+from quiz.models import UserSubmission, UserSubmissionStats
+
+
+def _totals_per_user(submissions):
+    totals = {}
+    for submission in submissions:
+        count, score_sum, best, last = totals.get(submission.user_id, (0, 0, None, None))
+        totals[submission.user_id] = (
+            count + 1,
+            score_sum + submission.score,
+            submission.score if best is None else max(best, submission.score),
+            submission.submitted_at if last is None else max(last, submission.submitted_at),
+        )
+    return totals
+
+
+def record_submissions(submissions):
+    """
+    Add newly graded submissions to their users' stats with one UPDATE per user.
+    """
+    for user_id, (count, score_sum, best, last) in _totals_per_user(submissions).items():
+        stats, created = UserSubmissionStats.objects.get_or_create(
+            user_id=user_id,
+            defaults={
+                'total_submissions': count,
+                'score_sum': score_sum,
+                'best_score': best,
+                'last_submitted_at': last,
+            },
+        )
+        if created:
+            continue
+        UserSubmissionStats.objects.filter(pk=stats.pk).update(
+            total_submissions=F('total_submissions') + count,
+            score_sum=F('score_sum') + score_sum,
+            best_score=Greatest('best_score', best),
+            last_submitted_at=Greatest('last_submitted_at', last) if stats.last_submitted_at else last,
+        )
+
+
+def expected_stats():
+    """
+    Stats of every user recomputed from the graded submissions, as {user_id: values}.
+    """
+    rows = (
+        UserSubmission.objects.filter(status='GRADED')
+        .values('user_id')
+        .annotate(
+            total_submissions=Count('id'),
+            score_sum=Sum('score'),
+            best_score=Max('score'),
+            last_submitted_at=Max('submitted_at'),
+        )
+        .order_by()
+    )
+    return {row.pop('user_id'): row for row in rows.iterator()}
+
+
+def find_mismatches():
+    """
+    Compare the stats table with recomputed values.
+    Returns (expected, wrong user ids, orphan stats ids).
+    """
+    expected = expected_stats()
+    wrong = []
+    orphans = []
+    stored = UserSubmissionStats.objects.values_list(
+        'id', 'user_id', 'total_submissions', 'score_sum', 'best_score', 'last_submitted_at'
+    )
+    seen = set()
+    for pk, user_id, total, score_sum, best, last in stored.iterator():
+        values = expected.get(user_id)
+        if values is None:
+            orphans.append(pk)
+            continue
+        seen.add(user_id)
+        if (
+            total != values['total_submissions']
+            or abs(score_sum - values['score_sum']) > 1e-6
+            or best != values['best_score']
+            or last != values['last_submitted_at']
+        ):
+            wrong.append(user_id)
+    missing = [user_id for user_id in expected if user_id not in seen]
+    return expected, wrong + missing, orphans
+
+
+def repair(expected, user_ids, orphans, batch_size=1000):
+    """
+    Rewrite the stats of `user_ids` from `expected` and drop the `orphans`.
+    """
+    existing = dict(
+        UserSubmissionStats.objects.filter(user_id__in=user_ids).values_list('user_id', 'id')
+    ) if user_ids else {}
+    rows = [UserSubmissionStats(id=existing.get(user_id), user_id=user_id, **expected[user_id]) for user_id in user_ids]
+    fields = ['total_submissions', 'score_sum', 'best_score', 'last_submitted_at']
+    UserSubmissionStats.objects.bulk_update([row for row in rows if row.id], fields, batch_size=batch_size)
+    UserSubmissionStats.objects.bulk_create([row for row in rows if not row.id], batch_size=batch_size)
+    UserSubmissionStats.objects.filter(pk__in=orphans).delete()
@@ -1,11 +1,18 @@
+from django.contrib import messages
 from django.shortcuts import render, redirect
 from django.shortcuts import get_object_or_404
 from django.views.generic.list import ListView
 from django.views.generic.detail import DetailView
-from django.utils import timezone
-from django.db.models import Count
 
-from quiz.models import Quiz, Question, Answer, UserSubmission, UserAnswer, Event
+from quiz.models import Quiz, UserSubmission, Event, UserSubmissionStats
+from quiz.grading import submit_quiz, result_answers
+from quiz.cache import upcoming_events
+from quiz.search import search_quizzes, search_terms
+from quiz_events.write_lane import WriteLaneBusy
+from utils import QuizMessage
+
+# Matches shown by a quiz list search.
+SEARCH_RESULTS = 50
 
 # Create your views here.
 
@@ -16,23 +23,28 @@ def home(request):
     """
 
     if request.user.is_authenticated:
-        submissions = UserSubmission.objects.filter(user=request.user).select_related('user').order_by('-submitted_at')
-        return render(request,'quiz/home.html', {'submissions': submissions, 'total_submissions': submissions.count()})
+        submissions = UserSubmission.objects.filter(user=request.user).select_related('user', 'quiz').order_by('-submitted_at')
+        stats = UserSubmissionStats.objects.filter(user=request.user).first()
+        total_submissions = stats.total_submissions if stats else 0
+        return render(request,'quiz/home.html', {'submissions': submissions, 'total_submissions': total_submissions})
     else:
         return redirect('login')
 
 
 def quiz_list(request):
     """
-    Show all quizzes that contain at least one question.
+    Show all quizzes that contain at least one question, or the best
+    matches of the `q` search.
     Redirects to login if the user is not authenticated.
     """
 
     if request.user.is_authenticated:
-        quizzes = Quiz.objects.annotate(
-            question_count=Count("questions")
-        ).filter(question_count__gt=0).order_by('-created_at')
-        return render(request, 'quiz/quiz_list.html',{'quizzes': quizzes})
+        query = request.GET.get('q', '').strip()
+        if search_terms(query):
+            quizzes = search_quizzes(query, limit=SEARCH_RESULTS)
+        else:
+            quizzes = Quiz.objects.filter(question_count__gt=0).order_by('-created_at', '-id')
+        return render(request, 'quiz/quiz_list.html',{'quizzes': quizzes, 'query': query})
     else:
         return redirect('login')
 
@@ -46,71 +58,24 @@ def start_quiz(request, quiz_id):
 
     if request.user.is_authenticated:
         quiz = get_object_or_404(Quiz, id=quiz_id)
-        questions = quiz.questions.all()
+        questions = quiz.questions.prefetch_related('answers')
         if request.method == "POST":
-            submission = UserSubmission.objects.create(
-                quiz = quiz,
-                user = request.user,
-                score = 0,
-            )
-            score = 0
-            for q in questions:
-                field_name = f"question_{q.id}"
-                user_answer_value = request.POST.get(field_name)
-                
-                if not user_answer_value:
-                    UserAnswer.objects.create(
-                        submission = submission,
-                        question = q,
-                        answer = "",
-                        is_correct = False
-                    )
-                    continue
-                if q.question_type == "MCQ":
-                    selected_answer = Answer.objects.get(id=user_answer_value)
-                    is_correct = selected_answer.is_correct
-                    
-                    UserAnswer.objects.create(
-                        submission=submission,
-                        question = q,
-                        answer = selected_answer,
-                        is_correct = is_correct
-                    )
-                    if is_correct:
-                        score = score + 1
-
-                elif q.question_type == 'BOOL':
-                    correct = q.answers.filter(is_correct=True).first()
-                    is_correct = (correct.text.lower() == user_answer_value.lower())
-                    UserAnswer.objects.create(
-                        submission = submission,
-                        question = q,
-                        answer = user_answer_value,
-                        is_correct = is_correct
-                    )
-                    if is_correct:
-                        score = score + 1
-
-                elif q.question_type == "TEXT":
-                    correct = q.answers.filter(is_correct=True).first()
-
-                    is_correct = (
-                        correct and 
-                        correct.text.strip().lower() == user_answer_value.strip().lower()
-                    )
-
-                    UserAnswer.objects.create(
-                        submission=submission,
-                        question=q,
-                        answer=user_answer_value,
-                        is_correct=is_correct
-                    )
-
-                    if is_correct:
-                        score += 1        
-
-            submission.score = score
-            submission.save()
+            answers = {
+                name[len('question_'):]: value
+                for name, value in request.POST.items()
+                if name.startswith('question_')
+            }
+            try:
+                submission = submit_quiz(quiz, request.user, answers)
+            except WriteLaneBusy:
+                # Nothing was stored: show the quiz again so it can be resubmitted.
+                messages.error(request, QuizMessage.QUIZ_SUBMISSION_BUSY)
+                response = render(request, 'quiz/start_quiz.html', {
+                    'quiz': quiz,
+                    'questions': questions
+                }, status=503)
+                response['Retry-After'] = '1'
+                return response
 
             return redirect('quiz_result', submission.id)                
 
@@ -130,7 +95,7 @@ def quiz_result(request, submission_id):
     
     if request.user.is_authenticated:
         submission = get_object_or_404(UserSubmission, id=submission_id)
-        user_answers = submission.answers.select_related('question')
+        user_answers = result_answers(submission)
 
         return render(request, 'quiz/quiz_result.html', {
             'submission': submission,
@@ -151,8 +116,7 @@ class EventListView(ListView):
 
 
     def get_queryset(self):
-        today = timezone.localdate()
-        return Event.objects.filter(event_date__gte=today)
+        return upcoming_events()
     
 
 class EventDetailView(DetailView):
@@ -10,7 +10,16 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.handlers.asgi import ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_events.settings')
 
 application = get_asgi_application()
+
+
+class QuizEventsASGIRequest(ASGIRequest):
+    # Route requests through the URLconf with the async API views.
+    urlconf = 'quiz_events.urls_asgi'
+
+
+application.request_class = QuizEventsASGIRequest
@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.db import connections
+
+from quiz_events import routers
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """
+    connection.execute_wrapper callable counting queries, per database alias too, and their total time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.by_alias = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.by_alias[context['connection'].alias] += 1
+
+
+class AliasQueryTotals:
+    """
+    Queries run by the requests of this process, per database alias.
+    """
+
+    def __init__(self):
+        self.totals = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, counter):
+        with self._lock:
+            self.totals.update(counter.by_alias)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.totals)
+
+
+query_totals = AliasQueryTotals()
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the database queries of every request and check them against
+    settings.QUERY_BUDGETS, a {url_name: max queries} mapping.
+
+    QUERY_BUDGET_MODE is 'log' (warn about requests over budget), 'raise'
+    (raise QueryBudgetExceeded, used by the tests) or 'off'.
+    X-DB-Queries, X-DB-Aliases (queries per database alias) and X-DB-Time (ms) headers
+    are added when QUERY_BUDGET_HEADERS is set.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        with self.counting(counter):
+            response = self.get_response(request)
+        return self.check(request, response, counter)
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        # Database connections are per thread and the ORM, async API included, runs queries
+        # on the request's sync thread, so the wrappers go on that thread's connections.
+        with await sync_to_async(self.counting)(counter):
+            response = await self.get_response(request)
+        return self.check(request, response, counter)
+
+    def counting(self, counter):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        return stack
+
+    def check(self, request, response, counter):
+        query_totals.add(counter)
+        if getattr(settings, 'QUERY_BUDGET_HEADERS', settings.DEBUG):
+            response['X-DB-Queries'] = str(counter.count)
+            response['X-DB-Aliases'] = ', '.join(f'{alias}={count}' for alias, count in sorted(counter.by_alias.items()))
+            response['X-DB-Time'] = f"{counter.duration * 1000:.2f}"
+
+        mode = getattr(settings, 'QUERY_BUDGET_MODE', 'log')
+        match = request.resolver_match
+        if mode == 'off' or match is None:
+            return response
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(match.url_name)
+        if budget is not None and counter.count > budget:
+            message = (
+                f"{request.method} {request.path} ({match.url_name}) ran {counter.count} queries "
+                f"in {counter.duration * 1000:.2f} ms, budget is {budget}"
+            )
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Scope the replica routing of quiz_events.routers to each request: requests with an
+    unsafe method read from the primary, and so do the requests of a user for
+    REPLICA_STICKY_SECONDS after one of their unsafe requests. Users are known from
+    their session here, token users once CachedJWTAuthentication resolves them.
+    Does nothing when no replica is configured.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not routers.replicas():
+            return self.get_response(request)
+        token = routers.begin_request(request)
+        try:
+            # Reading the session of a request without a session cookie would only add Vary: Cookie.
+            if settings.SESSION_COOKIE_NAME in request.COOKIES:
+                user_id = request.session.get(SESSION_KEY)
+                if user_id is not None:
+                    routers.set_user(user_id)
+            return self.get_response(request)
+        finally:
+            routers.end_request(token)
+
+    async def __acall__(self, request):
+        if not routers.replicas():
+            return await self.get_response(request)
+        token = routers.begin_request(request)
+        try:
+            if settings.SESSION_COOKIE_NAME in request.COOKIES:
+                user_id = await request.session.aget(SESSION_KEY)
+                if user_id is not None:
+                    await routers.aset_user(user_id)
+            return await self.get_response(request)
+        finally:
+            await routers.aend_request(token)
@@ -0,0 +1,131 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_routing = ContextVar('db_routing', default=None)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _sticky_key(user_id):
+    return f"db-sticky:{user_id}"
+
+
+class RoutingState:
+    """
+    Replica routing of the current request. `primary` sends all its reads to the primary,
+    `writes` means the request may write (unsafe method) and `user_id` is whose it is, once known.
+    """
+
+    def __init__(self, writes):
+        self.writes = writes
+        self.primary = writes
+        self.user_id = None
+
+
+def begin_request(request):
+    """
+    Start routing the reads of a request, returns the token to pass to end_request.
+    """
+    return _routing.set(RoutingState(writes=request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')))
+
+
+def end_request(token):
+    state = _routing.get()
+    _routing.reset(token)
+    if state.writes and state.user_id is not None:
+        cache.set(_sticky_key(state.user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+async def aend_request(token):
+    state = _routing.get()
+    _routing.reset(token)
+    if state.writes and state.user_id is not None:
+        await cache.aset(_sticky_key(state.user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def set_user(user_id):
+    """
+    Record whose request this is. Their reads go to the primary while their last
+    write is under REPLICA_STICKY_SECONDS old, so they see what they just wrote.
+    """
+    state = _routing.get()
+    if state is None or state.user_id == user_id:
+        return
+    state.user_id = user_id
+    if not state.primary and replicas() and cache.get(_sticky_key(user_id)):
+        state.primary = True
+
+
+async def aset_user(user_id):
+    state = _routing.get()
+    if state is None or state.user_id == user_id:
+        return
+    state.user_id = user_id
+    if not state.primary and replicas() and await cache.aget(_sticky_key(user_id)):
+        state.primary = True
+
+
+@contextmanager
+def primary_reads():
+    """
+    Send the reads of the block to the primary. Caches refilled after an invalidation
+    read through it: a lagging replica would store stale rows under the new generation.
+    """
+    state = _routing.get()
+    if state is None or state.primary:
+        yield
+        return
+    state.primary = True
+    try:
+        yield
+    finally:
+        state.primary = False
+
+
+class PrimaryReplicaRouter:
+    """
+    Send the reads of safe-method requests to a random alias of settings.DATABASE_REPLICAS
+    and everything else to the primary ('default').
+
+    Reads stay on the primary outside requests (commands, worker threads), inside a
+    transaction, where they must see its writes, for sessions, which are read right
+    after being written, for users who wrote recently (see set_user) and for cache
+    refills (see primary_reads). Related objects are read from the database their
+    instance came from.
+    """
+
+    primary_apps = {'sessions'}
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        aliases = replicas()
+        state = _routing.get()
+        if (
+            not aliases
+            or state is None
+            or state.primary
+            or model._meta.app_label in self.primary_apps
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, migrated through it.
+        return db not in replicas()
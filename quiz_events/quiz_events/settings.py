@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 
@@ -51,11 +52,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'quiz_events.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'quiz_events.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,10 +86,59 @@ WSGI_APPLICATION = 'quiz_events.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite is tuned for many concurrent requests: WAL journaling lets reads run while a write
+# commits, synchronous=NORMAL only syncs at checkpoints (safe with WAL, a power loss can drop
+# the last commits), and writers wait up to `timeout` seconds for the lock instead of failing
+# with "database is locked". IMMEDIATE transactions take the write lock when they begin, so
+# two transactions can't both read and then deadlock upgrading to a write.
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=134217728',
+]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+    }
+}
+
+# Read replicas of the default database (see quiz_events.routers). Locally,
+# QUIZ_EVENTS_SQLITE_REPLICAS=N adds N SQLite copies of db.sqlite3, which
+# `manage.py sync_replicas` keeps up to date in place of real replication.
+for number in range(1, int(os.environ.get('QUIZ_EVENTS_SQLITE_REPLICAS', '0')) + 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / f'db.replica{number}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['quiz_events.routers.PrimaryReplicaRouter']
+
+# Seconds the requests of a user keep reading from the primary after one of their requests
+# with an unsafe method, so they see what they wrote. Keep it above the replication lag.
+REPLICA_STICKY_SECONDS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The local-memory cache is per process; point this at a shared backend
+# (e.g. Redis or Memcached) when running several workers so invalidations reach all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quiz-events',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
     }
 }
 
@@ -141,7 +193,7 @@ AUTH_USER_MODEL = "user_accounts.User"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user_accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -189,3 +241,115 @@ Quiz Event App functionalities efficiently.
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+
+# Number of quiz answer keys kept in memory per process (see quiz.grading.AnswerKeyCache).
+ANSWER_KEY_CACHE_SIZE = 512
+
+# Users resolved from access tokens are kept in memory per process for up to
+# AUTH_USER_CACHE_TIMEOUT seconds (see user_accounts.authentication.UserCache);
+# saving a user drops its entry at once. 0 disables the cache.
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TIMEOUT = 30
+
+# Threads hashing passwords for the async login, signup and password change views served
+# through quiz_events/asgi.py (see user_accounts.hashing). None means min(4, CPU count).
+PASSWORD_HASH_WORKERS = None
+
+# Maximum number of attempts accepted by the batch submission API.
+QUIZ_BATCH_SUBMISSION_LIMIT = 200
+
+# When enabled, StartQuizAPI.post only queues the answers (202) and
+# `manage.py run_grading_worker` grades them.
+QUIZ_ASYNC_GRADING = False
+
+# Seconds a rendered StartQuizAPI.get payload stays cached (it is also dropped whenever the quiz changes).
+QUIZ_PAYLOAD_CACHE_TIMEOUT = 3600
+
+# Buffered writer used by utils.custom_response for LogEntry rows (see logentry.writer).
+# SINK is 'database', 'jsonl' (rotating file at JSONL_PATH) or 'stdout'. When the queue is
+# full, OVERFLOW 'drop' discards the entry and 'block' waits up to BLOCK_TIMEOUT seconds first.
+LOGENTRY_WRITER = {
+    'SINK': 'database',
+    'ASYNC': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_QUEUE_SIZE': 10000,
+    'OVERFLOW': 'drop',
+    'BLOCK_TIMEOUT': 0.05,
+    'JSONL_PATH': BASE_DIR / 'logs' / 'api-log.jsonl',
+    'JSONL_MAX_BYTES': 50 * 1024 * 1024,
+    'JSONL_BACKUP_COUNT': 5,
+}
+
+# Under `manage.py test`, entries are written synchronously in the test's own transaction
+# instead of by the writer thread behind its back, where they'd hit a locked test database.
+if sys.argv[1:2] == ['test']:
+    LOGENTRY_WRITER['ASYNC'] = False
+
+# Quiz submissions are stored by a single in-process writer thread (quiz_events.write_lane)
+# that commits everything queued while the previous commit ran in one transaction, at most
+# MAX_BATCH writes. A write not started within TIMEOUT seconds is withdrawn and the
+# submission answered with 503, so the client can resubmit it without storing it twice.
+WRITE_LANE = {
+    'ENABLED': True,
+    'MAX_BATCH': 200,
+    'TIMEOUT': 30.0,
+}
+
+# Raw LogEntry rows older than this are folded into hourly rollups by `manage.py rollup_logentries`.
+LOGENTRY_RETENTION_DAYS = 30
+
+# What custom_response stores in LogEntry.send_data/get_data, per URL name:
+# 'none', 'digest' (size and hash of the JSON payload) or 'prefix' (first PREFIX_LENGTH characters).
+LOGENTRY_CAPTURE = {
+    'DEFAULT': 'digest',
+    'PREFIX_LENGTH': 100,
+    'ENDPOINTS': {
+        'user-signup': 'none',
+        'user-login': 'none',
+        'user-change-password': 'none',
+        'start-quiz-api': 'none',
+        'quiz-result': 'prefix',
+    },
+}
+
+# Default and maximum number of rows returned by the leaderboard API.
+QUIZ_LEADERBOARD_DEFAULT_LIMIT = 10
+QUIZ_LEADERBOARD_MAX_LIMIT = 100
+
+# Default and maximum page size of the paginated list APIs (api.pagination.KeysetPagination).
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+# Maximum database queries per request, by URL name (quiz_events.middleware.QueryBudgetMiddleware).
+# QUERY_BUDGET_MODE is 'log', 'raise' or 'off'; X-DB-Queries/X-DB-Time headers are sent when DEBUG is on.
+QUERY_BUDGET_MODE = 'log'
+QUERY_BUDGET_HEADERS = DEBUG
+# Measured by api.tests.QueryBudgetTests with LOGENTRY_WRITER['ASYNC'] off, so API
+# budgets include the LogEntry insert and web budgets the session and user lookups.
+QUERY_BUDGETS = {
+    # api/urls.py
+    'user-signup': 4,
+    'user-login': 2,
+    'user-profile-update': 3,
+    'user-change-password': 3,
+    'user-detail': 2,
+    'quiz-list': 3,
+    'start-quiz-api': 12,
+    'submit-quiz-batch': 11,
+    'quiz-leaderboard': 3,
+    'quiz-leaderboard-rank': 4,
+    'user-submission-list': 3,
+    'quiz-result': 4,
+    'event-list': 3,
+    'event-search': 3,
+    'event-retrieve': 3,
+    'ops-stats': 2,
+    # quiz/urls.py
+    'home': 4,
+    'quiz_list': 3,
+    'start_quiz': 11,
+    'quiz_result': 4,
+    'all_events': 3,
+    'event_detail': 3,
+}
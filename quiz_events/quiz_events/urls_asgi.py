@@ -0,0 +1,23 @@
+"""
+URL configuration used when the project is served through quiz_events/asgi.py.
+
+Same routes as quiz_events.urls, except the API endpoints that have an async
+version in api.async_views, which serves them under the same paths and names.
+"""
+from django.urls import path, include
+
+from api import async_views
+
+urlpatterns = [
+    path('api/user/signup/', async_views.user_signup, name='user-signup'),
+    path('api/user/login/', async_views.user_login, name='user-login'),
+    path('api/user/user-change-password/', async_views.user_change_password, name='user-change-password'),
+    path('api/quiz/quiz-list/', async_views.quiz_list, name='quiz-list'),
+    path('api/quiz/start/<int:quiz_id>/', async_views.start_quiz, name='start-quiz-api'),
+    path('api/quiz/user-submission-list/', async_views.user_submission_list, name='user-submission-list'),
+    path('api/quiz/result/<int:submission_id>/', async_views.quiz_result, name='quiz-result'),
+    path('api/quiz/event-list/', async_views.event_list, name='event-list'),
+    path('api/quiz/event-search/', async_views.event_search, name='event-search'),
+    path('api/quiz/event-retrieve/<int:id>/', async_views.event_retrieve, name='event-retrieve'),
+    path('', include('quiz_events.urls')),
+]
@@ -0,0 +1,236 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MAX_BATCH': 200,
+    'TIMEOUT': 30.0,
+}
+
+
+class WriteLaneBusy(DatabaseError):
+    """
+    A write the lane didn't start within TIMEOUT seconds. It was withdrawn from the
+    queue, so nothing was stored and the write can safely be sent again.
+    """
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'WRITE_LANE', {})}
+
+
+def commit_group(handler, items, using='default'):
+    """
+    Run handler(items) in one transaction and return its results, one per item.
+    If the transaction fails, each item is retried in its own transaction so a bad
+    item doesn't sink the others; the result of an item that still fails is its exception.
+    """
+    try:
+        with transaction.atomic(using=using):
+            return list(handler(items))
+    except DatabaseError as error:
+        if len(items) == 1:
+            return [error]
+    results = []
+    for item in items:
+        try:
+            with transaction.atomic(using=using):
+                results.extend(handler([item]))
+        except DatabaseError as error:
+            results.append(error)
+    return results
+
+
+class WriteLane:
+    """
+    Single thread writing to the database on behalf of request threads.
+
+    SQLite allows one writer at a time, so concurrent write transactions only queue
+    on the database lock, each paying for its own commit, and fail with "database is
+    locked" when the wait outlasts the busy timeout. Through the lane, writes queue
+    in process instead and everything queued while a commit runs is written by the
+    next transaction: one commit for up to MAX_BATCH writes, however many threads
+    sent them.
+
+    A write is a handler, storing a list of items and returning a result per item,
+    and the items to store; writes with the same handler are stored together.
+
+    A caller waits up to TIMEOUT seconds for its write to start. A write still queued
+    then is withdrawn and fails with WriteLaneBusy; one already being written is waited
+    for, so a write never lands after its caller gave up on it.
+    """
+
+    def __init__(self, config, using='default'):
+        self.config = config
+        self.using = using
+        self.queue = queue.Queue()
+        self.submitted = 0
+        self.commits = 0
+        self.failed = 0
+        self._stats_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Also restarts the thread in a child process after a fork.
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='write-lane', daemon=True)
+                self._thread.start()
+
+    def run_many(self, handler, items):
+        """
+        Store items with handler(items) and return the result of each item, or the
+        DatabaseError it failed with: WriteLaneBusy for items withdrawn after TIMEOUT.
+
+        Writes are made in the calling thread when the lane is disabled and when the
+        caller is already in a transaction, which the lane's transaction couldn't join.
+        """
+        if not items:
+            return []
+        if (
+            not self.config['ENABLED']
+            or connections[self.using].in_atomic_block
+            or threading.current_thread() is self._thread
+        ):
+            return commit_group(handler, items, self.using)
+
+        self._ensure_thread()
+        futures = []
+        for item in items:
+            future = Future()
+            self.queue.put((handler, item, future))
+            futures.append(future)
+        with self._stats_lock:
+            self.submitted += len(items)
+        deadline = time.monotonic() + self.config['TIMEOUT']
+        return [self._wait(future, deadline) for future in futures]
+
+    def _wait(self, future, deadline):
+        try:
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except TimeoutError:
+            # Only succeeds while the write is still queued.
+            if not future.cancel():
+                return future.result()
+        with self._stats_lock:
+            self.failed += 1
+        return WriteLaneBusy(f"Write not started within {self.config['TIMEOUT']} seconds")
+
+    def run(self, handler, item):
+        """
+        Store a single item and return its result, raising the error it failed with.
+        """
+        result = self.run_many(handler, [item])[0]
+        if isinstance(result, DatabaseError):
+            raise result
+        return result
+
+    def _take(self):
+        """
+        Wait for a write, then take everything queued behind it, up to MAX_BATCH writes.
+        A None in the batch is close() asking the thread to stop.
+        """
+        batch = [self.queue.get()]
+        while len(batch) < self.config['MAX_BATCH']:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def write_batch(self, batch):
+        # Writes withdrawn by their caller are dropped; the others can't be withdrawn anymore.
+        batch = [write for write in batch if write[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        groups = {}
+        for handler, item, future in batch:
+            groups.setdefault(handler, []).append((item, future))
+        try:
+            with transaction.atomic(using=self.using):
+                results = {handler: list(handler([item for item, _ in entries])) for handler, entries in groups.items()}
+        except DatabaseError:
+            logger.warning("Write lane batch of %d writes failed, retrying them one group at a time", len(batch), exc_info=True)
+            # Start again on a fresh connection.
+            connections[self.using].close()
+            results = {
+                handler: commit_group(handler, [item for item, _ in entries], self.using)
+                for handler, entries in groups.items()
+            }
+        for handler, entries in groups.items():
+            for (item, future), result in zip(entries, results[handler]):
+                if isinstance(result, DatabaseError):
+                    with self._stats_lock:
+                        self.failed += 1
+                future.set_result(result)
+        with self._stats_lock:
+            self.commits += 1
+
+    def _run(self):
+        try:
+            while True:
+                batch = self._take()
+                writes = [write for write in batch if write is not None]
+                try:
+                    if writes:
+                        self.write_batch(writes)
+                except Exception as error:
+                    logger.exception("Write lane batch of %d writes failed", len(writes))
+                    for _, _, future in writes:
+                        if not future.done():
+                            future.set_exception(error)
+                if len(writes) < len(batch):
+                    break
+        finally:
+            connections[self.using].close()
+
+    def close(self):
+        """
+        Stop the thread after it wrote what is already queued. The next write starts a new one.
+        """
+        with self._start_lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self.queue.put(None)
+            thread.join(timeout=self.config['TIMEOUT'])
+        # Writes queued behind the stop request get a new thread.
+        if not self.queue.empty():
+            self._ensure_thread()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'enabled': self.config['ENABLED'],
+                'queue_depth': self.queue.qsize(),
+                'submitted': self.submitted,
+                'commits': self.commits,
+                'failed': self.failed,
+                'writes_per_commit': round(self.submitted / self.commits, 2) if self.commits else 0.0,
+            }
+
+
+_lane = None
+_lane_lock = threading.Lock()
+
+
+def get_write_lane():
+    global _lane
+    if _lane is None:
+        with _lane_lock:
+            if _lane is None:
+                _lane = WriteLane(get_config())
+                atexit.register(_lane.close)
+    return _lane
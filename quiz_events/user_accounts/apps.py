@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UserAccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_accounts'
+
+    def ready(self):
+        from user_accounts import schema, signals  # noqa: F401
@@ -0,0 +1,164 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from quiz_events import routers
+
+
+def _auth_version_key(user_id):
+    return f"user-auth-version:{user_id}"
+
+
+def auth_version(user_id):
+    """
+    Opaque token that changes every time the user is saved or deleted (see user_accounts.signals).
+    """
+    key = _auth_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+async def aauth_version(user_id):
+    key = _auth_version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_auth_version(user_id):
+    """
+    Start a new auth version so users cached under the old one are never served again.
+    """
+    cache.set(_auth_version_key(user_id), uuid.uuid4().hex, None)
+
+
+class UserCache:
+    """
+    Per-process LRU cache of authenticated users keyed by user id and auth version.
+
+    An entry is only reused while the user's auth version matches and for at most
+    `timeout` seconds, so a change made where this process can't see the version
+    bump (another process with its own local cache backend, a queryset update)
+    still takes effect within the timeout. A timeout of 0 disables the cache.
+    """
+
+    def __init__(self, max_size=10000, timeout=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                # Requests may change their user, never hand out the cached instance.
+                return copy.copy(entry[2])
+            self.misses += 1
+        return None
+
+    def set(self, user_id, version, user):
+        if self.timeout <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic() + self.timeout, copy.copy(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'timeout': self.timeout}
+
+
+auth_users = UserCache(
+    getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000),
+    getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 30),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from `auth_users` instead of
+    querying the user table on every request. Cached users go through the same
+    active and revoked-token checks as freshly loaded ones. The user is also passed
+    to the replica routing (quiz_events.routers) so they read their own writes.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        routers.set_user(user_id)
+        version = auth_version(user_id)
+        user = auth_users.get(user_id, version)
+        if user is None:
+            # Cached under the new auth version, so not from a replica that may lag behind it.
+            with routers.primary_reads():
+                user = super().get_user(validated_token)
+            auth_users.set(user_id, version, user)
+            return user
+        return self.check_cached_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views: only a cache miss touches the database.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        await routers.aset_user(user_id)
+        version = await aauth_version(user_id)
+        user = auth_users.get(user_id, version)
+        if user is None:
+            with routers.primary_reads():
+                user = await sync_to_async(super().get_user)(validated_token)
+            auth_users.set(user_id, version, user)
+            return user
+        return self.check_cached_user(user, validated_token)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def check_cached_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
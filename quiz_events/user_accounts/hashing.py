@@ -0,0 +1,71 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+from user_accounts.models import User
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def hash_workers():
+    return getattr(settings, 'PASSWORD_HASH_WORKERS', None) or min(4, os.cpu_count() or 1)
+
+
+def executor():
+    """
+    Process-wide pool running password hashing for the async views.
+
+    Threads are enough: hashlib's PBKDF2 releases the GIL, so hashes run in
+    parallel while the event loop keeps serving other requests. The pool size
+    bounds how many run at once; further ones wait in its queue.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=hash_workers(), thread_name_prefix='password-hash')
+        return _executor
+
+
+async def run_hasher(func, *args, **kwargs):
+    """
+    Run a CPU-bound, database-free callable on the hashing pool.
+    """
+    return await asyncio.get_running_loop().run_in_executor(executor(), functools.partial(func, *args, **kwargs))
+
+
+async def amake_password(password):
+    return await run_hasher(make_password, password)
+
+
+async def averify_password(password, encoded):
+    """
+    (is_correct, must_update) of a password against its stored hash, like
+    django.contrib.auth.hashers.verify_password, off the event loop.
+    """
+    return await run_hasher(verify_password, password, encoded)
+
+
+async def aauthenticate(email, password):
+    """
+    The active user with this email and password, or None.
+    Does what authenticate() does with ModelBackend, hashing on the pool.
+    """
+    try:
+        user = await User._default_manager.aget_by_natural_key(email)
+    except User.DoesNotExist:
+        # Hash anyway, so unknown emails take as long as wrong passwords.
+        await amake_password(password)
+        return None
+    is_correct, must_update = await averify_password(password, user.password)
+    if not is_correct or not user.is_active:
+        return None
+    if must_update:
+        user.password = await amake_password(password)
+        await user.asave(update_fields=['password'])
+    return user
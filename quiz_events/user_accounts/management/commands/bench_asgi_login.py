@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from quiz.benchmark import asgi_request, summarize
+from quiz_events.asgi import application
+from user_accounts.hashing import hash_workers
+from user_accounts.models import User
+
+PASSWORD = 'bench-login-password'
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark a login storm under ASGI: concurrent login throughput and quiz list latency "
+        "during the storm, with the sync DRF views and with the async views of api.async_views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=32, help="Logins sent at once.")
+        parser.add_argument('--quiz-lists', type=int, default=200, help="Quiz list requests sent before and during the storm.")
+
+    def handle(self, *args, **options):
+        encoded = make_password(PASSWORD)
+        # The ASGI handler runs queries on its own threads, so the users are committed and deleted afterwards.
+        users = User.objects.bulk_create([
+            User(email=f'bench-login-{number}@example.com', username=f'bench-login-{number}',
+                 password=encoded, profile_pic='defaultuser/Anonymous-User.png')
+            for number in range(options['logins'])
+        ])
+        try:
+            token = f'Bearer {AccessToken.for_user(users[0])}'
+            self.stdout.write(f"{options['logins']} concurrent logins, {hash_workers()} hashing workers")
+            self.stdout.write(
+                f"{'views':<12} {'logins/s':>9} {'login p95 ms':>13} "
+                f"{'list p50 ms':>12} {'list p95 ms':>12} {'idle p50 ms':>12}"
+            )
+            # A plain ASGIHandler routes through quiz_events.urls, i.e. the sync DRF views.
+            for name, app in (('sync', ASGIHandler()), ('async', application)):
+                result = asyncio.run(self.storm(app, users, token, options))
+                self.stdout.write(
+                    f"{name:<12} {result['throughput']:>9} {result['login']['p95_ms']:>13} "
+                    f"{result['storm']['p50_ms']:>12} {result['storm']['p95_ms']:>12} {result['idle']['p50_ms']:>12}"
+                )
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    async def storm(self, app, users, token, options):
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            status = await asgi_request(app, *args, **kwargs)
+            return status, (time.perf_counter() - started) * 1000
+
+        async def quiz_lists(count, stop=None):
+            latencies = []
+            for _ in range(count):
+                if stop is not None and stop.is_set():
+                    break
+                status, latency = await timed('GET', '/api/quiz/quiz-list/', headers=[('Authorization', token)])
+                assert status < 300, status
+                latencies.append(latency)
+            return latencies
+
+        async def logins(stop):
+            try:
+                return await asyncio.gather(*(
+                    timed('POST', '/api/user/login/', body={'email': user.email, 'password': PASSWORD})
+                    for user in users
+                ))
+            finally:
+                stop.set()
+
+        idle = await quiz_lists(options['quiz_lists'] // 4)
+        stop = asyncio.Event()
+        started = time.perf_counter()
+        results, storm = await asyncio.gather(logins(stop), quiz_lists(options['quiz_lists'], stop))
+        elapsed = time.perf_counter() - started
+        assert all(status < 300 for status, _ in results), [status for status, _ in results]
+        return {
+            'throughput': round(len(results) / elapsed, 2),
+            'login': summarize([latency for _, latency in results]),
+            'storm': summarize(storm),
+            'idle': summarize(idle),
+        }
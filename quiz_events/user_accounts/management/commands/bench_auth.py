@@ -0,0 +1,71 @@
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from quiz.benchmark import rolled_back, measure, summarize
+from user_accounts.authentication import CachedJWTAuthentication, auth_users
+from user_accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the per-request cost of resolving the user of a JWT: JWTAuthentication "
+        "against CachedJWTAuthentication, alone and through a full quiz list request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help="Users in the table.")
+        parser.add_argument('--active', type=int, default=100, help="Users sending the requests.")
+        parser.add_argument('--repeat', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        # Users are created inside a transaction that is rolled back at the end.
+        with rolled_back():
+            users = User.objects.bulk_create([
+                User(email=f'bench-auth-{number}@example.com', username=f'bench-auth-{number}',
+                     password='!', profile_pic='defaultuser/Anonymous-User.png')
+                for number in range(options['users'])
+            ], batch_size=5000)
+            tokens = [f'Bearer {AccessToken.for_user(user)}' for user in rng.sample(users, min(options['active'], len(users)))]
+            factory = RequestFactory()
+
+            def authenticate(authentication):
+                request = Request(factory.get('/', HTTP_AUTHORIZATION=rng.choice(tokens)))
+                return lambda: authentication.authenticate(request)
+
+            client = Client()
+            timeout = auth_users.timeout
+
+            def quiz_list():
+                client.get(reverse('quiz-list'), HTTP_AUTHORIZATION=rng.choice(tokens))
+
+            self.stdout.write(f"{'case':<26} {'queries':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+            auth_users.clear()
+            self.report('authenticate, no cache', lambda: authenticate(JWTAuthentication())(), options['repeat'])
+            self.report('authenticate, cached', lambda: authenticate(CachedJWTAuthentication())(), options['repeat'])
+
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                try:
+                    auth_users.clear()
+                    auth_users.timeout = 0
+                    self.report('quiz list, no cache', quiz_list, options['repeat'] // 4)
+                    auth_users.timeout = timeout
+                    self.report('quiz list, cached', quiz_list, options['repeat'] // 4)
+                finally:
+                    auth_users.timeout = timeout
+            self.stdout.write(f"Cache: {auth_users.stats()}")
+
+    def report(self, name, func, repeat):
+        result = summarize(*measure(func, repeat))
+        self.stdout.write(
+            f"{name:<26} {result['queries']:>8} {result['mean_ms']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9}"
+        )
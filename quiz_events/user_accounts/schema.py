@@ -0,0 +1,8 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """
+    Documents CachedJWTAuthentication like the JWTAuthentication it extends.
+    """
+    target_class = 'user_accounts.authentication.CachedJWTAuthentication'
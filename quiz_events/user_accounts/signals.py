@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from user_accounts.authentication import bump_auth_version
+from user_accounts.models import User
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # Every save can change what authentication relies on (is_active, the password hash
+    # after set_password, profile fields served from request.user), except the
+    # last_login update sent on each session login.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_auth_version(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    bump_auth_version(instance.pk)
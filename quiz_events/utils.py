@@ -1,52 +1,102 @@
-import json
+from django.http import HttpResponse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from logentry.models import LogEntry
+from logentry.capture import Capture, policy_for
+from logentry.writer import write_log_entry, awrite_log_entry
 
-# This funcation is used to custom response for apis
-def custom_response(request, data=None, success=0, message="", user=None, get_data=None, send_data=None, score=None,submission_id=None,status_code=status.HTTP_200_OK):
-    if data is None:
-        data = {}
+# This function is used to write the log entry of an api call
+def log_api_call(request, message="", get_data=None, send_data=None, status_code=status.HTTP_200_OK):
+    write_log_entry(api_log_entry(request, request.user, message, get_data, send_data, status_code))
+
+
+# Same as log_api_call, for async views. They set request.user themselves, so reading it never queries the session.
+async def alog_api_call(request, message="", get_data=None, send_data=None, status_code=status.HTTP_200_OK):
+    await awrite_log_entry(api_log_entry(request, request.user, message, get_data, send_data, status_code))
+
+
+def api_log_entry(request, user, message, get_data, send_data, status_code):
     if get_data is None:
-        get_data = request.GET.dict() 
+        get_data = request.GET.dict()
     if send_data is None:
-        send_data = data  
+        send_data = {}
 
-    if request.user.is_authenticated:
-        user_obj = request.user
+    if user.is_authenticated:
+        user_obj = user
     else:
         user_obj = 'anonymous user'
 
     ip_address = request.META.get('REMOTE_ADDR')
+    policy = policy_for(request)
     api_name = request.path
     api_type = request.method
 
-    LogEntry.objects.create(
+    return dict(
         user=str(user_obj),
         ip_address=ip_address,
         message=str(message),
         api_name=api_name,
         api_type=api_type,
-        send_data=json.dumps(send_data),
-        get_data=json.dumps(get_data),
-        status=str(status_code)
+        send_data=Capture(policy, send_data),
+        get_data=Capture(policy, get_data),
+        status=str(status_code),
+        date_time=timezone.now(),
     )
-    
+
+
+# This function is used to build the body of the custom response for apis
+def response_body(data=None, success=0, message="", score=None, submission_id=None, pagination=None):
+    if data is None:
+        data = {}
+
     if score is not None and submission_id is not None:
-        return Response({
+        body = {
             "data": data,
             "success": success,
             "message": message,
             "score" : score,
             "submission_id" : submission_id
-        }, status=status_code)
+        }
     else:
-        return Response({
+        body = {
             "data": data,
             "success": success,
             "message": message
-        }, status=status_code)
+        }
+    if pagination is not None:
+        body["pagination"] = pagination
+    return body
+
+
+# This funcation is used to custom response for apis
+def custom_response(request, data=None, success=0, message="", user=None, get_data=None, send_data=None, score=None,submission_id=None,status_code=status.HTTP_200_OK, pagination=None):
+    if data is None:
+        data = {}
+    if send_data is None:
+        send_data = data
+
+    log_api_call(request, message=message, get_data=get_data, send_data=send_data, status_code=status_code)
+    return Response(
+        response_body(data, success=success, message=message, score=score, submission_id=submission_id, pagination=pagination),
+        status=status_code
+    )
+
+
+# Same as custom_response, for async views that aren't DRF views
+async def acustom_response(request, data=None, success=0, message="", get_data=None, send_data=None, status_code=status.HTTP_200_OK, pagination=None):
+    if data is None:
+        data = {}
+    if send_data is None:
+        send_data = data
+
+    await alog_api_call(request, message=message, get_data=get_data, send_data=send_data, status_code=status_code)
+    return HttpResponse(
+        JSONRenderer().render(response_body(data, success=success, message=message, pagination=pagination)),
+        content_type='application/json',
+        status=status_code
+    )
 
 
 
@@ -62,15 +112,29 @@ class UserMessage:
 
 class QuizMessage:
     QUIZ_LIST_SUCCESSFULLY = 'All quizzes have been fetched successfully.'
+    QUIZ_SEARCH_SUCCESSFULLY = 'Matching quizzes have been fetched successfully.'
     QUIZ_NOT_FOUND = 'Quiz not found.'
     QUIZ_RETRIEVE_SUCCESSFULLY = 'Quiz fetched successfully.'
     QUIZ_SUBMITTED_SUCCESSFULLY = 'Quiz submitted successfully'
+    QUIZ_BATCH_PROCESSED_SUCCESSFULLY = 'Quiz submissions processed successfully.'
+    QUIZ_SUBMISSION_FAILED = 'Quiz submission could not be saved.'
+    QUIZ_SUBMISSION_BUSY = 'Quiz submissions are busy, please try again.'
+    QUIZ_SUBMISSION_QUEUED = 'Quiz submission queued for grading.'
+    LEADERBOARD_FETCHED_SUCCESSFULLY = 'Leaderboard fetched successfully.'
+    LEADERBOARD_RANK_FETCHED_SUCCESSFULLY = 'Your rank fetched successfully.'
+    LEADERBOARD_NOT_RANKED = 'You have no graded submission for this quiz yet.'
 
 
 class UserSubmissionMessages:
     USER_SUBMISSION_RETRIEVE_SUCCESSFULLY = 'Your Submission retrieve successfully.'
     USER_RESULT_RETRIEVE_SUCCESSFULLT = 'Quiz result fetched successfully.'
+    USER_RESULT_PENDING = 'Your submission is still being graded.'
 
 
 class EventMessages:
-    EVENT_FETCHED_SUCCESSFULLY = 'Updacoming Events are fetch successfully'
\ No newline at end of file
+    EVENT_FETCHED_SUCCESSFULLY = 'Updacoming Events are fetch successfully'
+    EVENT_SEARCH_SUCCESSFULLY = 'Events matching your search fetched successfully.'
+
+
+class OpsMessages:
+    STATS_FETCHED_SUCCESSFULLY = 'Runtime stats fetched successfully.'